@@ -66,7 +66,7 @@ async def on_message_edit(before, after):
     # Check if Volcyy's bot is online:
     if not volcyyBotOnline:
 
-        await message.handle_message(after)
+        await message.handle_message(after, edited=True)
 
 
 @client.event
@@ -79,14 +79,10 @@ async def on_reaction_add(reaction, user):
 
         # Actual function
         if user.id != client.user.id:
-            try:
-                if reaction.message.id == reactions.get_custom_reaction_embed().id:
-                    if reaction.emoji == '\N{BLACK RIGHT-POINTING TRIANGLE}':
-                        await reactions.move_custom_reaction_embed(True, user)
-                    elif reaction.emoji == '\N{BLACK LEFT-POINTING TRIANGLE}':
-                        await reactions.move_custom_reaction_embed(False, user)
-            except AttributeError:
-                pass
+            if reaction.emoji == '\N{BLACK RIGHT-POINTING TRIANGLE}':
+                await reactions.move_clickable_embed(reaction.message.id, True, user)
+            elif reaction.emoji == '\N{BLACK LEFT-POINTING TRIANGLE}':
+                await reactions.move_clickable_embed(reaction.message.id, False, user)
 
 
 @client.event
@@ -211,10 +207,12 @@ async def on_member_unban(server, user):
 
 def start():
     client.run(os.environ['DISCORD_TOKEN'])
+    message.trivia_engine.router.flush()
     message.data_cruncher.data.save_all()
 
 
 def close(_signo, _stack_frame):
+    message.trivia_engine.router.flush()
     message.data_cruncher.data.save_all()
 
 
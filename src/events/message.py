@@ -1,5 +1,5 @@
 from src.messages import administration, custom_reactions, currency, roles, unit, raffle
-from src.util import checks, data_cruncher
+from src.util import checks, data_cruncher, trivia_engine
 
 print('Loading Message Event Handler... ', end='')
 
@@ -13,7 +13,12 @@ replies = {
         'removeadmin': administration.remove_admin,
         'changeactivity': administration.change_activity,
         'setlog': administration.set_log_channel,
+        'addstream': administration.add_stream,
+        'rmstream': administration.remove_stream,
+        'removestream': administration.remove_stream,
+        'streams': administration.list_streams,
         'initlog': administration.set_log_channel,
+        'setmedia': administration.set_media_channel,
         'shutdown': administration.shutdown,
         'kill': administration.shutdown,
         'kick': administration.kick,
@@ -44,6 +49,11 @@ replies = {
     },
     data_cruncher.data.get_prefix('custom_reactions'): {
         'add': custom_reactions.add,
+        'rm': custom_reactions.remove,
+        'remove': custom_reactions.remove,
+        'edit': custom_reactions.edit,
+        'export': custom_reactions.export,
+        'import': custom_reactions.import_reactions,
         'addleague': custom_reactions.add_league_id,
         'addlol': custom_reactions.add_league_id,
         'removeleague': custom_reactions.remove_league_id,
@@ -59,6 +69,11 @@ replies = {
         'igel': custom_reactions.hedgehog,
         'viewall': custom_reactions.build_list,
         'showall': custom_reactions.build_list,
+        'search': custom_reactions.search,
+        'find': custom_reactions.search,
+        'trigger': custom_reactions.toggle_trigger,
+        'topreactions': custom_reactions.top_reactions,
+        'unused': custom_reactions.unused_reactions,
         'hm': custom_reactions.hugemoji,
         'help': custom_reactions.help,
         'serverinfo': custom_reactions.serverinfo,
@@ -77,12 +92,16 @@ replies = {
         'flip': currency.coin_flip,
         'coinflip': currency.coin_flip,
         'give': currency.give_money,
+        'chimegraph': currency.chime_graph,
+        'graph': currency.chime_graph,
         'lb': currency.leaderboard,
         'leaderboard': currency.leaderboard,
         'topchimes': currency.leaderboard,
         'top': currency.leaderboard,
         'tc': currency.leaderboard,
         'trivia': currency.trivia,
+        'triviatop': currency.trivia_top,
+        'tt': currency.trivia_top,
         'switch': currency.toggle_cg,
         'toggle': currency.toggle_cg,
         'cg': currency.toggle_cg,
@@ -94,7 +113,7 @@ replies = {
 
 
 @checks.is_in_guild
-async def handle_message(msg):
+async def handle_message(msg, edited: bool = False):
     """
     Handles a Message passed through various Checks. The Bot only responds on Guilds.
     
@@ -105,11 +124,19 @@ async def handle_message(msg):
     After this process, the message is passed to the Currency Module which uses non-Commands as triggers for 
     potential Currency spawning. The Commands exposed by the Module are specified in the Dictionary above.
     
+    Edited Messages are handled like new ones, except that they are not passed to Trivia Games
+    and do not fire Triggers, so editing a Message does not count as another Guess or fire a Trigger again.
+    
     :param msg: A discord.Message Object with which this Function should actuate. 
+    :param edited: Whether the Message was edited, rather than just sent
     """
     if msg.author.id == 290324118665166849:  # message by bot itself, for safety
         return
 
+    # Trivia Games see every new Message in their Channel, Commands included
+    if not edited:
+        await trivia_engine.router.dispatch(msg)
+
     valid_prefix_commands = replies.get(msg.content[:1], None)
     if valid_prefix_commands is not None:  # No message of interest
         try:
@@ -124,6 +151,8 @@ async def handle_message(msg):
                 reply = await valid_response(msg)
                 # Delete reply after a set time
     else:
+        if not edited:
+            await custom_reactions.fire_trigger(msg)
         await currency.generator(msg)
 
 
@@ -1,32 +1,59 @@
-from src.util import ClickableCustomReactionEmbed
-
-# Clickable Embed Storage to keep maximum one of each embed type in memory
-clickable_embed_storage = {
-    'custom-reaction': None,
-    'quotes': None
-}
-
-
-def get_custom_reaction_embed():
-    return clickable_embed_storage['custom-reaction']
+import collections
+import time
 
+from src.util import ClickableCustomReactionEmbed
 
-def get_quotes_embed():
-    return clickable_embed_storage['quotes']
+# Clickable Embeds by the ID of their Message, least recently used first
+clickable_embed_storage = collections.OrderedDict()
+MAX_CLICKABLE_EMBEDS = 100  # Older Embeds stop reacting to Clicks once more than this are open
+CLICKABLE_EMBED_IDLE_TTL = 30 * 60  # Embeds that were not clicked for this many Seconds stop reacting to Clicks
+
+
+def _evict():
+    """
+    Forget about Embeds that have been idle for too long, and the least recently used ones above the Limit.
+    Since Embeds are ordered by their last Use, only the ones that actually get evicted are looked at.
+    """
+    deadline = time.monotonic() - CLICKABLE_EMBED_IDLE_TTL
+    while clickable_embed_storage:
+        oldest = next(iter(clickable_embed_storage.values()))
+        if oldest[1] > deadline and len(clickable_embed_storage) <= MAX_CLICKABLE_EMBEDS:
+            break
+        clickable_embed_storage.popitem(last=False)
+
+
+def get_clickable_embed(message_id: int):
+    """
+    Get the Clickable Embed shown in the Message with the given ID, and mark it as used.
+    
+    :param message_id: The ID of the Message on which a Reaction was added
+    :return: The Clickable Embed, or None if the Message does not show one
+    """
+    _evict()
+    entry = clickable_embed_storage.get(message_id)
+    if entry is None:
+        return None
+    entry[1] = time.monotonic()
+    clickable_embed_storage.move_to_end(message_id)
+    return entry[0]
 
 
 async def create_custom_reaction_embed(title: str, contents: list, channel, icon_link: str = ''):
-    embed = clickable_embed_storage['custom-reaction']
-    if isinstance(embed, ClickableCustomReactionEmbed.ClickableCustomReactionEmbed):
-        await embed.remove()
-        print('Deleted Old Custom Reaction Embed.')
-    clickable_embed_storage['custom-reaction'] = ClickableCustomReactionEmbed.ClickableCustomReactionEmbed(title, contents, icon_link)
-    return await get_custom_reaction_embed().send(channel)
-
-
-def remove_custom_reaction_embed():
-    clickable_embed_storage['custom-reaction'] = None
-
-
-async def move_custom_reaction_embed(right: bool, user):
-    await get_custom_reaction_embed().move(right, user)
+    embed = ClickableCustomReactionEmbed.ClickableCustomReactionEmbed(title, contents, icon_link)
+    await embed.send(channel)
+    clickable_embed_storage[embed.id] = [embed, time.monotonic()]
+    _evict()
+    return embed
+
+
+async def move_clickable_embed(message_id: int, right: bool, user):
+    """
+    Move the Clickable Embed shown in the given Message, if there is one.
+    
+    :param message_id: The ID of the Message on which a Reaction was added
+    :param right: Whether to move Right or Left
+    :param user: The User who added the Reaction
+    """
+    embed = get_clickable_embed(message_id)
+    if embed is not None:
+        await embed.move(right, user)
@@ -1,15 +1,30 @@
-from src.util import data_cruncher
+from src.util import data_cruncher, media_prefetch, trivia_engine
 
 from src import twitch, bot
 
 
+# on_ready runs again after every Reconnect, but the Background Tasks must only be started once
+_background_started = False
+
+
 async def on_ready():
     """
     Handles the on_ready Event emitted when the Bot has finished logging in.
     Currently, this fetches messages in #role-assignment on the Bardians Discord Server, and
-    afterwards starts a task to get the Streams in the specified Stream Announcement Channel.
+    afterwards starts a task to announce Streams in the Channels subscribed to them.
     """
+    global _background_started
     print('Logged in.')
+    print('Resuming Trivia Games...')
+    await trivia_engine.router.restore()
+    if not _background_started:
+        _background_started = True
+        print('Prefetching random Media...')
+        media_prefetch.start()
+        print('Starting Custom Reaction Compaction...')
+        bot.client.loop.create_task(data_cruncher.data.compact_custom_reactions())
+        bot.client.loop.create_task(data_cruncher.data.flush_custom_reaction_usage())
+        bot.client.loop.create_task(trivia_engine.router.run_flush())
+        bot.client.loop.create_task(data_cruncher.data.run_config_flush())
     print('Starting Twitch Event Listener...')
-    await bot.client.loop.create_task(twitch.update_streams(bot.client.get_channel(
-                                      data_cruncher.data.get_stream_announcement_channel())))
+    await bot.client.loop.create_task(twitch.update_streams())
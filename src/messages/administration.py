@@ -2,7 +2,7 @@ import time
 
 import discord
 
-from src import bot
+from src import bot, twitch
 from src.util import embeds, checks
 from src.util.data_cruncher import data
 
@@ -151,6 +151,23 @@ async def set_log_channel(msg):
         return await embeds.desc_only(msg.channel, 'Failed to set Log channel.')
 
 
+@checks.is_owner
+async def set_media_channel(msg):
+    """
+    Set the Channel to which cached Images are uploaded, for all Guilds.
+    Usage: setmedia [#channel], defaults to the Channel in which the Command was invoked.
+
+    :param msg: The Message invoking the Command
+    :return: A discord.Message Object containing the Response from the Bot indicating Success or Failure.
+    """
+    channel = _announcement_channel(msg)
+    if data.get_media_cache()['storage_channel'] == channel.id:
+        return await embeds.desc_only(msg.channel, f'{channel.mention} already is the Media Storage Channel.')
+    data.set_media_storage_channel(channel.id)
+    print(f'Set the Media Storage Channel to {channel.id} on Guild {msg.guild.name}.')
+    return await embeds.desc_only(msg.channel, f'Media Storage Channel set to {channel.mention}.')
+
+
 @checks.is_admin
 async def add_mod(msg):
     """
@@ -191,6 +208,69 @@ async def remove_mod(msg):
         return await embeds.desc_only(msg.channel, f'Removed **{msg.mentions[0].name}** from Moderators.')
 
 
+def _announcement_channel(msg):
+    """
+    Get the Channel mentioned in the Message, or the Channel it was sent in.
+    """
+    return msg.channel_mentions[0] if msg.channel_mentions else msg.channel
+
+
+@checks.is_admin
+async def add_stream(msg):
+    """
+    Announce in a Channel when a Twitch Streamer goes online or offline.
+    Usage: addstream <streamer> [#channel], defaults to the Channel in which the Command was invoked.
+    
+    :param msg: The Message invoking the Command 
+    :return: A discord.Message Object containing the Response from the Bot indicating Success or Failure.
+    """
+    if len(msg.content.split()) < 2:
+        return await embeds.desc_only(msg.channel, 'No Streamer specified, cannot add Stream.')
+    streamer, channel = msg.content.split()[1].lower(), _announcement_channel(msg)
+    if not data.add_twitch_subscription(channel.id, streamer):
+        return await embeds.desc_only(msg.channel, f'**{streamer}** is already announced in {channel.mention}.')
+    print(f'Added Twitch Subscription to {streamer} for Channel {channel.id} on Guild {msg.guild.name}.')
+    await twitch.follow(streamer)
+    return await embeds.desc_only(msg.channel, f'**{streamer}** will now be announced in {channel.mention}.')
+
+
+@checks.is_admin
+async def remove_stream(msg):
+    """
+    Stop announcing a Twitch Streamer in a Channel.
+    Usage: rmstream <streamer> [#channel], defaults to the Channel in which the Command was invoked.
+    
+    :param msg: The Message invoking the Command 
+    :return: A discord.Message Object containing the Response from the Bot indicating Success or Failure.
+    """
+    if len(msg.content.split()) < 2:
+        return await embeds.desc_only(msg.channel, 'No Streamer specified, cannot remove Stream.')
+    streamer, channel = msg.content.split()[1].lower(), _announcement_channel(msg)
+    if not data.remove_twitch_subscription(channel.id, streamer):
+        return await embeds.desc_only(msg.channel, f'**{streamer}** is not announced in {channel.mention}.')
+    print(f'Removed Twitch Subscription to {streamer} for Channel {channel.id} on Guild {msg.guild.name}.')
+    await twitch.unfollow(streamer)
+    return await embeds.desc_only(msg.channel, f'**{streamer}** will no longer be announced in {channel.mention}.')
+
+
+@checks.is_admin
+async def list_streams(msg):
+    """
+    List the Twitch Streamers announced in each Channel of the Guild.
+    
+    :param msg: The Message invoking the Command 
+    :return: A discord.Message Object containing the Subscriptions of the Guild.
+    """
+    lines = []
+    for channel in msg.guild.text_channels:
+        streamers = data.get_channel_twitch_subscriptions(channel.id)
+        if streamers:
+            lines.append(f'{channel.mention}: {", ".join(sorted(streamers))}')
+    if not lines:
+        return await embeds.desc_only(msg.channel, 'No Streams are announced on this Guild.')
+    return await embeds.title_and_desc(msg.channel, '- Twitch Streams announced on this Guild -', '\n'.join(lines))
+
+
 @checks.is_admin
 async def shutdown(msg):
     """
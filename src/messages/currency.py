@@ -1,12 +1,13 @@
 import asyncio
 import datetime
+import time
 from concurrent.futures import TimeoutError
 
 import discord
 import random
 
 from src import bot
-from src.util import embeds, checks
+from src.util import embeds, checks, media_cache, trivia_engine, trivia_scoreboard
 from src.util.data_cruncher import data
 
 
@@ -87,11 +88,11 @@ async def generator(msg):
         return
 
     # After some Checks, now finally - currency spawned!
-    chime_image = random.choice([
+    chime_image = media_cache.get(random.choice([
         'http://2.bp.blogspot.com/-7s3q3BhdCBw/VPUPKAOTbUI/AAAAAAAAlCs/5vyP_lAN0S4/s1600/bardchime.jpg',
         'http://pm1.narvii.com/5786/089f9a52941e8ded0f54df0978378db42680f6d8_hq.jpg',
         'https://cdn.discordapp.com/attachments/172251363110027264/283612882846089216/unknown.png'
-    ])
+    ]))
     pickup_command = random.choice(['>pick', '>collect', '>gimme', '>mine', '>ootay', '>doot', '>slurp', '>canihas',
                                     '>bardo', '>penguin', '>ducky', '>quack', '>darb', '>dong', '>owo', '>whatsthis'])
 
@@ -147,8 +148,8 @@ async def coin_flip(msg):
         data.modify_currency_of_user(msg.guild.id, msg.author, amount)
         return await embeds.desc_with_img(msg.channel,
                                           f'You won **{amount} Chime{"s" if amount > 1 else ""}**!',
-                                          'https://cdn.discordapp.com/attachments/17225136311002726'
-                                          '4/294523714198831105/chime.png')
+                                          media_cache.get('https://cdn.discordapp.com/attachments/17225136311002726'
+                                                          '4/294523714198831105/chime.png'))
     else:
         data.modify_currency_of_user(msg.guild.id, msg.author, -amount)
         cat_eating_chime = random.choice(['http://grza.net/gis/Animals/Cats%20Kittens/Cat%20Evil.jpg',
@@ -164,7 +165,7 @@ async def coin_flip(msg):
                                           '-eyes-lasers-Favim.com-55022.jpg'])
         return await embeds.desc_with_img(msg.channel,
                                           f'A cat ate your **{f"{amount} Chimes" if amount > 1 else "Chime"}**!',
-                                          cat_eating_chime)
+                                          media_cache.get(cat_eating_chime))
 
 
 async def leaderboard(msg):
@@ -187,139 +188,61 @@ async def leaderboard(msg):
     return await loading_message.edit(embed=leader_board)
 
 
-async def trivia(msg):
+def _sparkline(points: list, width: int = 40):
     """
-    Play a Trivia Game.
-    
-    :param msg: The Message invoking the Command 
-    :return: The Response of the Bot 
+    Render a List of (timestamp, value) Points as a Line of Block Characters.
+
+    :param points: The Points to render, oldest first
+    :param width: The maximum amount of Characters to use
+    :return: The rendered Sparkline
     """
-    initial_join_timeout = 25  # Timeout for each User to join when a game is started
-    timeout_after_join = 8  # Timeout after at least one User joined
-    minimum_users_for_trivia = 2  # Minimum Users needed to start a Game
-    time_per_question = 20  # Time Users have per question
-    stop_after_unanswered_rounds = 100  # Stop after this amount of unanswered Questions consecutively
-    wrong_answer_penalty = 3  # Time penalty for a wrong answer
-    get_this_amount_of_points = 10  # The Amount of Points one User has to get to win
-    participating_users = [msg.author]  # Who participates in the Trivia Game
-
-    def did_join_trivia(m):
-        """
-        Helper Function to check if a User sent a Command to join the Trivia Game.
-        
-        :param m: The message to check 
-        :return: a bool
-        """
-        return m.channel == msg.channel and (m.content == '>join' or m.content == '>leave')
+    values = [x[1] for x in points]
+    if len(values) > width:  # Downsample by keeping the last Value of each Group
+        values = [values[min(len(values) - 1, (idx + 1) * len(values) // width - 1)] for idx in range(width)]
+    blocks = '▁▂▃▄▅▆▇█'
+    low, high = min(values), max(values)
+    if low == high:
+        return blocks[3] * len(values)
+    return ''.join(blocks[(x - low) * (len(blocks) - 1) // (high - low)] for x in values)
 
-    async def handle_join_and_leave(m):
-        """
-        Handler Users Joining and Leaving the Trivia Game, aswell as Quit
-        
-        :param m: The Message to check for Commands
-        :return: False if somebody wants to quit
-        """
-        if m.content.startswith('>leave') and m.author in participating_users:
-            participating_users.remove(m.author)
-            await embeds.desc_only(msg.channel, f'✅ You (**{m.author.display_name}**) are no longer '
-                                                f'participating in the Trivia Game!', discord.Color.green())
-        elif m.content.startswith('>leave'):
-            await embeds.desc_only(msg.channel, f'You (**{m.author.display_name}**) are not participating'
-                                                f' in the Trivia Game!', discord.Color.red())
-
-        elif m.content == '>join' and m.author in participating_users:
-            await embeds.desc_only(msg.channel, f'You (**{m.author.display_name}**) are already '
-                                                f'participating!', discord.Color.red())
-        elif m.content == '>join':
-            participating_users.append(m.author)
-            await embeds.desc_only(msg.channel, f'✅ You (**{m.author.display_name}**) joined the **'
-                                                f'{topic}** Trivia Game! Total: **{len(participating_users)}**',
-                                   discord.Color.green())
-        elif m.content in ('>stoptrivia', '>stop', '>stahp', '>quit'):
-            await embeds.desc_only(msg.channel, f'**Trivia stopped** upon Request by **{m.author.mention}**.',
-                                   discord.Color.red())
-            return False
-        return True
-
-    async def question_loop(index: int, question: dict, consecutive_rounds: int):
-        """
-        Handles asking Questions and responding to Answers accordingly.
-        
-        :param index: The Index of the Question 
-        :param question: A dictionary representing the Question and its answers
-        :param consecutive_rounds: How many Rounds have been without response consecutively
-        :return The consecutive Rounds without an Answer, None if it's time to stop, or False if somebody wants to quit
-        """
-        if consecutive_rounds >= stop_after_unanswered_rounds:
-            return None
-
-        description = question['q']
-        for key in question:
-            if key in ('1', '2', '3', '4'):
-                description += f'\n **{key}:** {question[key]}'
-
-        await embeds.title_and_desc(msg.channel, f'- Trivia Question #{index + 1} -',
-                                    description, discord.Color.gold())
-
-        try:
-            countdown = time_per_question
-            while True:
-                some_message = await bot.client.wait_for('message', check=lambda m: m.channel == msg.channel,
-                                                         timeout=countdown)
-                if some_message.content.lower() == question['a'] \
-                        and some_message.author.id in (x.id for x in participating_users):
-                    break  # PEP8 is a meme
-                else:
-                    # somebody wanted to quit
-                    if not await handle_join_and_leave(some_message):
-                        consecutive_rounds = -1
-                        return consecutive_rounds
-                    else:
-                        countdown -= wrong_answer_penalty
-
-        except TimeoutError:
-            await embeds.desc_only(msg.channel, f'Nobody responded it in time. The answer was: **{question["a"]}**',
-                                   discord.Color.dark_gold())
-            consecutive_rounds += 1
+
+async def chime_graph(msg):
+    """
+    Draw the Chimes of a User, and the total Chimes on the Guild, over Time.
+
+    :param msg: The Message invoking the Command
+    :return: The Response of the Bot
+    """
+    member = msg.mentions[0] if len(msg.mentions) == 1 else msg.author
+    tier = next((x for x in msg.content.split()[1:] if x in ('minute', 'hour', 'day')), 'hour')
+    span = {'minute': 'Hour', 'hour': 'Week', 'day': 'Year'}[tier]
+    user_points = data.get_balance_history(msg.guild.id, member.id, tier)
+    supply_points = data.get_balance_history(msg.guild.id, 0, tier)
+    if not user_points and not supply_points:
+        return await embeds.desc_only(msg.channel, 'No Chime History has been recorded for this Guild yet.')
+
+    graph = discord.Embed()
+    graph.title = f'- Chimes over the last {span} -'
+    for name, points in ((member.display_name, user_points), (f'Total on {msg.guild.name}', supply_points)):
+        if points:
+            graph.add_field(name=name, inline=False,
+                            value=f'`{_sparkline(points)}`\n'
+                                  f'from **{points[0][1]}** to **{points[-1][1]}** '
+                                  f'(min {min(x[1] for x in points)}, max {max(x[1] for x in points)})')
         else:
-            await embeds.desc_only(msg.channel, f'**{some_message.author.mention}**, you guessed it!',
-                                   discord.Color.green())
-            consecutive_rounds = 0
+            graph.add_field(name=name, value='*No History recorded yet.*', inline=False)
+    graph.set_footer(text=f'One Point per {tier}. Use minute, hour or day to change the Resolution.')
+    return await msg.channel.send(embed=graph)
 
-            if str(some_message.author.id) in correct_guessing_people:
-                correct_guessing_people[str(some_message.author.id)] += 1
-            else:
-                correct_guessing_people[str(some_message.author.id)] = 1
-        return consecutive_rounds
 
-    async def reward():
-        """
-        Helper function to reward Users at the end of the Game.
-        
-        :return: The Message containing the Response 
-        """
-        reward_chimes = random.randrange(1, 4)
-        results = ''
-        sorted_correct = sorted(correct_guessing_people.items(), key=lambda x: x[1], reverse=True)
-        if len(sorted_correct) < 1:
-            return await embeds.title_and_desc(msg.channel,
-                                               '- Trivia Game Results -',
-                                               'Nobody guessed anything. That\'s... interesting.',
-                                               discord.Color.gold())
-        for index, pepes_friend in enumerate(sorted_correct):
-            print(index)
-            if index == 0:
-                results += f'**{bot.client.get_user(int(pepes_friend[0])).mention}** won with **{pepes_friend[1]}** ' \
-                           f'Points and received **{reward_chimes} Chime{"s" if reward_chimes > 1 else ""}**' \
-                           f' for it! :confetti_ball: :sparkler:\n'
-                data.modify_currency_of_user(msg.guild.id, bot.client.get_user(int(pepes_friend[0])), reward_chimes)
-            else:
-                results += f'**#{index + 1}**: {bot.client.get_user(int(pepes_friend[0])).mention} ' \
-                           f'with {pepes_friend[1]} points!\n'
-
-        return await embeds.title_and_desc(msg.channel, '- Trivia Game Results -', results, discord.Color.gold())
-
-    # Initial Setup
+async def trivia(msg):
+    """
+    Play a Trivia Game. The Game itself runs in the Trivia Engine, which receives all further Messages
+    sent in this Channel until the Game is over.
+    
+    :param msg: The Message invoking the Command 
+    :return: The Response of the Bot 
+    """
     if len(msg.content.split()) < 2:
         return await embeds.desc_only(msg.channel, 'You did not specify any topic - here are all available ones:\n'
                                                    f'**{", ".join(data.get_all_trivia_topics())}**.')
@@ -328,6 +251,11 @@ async def trivia(msg):
     if trivia_obj is None:
         return await embeds.desc_only(msg.channel, f'I could not find the Trivia Topic "`{topic}`". '
                                                    'Run `>trivia` to get a List of all available Topics.')
+    elif trivia_obj['mode'] not in ('guess', 'numbers'):
+        return await embeds.desc_only(msg.channel, 'Unsupported Trivia Mode.', discord.Color.red())
+    elif trivia_engine.router.get(msg.channel.id) is not None:
+        return await embeds.desc_only(msg.channel, 'There already is a Trivia Game running in this Channel.',
+                                      discord.Color.red())
 
     # descriptive variable names
     is_not_being_time_outed = data.timeout_user_is_not_being_time_outed(msg.author.id)
@@ -335,51 +263,35 @@ async def trivia(msg):
         return await embeds.desc_only(msg.channel,
                                       'You need to wait **at least 10 Minutes** before using this Command.',
                                       discord.Color.red())
-    await embeds.desc_only(msg.channel, f'**{msg.author.display_name}** wants to start a Trivia Game! '
-                                        f'Type `>join` to join!', discord.Color.gold())
-
-    # Get Participants
-    while True:
-        try:
-            accept_msg = await bot.client.wait_for('message', check=did_join_trivia, timeout=initial_join_timeout
-            if len(participating_users) < 2 else timeout_after_join)
-        except TimeoutError:
-            break
-        else:
-            await handle_join_and_leave(accept_msg)
+    return await trivia_engine.router.start(msg, topic)
 
-    # Check for Amount of participants
-    if len(participating_users) < minimum_users_for_trivia:
-        return await embeds.desc_only(msg.channel, f'**Not enough Users joined** - you need **at least '
-                                                   f'{minimum_users_for_trivia} Users** to '
-                                                   f'start a Trivia Game, but only {len(participating_users)} joined!',
-                                      discord.Color.red())
 
-    await embeds.desc_only(msg.channel, f'Starting Trivia Game with **{len(participating_users)} User'
-                                        f'{"s" if len(participating_users) > 1 else ""}**...')
-    data.timeout_trivia_user(msg.author.id)
-    correct_guessing_people = {}
-    consecutive_rounds_without_answer = 0
-    random.shuffle(trivia_obj['questions'])
-    if trivia_obj['mode'] in ('guess', 'numbers'):
-        for idx, single_question in enumerate(trivia_obj['questions']):
-            consecutive_rounds_without_answer = await question_loop(idx, single_question,
-                                                                    consecutive_rounds_without_answer)
-            if consecutive_rounds_without_answer is None:
-                return await embeds.desc_only(msg.channel, f'I did not receive any Trivia Responses within the past **'
-                                                           f'{stop_after_unanswered_rounds} rounds** - time to stop!')
-
-            # Somebody requested Quit - need to check for False and not 0 for because magic
-            elif consecutive_rounds_without_answer == -1:
-                break
-
-            elif get_this_amount_of_points in correct_guessing_people.values():
-                return await reward()
-        correct_guessing_people = list(sorted(correct_guessing_people.items(), key=lambda x: x[1], reverse=True))
-        return await reward()
+async def trivia_top(msg):
+    """
+    Show the best Trivia Players on the Guild, either of all Time or of a Season.
+    Use `>triviatop season` for the current Season, or name one like `>triviatop 2017-Q2`.
 
-    else:
-        return await embeds.desc_only(msg.channel, 'Unsupported Trivia Mode.', discord.Color.red())
+    :param msg: The Message invoking the Command
+    :return: The Response of the Bot
+    """
+    season = msg.content.split()[1] if len(msg.content.split()) > 1 else 'all'
+    if season == 'season':
+        season = trivia_scoreboard.season_of(time.time())
+    top = data.get_trivia_top(msg.guild.id, season)
+    if not top:
+        return await embeds.desc_only(msg.channel, 'No Trivia Games have been recorded for that yet.')
+
+    leader_board = discord.Embed()
+    leader_board.title = f'- Trivia Leaderboard for {msg.guild.name} ({"All Time" if season == "all" else season}) -'
+    for idx, (user_id, stats) in enumerate(top):
+        member = msg.guild.get_member(user_id)
+        accuracy = stats[trivia_scoreboard.CORRECT] / max(1, stats[trivia_scoreboard.GUESSES])
+        answer_time = stats[trivia_scoreboard.ANSWER_MS] / max(1, stats[trivia_scoreboard.CORRECT]) / 1000
+        leader_board.add_field(name=f'#{idx + 1}: {member.display_name if member is not None else user_id}',
+                               value=f'**{stats[trivia_scoreboard.CORRECT]}** correct in '
+                                     f'{stats[trivia_scoreboard.GAMES]} Games, {stats[trivia_scoreboard.WINS]} won\n'
+                                     f'{accuracy:.0%} accuracy, {answer_time:.1f}s per answer')
+    return await msg.channel.send(embed=leader_board)
 
 
 @checks.is_admin
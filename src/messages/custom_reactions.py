@@ -1,16 +1,18 @@
+import asyncio
+import os
 import sys
 import datetime
 import json
-import urllib
+import tempfile
+import time
 
 import cassiopeia
 import discord
 import re
-import requests
 
 from src import bot
 from src.events.reactions import create_custom_reaction_embed
-from src.util import embeds, lolapi
+from src.util import embeds, checks, http_client, lolapi, media_cache, media_prefetch
 from src.util.data_cruncher import data
 
 
@@ -29,9 +31,8 @@ async def fetch_leaderboard(msg):
             userData = json.load(localUserData)
     except FileNotFoundError:
         try:
-            with urllib.request.urlopen(uri) as onlineUserData:
-                userData = json.load(onlineUserData)
-        except urllib.error.URLError:
+            userData = await http_client.get_json(uri)
+        except http_client.HTTPError:
             print(
                 'Unable to get leaderboard data online or locally',
                 file=sys.stderr
@@ -64,32 +65,63 @@ async def invoke_leaderboard_build(msg):
     :param msg: The Message invoking the command
     :return The built Leaderboard. Takes some time.
     """
-    return await bot.client.loop.run_in_executor(await _build_league_leaderboard(msg))
+    return await _build_league_leaderboard(msg)
+
+
+async def _fetch_league_user(player_id, region: str):
+    """
+    Get the Mastery Points and Summoner Name of a Player, running both Lookups concurrently on the API Thread Pool.
+    Only Lookups which are not cached or have gone stale are sent to the Riot API.
+    
+    :return: A [points, name] List, or None if the Riot API returned an Error.
+    """
+    try:
+        return list(await asyncio.gather(lolapi.mastery_points(player_id, region),
+                                         lolapi.summoner_name(player_id, region)))
+    except (cassiopeia.type.api.exception.APIError, ValueError) as err:
+        print(f'Failed to fetch League User {player_id} on {region}: {err}')
+        return None
 
 
 async def _build_league_leaderboard(msg):
     """
     Build a Leaderboard containing the top scores for the people who entered themselves into the List previously.
+    The Lookups run in the Background, and the Progress is shown in the "Building..." Message while they do.
     
     :param msg: The Message invoking the Command 
     :return: The built Leaderboard. Takes some time.
     """
     start = datetime.datetime.now()
     user_list = data.get_league_guild_users(msg.guild.id)
-    info = await embeds.desc_only(msg.channel, f'Building League of Legends Leaderboard for '
-                                               f'**{len(user_list)} Users**...')
+    building = f'Building League of Legends Leaderboard for **{len(user_list)} Users**...'
+    info = await embeds.desc_only(msg.channel, building)
     users = []
-    for user in data.get_league_guild_users(msg.guild.id):
-        users.append([lolapi.get_mastery_points_by_id(user[0], user[1]),
-                      lolapi.get_summoner_by_id(user[0], user[1]).name])
+    done = 0
+    last_update = start
+    for lookup in asyncio.as_completed([_fetch_league_user(user[0], user[1]) for user in user_list]):
+        user = await lookup
+        done += 1
+        if user is not None:
+            users.append(user)
+        if info is not None and (datetime.datetime.now() - last_update).total_seconds() >= 2 and done < len(user_list):
+            last_update = datetime.datetime.now()
+            try:
+                await info.edit(embed=discord.Embed(description=f'{building}\n{done} / {len(user_list)} done.'))
+            except discord.errors.HTTPException:
+                pass
     users = sorted(users, key=lambda x: x[0], reverse=True)
     leader_board = discord.Embed()
     leader_board.title = '- Bard Mastery Score Leaderboard -'
     for idx, pair in enumerate(users):
         score = '{:,}'.format(pair[0])
         leader_board.add_field(name=f'#{idx + 1}: {pair[1]}', value=f' with **{score} points**')
-    await info.delete()
-    leader_board.set_footer(text=f'Took {str(datetime.datetime.now() - start)[6:]}s.')
+    if info is not None:
+        await info.delete()
+    lolapi.prune_cache()
+    data.save_league_cache()
+    failed = len(user_list) - len(users)
+    leader_board.set_footer(text=f'Took {str(datetime.datetime.now() - start)[6:]}s.'
+                                 f'{f" {failed} Users could not be fetched." if failed else ""}')
     return await msg.channel.send(embed=leader_board)
 
 
@@ -105,7 +137,7 @@ async def add_league_id(msg):
     region = msg.content.split()[1]
     summoner_name = ' '.join(msg.content.split()[2:])
     try:
-        user_id = lolapi.get_id_by_name(summoner_name, region)
+        user_id = await lolapi.summoner_id(summoner_name, region)
     except (cassiopeia.type.api.exception.APIError, ValueError):
         return await embeds.desc_only(msg.channel, 'The League of Legends API returned an Error trying to get your Sum'
                                                    'moner Account. This usually means that your Account was not found.')
@@ -129,7 +161,7 @@ async def remove_league_id(msg):
     region = msg.content.split()[1]
     summoner_name = ' '.join(msg.content.split()[2:])
     try:
-        user_id = lolapi.get_id_by_name(summoner_name, region)
+        user_id = await lolapi.summoner_id(summoner_name, region)
     except (cassiopeia.type.api.exception.APIError, ValueError):
         return await embeds.desc_only(msg.channel, 'The League of Legends API returned an Error trying to get your Sum'
                                                    'moner Account. This usually means that your Account was not found.')
@@ -148,48 +180,188 @@ async def add(msg):
     :return: A discord.Message informing about the Success or Failure of adding it.
     """
     if len(msg.content.split()[2:]) < 1:
-        return await embeds.desc_only(msg.channel, 'Too little content for a Custom Reaction!')
+        return await embeds.static_desc(msg.channel, 'Too little content for a Custom Reaction!')
     elif msg.content.split()[1] == 'add':  # !add add, u memers
-        return await embeds.desc_only(msg.channel, 'That\'s not a valid Custom Reaction name.')
-    data.add_custom_reaction(msg.guild.id, msg.content.split()[1], ' '.join(msg.content.split()[2:]), msg.author.name)
-    return await embeds.desc_only(msg.channel, f'Added new Custom Reaction called {msg.content.split()[1]}.')
+        return await embeds.static_desc(msg.channel, 'That\'s not a valid Custom Reaction name.')
+    reaction_id = data.add_custom_reaction(msg.guild.id, msg.content.split()[1], ' '.join(msg.content.split()[2:]),
+                                           msg.author.name, msg.author.id)
+    return await embeds.desc_only(msg.channel, f'Added new Custom Reaction called {msg.content.split()[1]} '
+                                               f'with ID #{reaction_id}.')
+
+
+def _get_own_custom_reaction(msg):
+    """
+    Get the Custom Reaction whose ID is given as the first Argument of the Message,
+    if the Author of the Message added it, or is a Moderator on the Guild.
+    Ownership is checked by User ID, so Custom Reactions without a stored Author ID can only be changed by Moderators.
+
+    :param msg: The Message invoking the Command
+    :return: A (reaction, error) Tuple, where reaction is the Custom Reaction as [payload key, author, creation date,
+             id, version] and error is a Description of what went wrong, or None.
+    """
+    try:
+        reaction_id = int(msg.content.split()[1].lstrip('#'))
+    except (IndexError, ValueError):
+        return None, 'You need to specify the ID of the Custom Reaction.'
+    found = data.get_custom_reaction_by_id(msg.guild.id, reaction_id)
+    if found is None:
+        return None, 'There is no Custom Reaction with that ID.'
+    author_id = found[1][5] if len(found[1]) > 5 else None
+    if author_id != msg.author.id and msg.author.id not in data.get_moderators_and_above(msg.guild.id):
+        return None, 'You can only change Custom Reactions that you added yourself.'
+    return found[1], None
+
+
+async def remove(msg):
+    """
+    Remove a Custom Reaction by its ID. Only the Author of the Custom Reaction and Moderators may do so.
+    
+    :param msg: The Message invoking the Command
+    :return: A discord.Message informing about the Success or Failure of removing it.
+    """
+    reaction, error = _get_own_custom_reaction(msg)
+    if error is not None:
+        return await embeds.static_desc(msg.channel, error)
+    reaction_id = reaction[3]
+    embeds.invalidate_custom_reaction(reaction_id, reaction[4])
+    data.remove_custom_reaction(msg.guild.id, reaction_id)
+    return await embeds.desc_only(msg.channel, f'Removed Custom Reaction #{reaction_id}.')
+
+
+async def edit(msg):
+    """
+    Replace the Contents of a Custom Reaction by its ID. Only the Author of the Custom Reaction and Moderators may do so.
+    
+    :param msg: The Message invoking the Command
+    :return: A discord.Message informing about the Success or Failure of editing it.
+    """
+    if len(msg.content.split()[2:]) < 1:
+        return await embeds.static_desc(msg.channel, 'Too little content for a Custom Reaction!')
+    reaction, error = _get_own_custom_reaction(msg)
+    if error is not None:
+        return await embeds.static_desc(msg.channel, error)
+    reaction_id = reaction[3]
+    embeds.invalidate_custom_reaction(reaction_id, reaction[4])
+    data.edit_custom_reaction(msg.guild.id, reaction_id, ' '.join(msg.content.split()[2:]))
+    return await embeds.desc_only(msg.channel, f'Edited Custom Reaction #{reaction_id}.')
+
+
+@checks.is_admin
+async def export(msg):
+    """
+    Send all Custom Reactions on the Guild as an NDJSON File, which can be imported again with !import.
+    The File is written in Batches, so other Commands are still handled while a large Export is running.
+    
+    :param msg: The Message invoking the Command
+    :return: A discord.Message Object with the Export attached.
+    """
+    fd, path = tempfile.mkstemp(suffix='.ndjson')
+    count = 0
+    try:
+        with os.fdopen(fd, 'w') as f:
+            for lines in data.export_custom_reactions(msg.guild.id):
+                f.writelines(lines)
+                count += len(lines)
+                await asyncio.sleep(0)
+        if count == 0:
+            return await embeds.desc_only(msg.channel, 'Sorry, no Custom Reactions were found for this Server.')
+        return await msg.channel.send(f'Exported {count} Custom Reactions.',
+                                      file=discord.File(path, filename=f'custom_reactions_{msg.guild.id}.ndjson'))
+    finally:
+        os.remove(path)
+
+
+@checks.is_admin
+async def import_reactions(msg):
+    """
+    Import Custom Reactions from an NDJSON File attached to the Message, as created by !export.
+    Custom Reactions that already exist with the same Name and Contents are skipped.
+    
+    :param msg: The Message invoking the Command
+    :return: A discord.Message Object informing about the Result of the Import.
+    """
+    if not msg.attachments:
+        return await embeds.static_desc(msg.channel, 'You need to attach an NDJSON File created by the Export.')
+    fd, path = tempfile.mkstemp(suffix='.ndjson')
+    os.close(fd)
+    try:
+        await msg.attachments[0].save(path)
+        with open(path, errors='replace') as f:
+            for stats in data.import_custom_reactions(msg.guild.id, f):
+                await asyncio.sleep(0)
+    finally:
+        os.remove(path)
+    if stats['added']:
+        data.save_custom_reactions()
+    return await embeds.desc_only(msg.channel, f'Imported {stats["added"]} Custom Reactions, skipped '
+                                               f'{stats["duplicates"]} Duplicates and {stats["invalid"]} '
+                                               f'invalid Lines.')
 
 
 async def meow(msg):
     """
-    Sends a random Cat Image or GIF. Note that the request is blocking.
+    Sends a random Cat Image or GIF.
     
     :param msg: The Message invoking the Command
     :return: A discord.Message Object containing a Cat Image or GIF
     """
-    link = json.load(urllib.request.urlopen('http://random.cat/meow'))['file']
+    try:
+        link = await media_prefetch.buffers['cat'].get()
+    except http_client.HTTPError:
+        return await embeds.static_desc(msg.channel, 'Sorry, no Cats could be found right now.')
     return await embeds.img_only(msg.channel, link)
 
 
+async def _send_random_gif(channel, tag: str):
+    """
+    Sends a random prefetched GIF with the given Tag.
+    
+    :param channel: The Channel in which to send the GIF
+    :param tag: The Tag of the GIF, as found in media_prefetch.buffers
+    :return: A discord.Message Object containing the GIF
+    """
+    try:
+        url = await media_prefetch.buffers[tag].get()
+    except http_client.HTTPError:
+        return await embeds.static_desc(channel, 'Sorry, Giphy is not reachable right now.')
+    return await channel.send(url)
+
+
 async def woof(msg):
     """
-    Sends a random Dog GIF. Note that the request is blocking.
+    Sends a random Dog GIF.
     
     :param msg: The Message invoking the Command 
-    :return: A discord.Message Object containing a Cat Image or GIF
+    :return: A discord.Message Object containing a Dog GIF
     """
-    url = requests.get('https://api.giphy.com/v1/gifs/random?'
-                       'api_key=dc6zaTOxFJmzC&tag=dog').json()['data']['image_original_url']
-    return await msg.channel.send(url)
+    return await _send_random_gif(msg.channel, 'dog')
 
 
 async def fox(msg):
     """Send a random Fox GIF."""
-    url = requests.get('https://api.giphy.com/v1/gifs/random?'
-                       'api_key=dc6zaTOxFJmzC&tag=fox').json()['data']['image_original_url']
-    return await msg.channel.send(url)
+    return await _send_random_gif(msg.channel, 'fox')
 
 
 async def hedgehog(msg):
     """Send a random Hedgehog GIF."""
-    url = requests.get('https://api.giphy.com/v1/gifs/random?'
-                       'api_key=dc6zaTOxFJmzC&tag=hedgehog').json()['data']['image_original_url']
-    return await msg.channel.send(url)
+    return await _send_random_gif(msg.channel, 'hedgehog')
+
+
+async def send_custom_reaction(channel, guild_id: int, name: str):
+    """
+    Sends a random Custom Reaction with the specified name.
+    
+    :param channel: The Channel in which to send the Custom Reaction
+    :param guild_id: The Guild on which to look up the Custom Reaction
+    :param name: The Name of the Custom Reaction
+    :return: None if no Custom Reaction was found, otherwise a discord.Message Object containing the Custom Reaction.
+    """
+    reaction = data.get_custom_reaction(guild_id, name)
+    if reaction is None:
+        return None
+    elif reaction[0] != '':
+        data.record_custom_reaction_use(guild_id, reaction[3])
+        return await embeds.send_custom_reaction(channel, name.lower(), reaction)
 
 
 async def get_one(msg):
@@ -201,18 +373,40 @@ async def get_one(msg):
     """
     try:
         name = msg.content[1:].split()[0]
-        reaction = data.get_custom_reaction(msg.guild.id, name)
     except IndexError:
         return None
     else:
-        if reaction is None:
-            return None
-        elif reaction[0].startswith('http'):  # Properly Embed Links to GIF, Images etc.
-            return await embeds.img_with_footer(msg.channel, reaction[0],
-                                                f'"{name}" | Added by {reaction[1]}', reaction[2])
-        elif reaction[0] != '':
-            return await embeds.desc_with_footer(msg.channel, reaction[0],
-                                                 f'"{name}" | Added by {reaction[1]}', reaction[2])
+        return await send_custom_reaction(msg.channel, msg.guild.id, name)
+
+
+async def fire_trigger(msg):
+    """
+    Sends the Custom Reaction whose Name appears in the Message, if it was made a Trigger on the Guild.
+    
+    :param msg: Any Message which is not a Command
+    :return: None if no Trigger was found, otherwise a discord.Message Object containing the Custom Reaction.
+    """
+    name = data.find_custom_reaction_trigger(msg.guild.id, msg.content)
+    if name is not None and msg.author.id != bot.client.user.id:
+        return await send_custom_reaction(msg.channel, msg.guild.id, name)
+
+
+@checks.is_admin
+async def toggle_trigger(msg):
+    """
+    Make a Custom Reaction fire whenever its Name is mentioned in a Message, or stop it from doing so.
+    
+    :param msg: The Message invoking the Command 
+    :return: A discord.Message informing about the new State of the Trigger.
+    """
+    if len(msg.content.split()) < 2:
+        return await embeds.desc_only(msg.channel, 'You need to specify the Custom Reaction to use as a Trigger.')
+    name = msg.content.split()[1].lower()
+    if data.get_custom_reaction(msg.guild.id, name) is None:
+        return await embeds.desc_only(msg.channel, f'There is no Custom Reaction called **{name}**.')
+    elif data.toggle_custom_reaction_trigger(msg.guild.id, name):
+        return await embeds.desc_only(msg.channel, f'**{name}** now fires whenever it is mentioned in a Message.')
+    return await embeds.desc_only(msg.channel, f'**{name}** no longer fires when it is mentioned in a Message.')
 
 
 async def build_list(msg):
@@ -223,8 +417,8 @@ async def build_list(msg):
     :return: A discord.Message Object with the Bot's Response.
     """
     custom_reactions = data.get_all_custom_reactions_on_guild(msg.guild.id)
-    if custom_reactions is None:
-        return await embeds.desc_only(msg.channel, 'Sorry, no Quotes were found for this Server.')
+    if not custom_reactions:
+        return await embeds.static_desc(msg.channel, 'Sorry, no Quotes were found for this Server.')
     else:
         return await create_custom_reaction_embed(f'- All Custom Reactions on {msg.guild.name} - ',
                                                   custom_reactions, msg.channel,
@@ -234,6 +428,68 @@ async def build_list(msg):
                                                   '0rtuSlUU=w1441-h740')
 
 
+async def search(msg):
+    """
+    Search the Custom Reactions on the Guild by their Name, Contents and Author.
+    
+    :param msg: The Message invoking the Command 
+    :return: A discord.Message Object with the best matching Custom Reactions.
+    """
+    query = ' '.join(msg.content.split()[1:])
+    if query == '':
+        return await embeds.desc_only(msg.channel, 'You need to specify what to search for.')
+    results = data.search_custom_reactions(msg.guild.id, query)
+    if not results:
+        return await embeds.desc_only(msg.channel, f'No Custom Reactions found for **{query}**.')
+    lines = []
+    for contents, author, _, name, reaction_id in results:
+        preview = contents if len(contents) <= 80 else contents[:77] + '...'
+        lines.append(f'**!{name}** #{reaction_id} by {author}: {preview}')
+    return await embeds.title_and_desc(msg.channel, f'- Custom Reactions matching "{query}" -', '\n'.join(lines))
+
+
+async def top_reactions(msg):
+    """
+    Send a List of the most used Custom Reactions on the Guild.
+    
+    :param msg: The Message invoking the Command 
+    :return: A discord.Message Object with the most used Custom Reactions.
+    """
+    top = data.get_top_custom_reactions(msg.guild.id)
+    if not top:
+        return await embeds.static_desc(msg.channel, 'No Custom Reactions have been used on this Server yet.')
+    lines = [f'{idx}. **!{name}** #{reaction_id}: used {uses} times'
+             for idx, (name, reaction_id, uses) in enumerate(top, 1)]
+    return await embeds.title_and_desc(msg.channel, f'- Most used Custom Reactions on {msg.guild.name} -',
+                                       '\n'.join(lines))
+
+
+@checks.is_mod
+async def unused_reactions(msg):
+    """
+    Send a List of Custom Reactions on the Guild that were not used in the given amount of Days (default 30),
+    as Candidates for removal with !rm.
+    
+    :param msg: The Message invoking the Command 
+    :return: A discord.Message Object with the unused Custom Reactions.
+    """
+    try:
+        days = int(msg.content.split()[1]) if len(msg.content.split()) > 1 else 30
+    except ValueError:
+        return await embeds.static_desc(msg.channel, 'That is not a valid amount of Days.')
+    unused = data.get_unused_custom_reactions(msg.guild.id, days)
+    if not unused:
+        return await embeds.desc_only(msg.channel, f'All Custom Reactions were used in the last {days} Days.')
+    lines = []
+    for name, reaction_id, last_used in unused[:30]:
+        when = 'never used' if last_used is None else f'last used {time.strftime("%Y-%m-%d", time.gmtime(last_used))}'
+        lines.append(f'**!{name}** #{reaction_id}: {when}')
+    if len(unused) > 30:
+        lines.append(f'... and {len(unused) - 30} more.')
+    return await embeds.title_and_desc(msg.channel, f'- {len(unused)} Custom Reactions unused for {days} Days -',
+                                       '\n'.join(lines))
+
+
 async def hugemoji(msg):
     """
     Sends a "hugified" version of the Emoji given in the Message. Only works for Custom Emojis.
@@ -249,7 +505,8 @@ async def hugemoji(msg):
     except AttributeError:
         return await embeds.desc_only(msg.channel, 'Sorry, something went wrong.')
     else:
-        return await embeds.img_only(msg.channel, f'https://cdn.discordapp.com/emojis/{emoji_id.group(0)}.png')
+        return await embeds.img_only(msg.channel,
+                                     media_cache.get(f'https://cdn.discordapp.com/emojis/{emoji_id.group(0)}.png'))
 
 
 async def help(msg):
@@ -176,7 +176,7 @@ async def get_league_role(msg):
             return await embeds.desc_only(msg.channel, f'Gave you the **{role.name}** Role!')
 
     try:
-        champion_points = lolapi.get_mastery_points(name, server)
+        champion_points = await lolapi.mastery_points(await lolapi.summoner_id(name, server), server)
     except ValueError:
         return await embeds.desc_only(msg.channel, 'Some error occured, keep in mind: it\'s .getmyrole <server> <name>')
     except cassiopeia.type.api.exception.APIError:
@@ -1,73 +1,116 @@
 import asyncio
 
-import aiohttp
 import os
+from src.util import http_client
 from src.util.data_cruncher import data
+from src.util.twitch_api import EventSubClient, StreamPoller, WebhookReceiver
 
 from src import bot
 from src.util.embeds import url_with_desc
 
-url = 'https://api.twitch.tv/kraken/streams/'
+WEBHOOK_DEFAULT_PORT = 8080
+PUSH_POLL_INTERVAL = 15 * 60  # Polling only catches missed Notifications while Push is active
 
+# Created on the first on_ready Event. Later ones, after Reconnects, reuse them instead of
+# starting a second Listener or binding the Webhook Port again.
+_poller = None
+_eventsub = None
 
-async def get_stream(stream_name: str):
+
+async def announce(name: str, online: bool):
+    """
+    Announce that a Stream went online or offline in all Channels subscribed to the Streamer, concurrently.
+
+    :param name: The Name of the Streamer
+    :param online: Whether the Stream went online
+    """
+    channels = [bot.client.get_channel(x) for x in data.get_twitch_subscribers(name)]
+    await asyncio.gather(*(url_with_desc(channel,
+                                         f'Twitch: {name}',
+                                         f'http://twitch.tv/{name}',
+                                         f'**{name}** is now {"online!" if online else "offline."}'
+                                         f'\n {f"http://twitch.tv/{name}" if online else ""}')
+                           for channel in channels if channel is not None))
+
+
+async def follow(name: str):
+    """
+    Create the EventSub Subscriptions for a Streamer that a Channel was just subscribed to, if Twitch
+    pushes Notifications. Nothing happens if the Streamer was followed already.
+
+    :param name: The Name of the Streamer
+    """
+    if _eventsub is not None:
+        try:
+            if not await _eventsub.subscribe(name):
+                print(f'Can\'t subscribe to Twitch Notifications for {name}, no such Streamer.')
+        except http_client.HTTPError as err:
+            print(f'Failed to subscribe to Twitch Notifications for {name}: {err}')
+
+
+async def unfollow(name: str):
     """
-    Helper Function to get information about the state of a single Channel.
-    
-    An interesting Note is that sometimes the Twitch API will return some weird JSON thing I have not figured out yet.
-    In that case, it the second Item in the List returned is None to indicate that the requested Stream is neither
-    offline nor online, but rather that the Twitch API returned something weird.
-    
-    :param stream_name: The Streamer Name for which to obtain Information. 
-    :return: 
+    Delete the EventSub Subscriptions for a Streamer, once no Channel is subscribed to them anymore.
+
+    :param name: The Name of the Streamer
     """
-    with aiohttp.ClientSession() as session:
+    if _eventsub is not None and not data.get_twitch_subscribers(name):
         try:
-            async with session.get(f'{url}{stream_name}?client_id={os.environ["TWITCH_TOKEN"]}') as resp:
-                try:
-                    if (await resp.json())['stream'] is None:
-                        stream = [stream_name, False]
-                    else:
-                        stream = [stream_name, True]
-                except KeyError:
-                    # Something is wrong here with the Twitch API.
-                    return [stream_name, None]
-        except aiohttp.ClientOSError:
-            print('Can\'t fetch Stream Data...')
-        else:
-            return stream
-
-
-async def update_streams(channel):
+            await _eventsub.unsubscribe(name)
+        except http_client.HTTPError as err:
+            print(f'Failed to unsubscribe from Twitch Notifications for {name}: {err}')
+
+
+async def _start_push(secret: str):
+    """
+    Receive Notifications pushed by Twitch, and create the Subscriptions for them if the Client Secret
+    and the public Webhook URL are known. Otherwise, the Subscriptions have to be created by hand.
     """
-    Starts the Stream Update Listener towards the Twitch API. 
-    
+    global _eventsub
+    receiver = WebhookReceiver(_poller, secret)
+    await receiver.start(int(os.environ.get('TWITCH_WEBHOOK_PORT', WEBHOOK_DEFAULT_PORT)))
+    if 'TWITCH_CLIENT_SECRET' not in os.environ or 'TWITCH_WEBHOOK_URL' not in os.environ:
+        print('TWITCH_CLIENT_SECRET or TWITCH_WEBHOOK_URL is missing, only receiving Twitch Notifications '
+              'for Subscriptions created by hand.')
+        _poller.max_interval = PUSH_POLL_INTERVAL
+        return
+    eventsub = EventSubClient(os.environ['TWITCH_TOKEN'], os.environ['TWITCH_CLIENT_SECRET'],
+                              os.environ['TWITCH_WEBHOOK_URL'], secret)
+    try:
+        await eventsub.sync(data.get_twitch_subscriptions())
+    except http_client.HTTPError as err:
+        print(f'Failed to subscribe to Twitch Notifications, only polling: {err}')
+        return
+    _eventsub = eventsub
+    _poller.max_interval = PUSH_POLL_INTERVAL
+
+
+async def update_streams():
+    """
+    Starts the Stream Update Listener towards the Twitch API.
+
     If TWITCH_TOKEN is not found in the Environment Variables, it will not start.
     Otherwise, it will enter a loop running until the connected Discord Client logs off.
-    
-    :param channel: The Channel in which to send announcements about a stream going online / offline.
+    If TWITCH_WEBHOOK_SECRET is set as well, Notifications pushed by Twitch are received on TWITCH_WEBHOOK_PORT,
+    and Polling only runs rarely, to catch Notifications that were missed. With TWITCH_CLIENT_SECRET and
+    TWITCH_WEBHOOK_URL, the public URL of the Webhook, the Subscriptions are created and deleted along with
+    the Subscriptions of the Channels.
+    Every Streamer is polled once, however many Channels are subscribed to them.
+    The Listener is only started once, later Calls after Reconnects return right away.
     """
+    global _poller
     try:
         os.environ['TWITCH_TOKEN']
     except KeyError:
         print('No Twitch Token found in Environment Variables. Can\'t initialize Twitch Stream Update Listener...')
     else:
+        if _poller is not None:
+            return
+        _poller = StreamPoller(announce, os.environ['TWITCH_TOKEN'])
         await bot.client.wait_until_ready()
-        last_streamers, curr_streamers = [], []
+        if 'TWITCH_WEBHOOK_SECRET' in os.environ:
+            await _start_push(os.environ['TWITCH_WEBHOOK_SECRET'])
         while not bot.client.is_closed():
-            for idx, streamer_name in enumerate(data.get_twitch_subscriptions()):
-                curr_streamer = await get_stream(streamer_name)
-                if curr_streamer[1] is None or (last_streamers != [] and last_streamers[idx][1]) is None:
-                    continue
-                elif last_streamers != [] and curr_streamer[1] != last_streamers[idx][1]:
-                    await url_with_desc(channel,
-                                        f'Twitch: {curr_streamer[0]}',
-                                        f'http://twitch.tv/{curr_streamer[0]}',
-                                        f'**{curr_streamer[0]}** is now {"online!" if curr_streamer[1] else "offline."}'
-                                        f'\n {f"http://twitch.tv/{curr_streamer[0]}" if curr_streamer[1] else ""}')
-                curr_streamers.append(curr_streamer)
-                await asyncio.sleep(5)
-            last_streamers = curr_streamers
-            curr_streamers = []  # Reset List so it doesn't fill up infinitely
-
+            await _poller.poll(data.get_twitch_subscriptions())
+            await asyncio.sleep(_poller.interval)
         print('Shut Down Twitch Stream Update Listener, Bot logged off.')
@@ -1,8 +1,15 @@
+import array
+import asyncio
 import random
 
 import discord
 
 from src.util import embeds
+from src.util.data_cruncher import data
+
+LEFT = '\N{BLACK LEFT-POINTING TRIANGLE}'
+RIGHT = '\N{BLACK RIGHT-POINTING TRIANGLE}'
+CLICK_WINDOW = 0.4  # Clicks within this many Seconds are applied together as a single Edit
 
 
 class ClickableCustomReactionEmbed:
@@ -11,55 +18,121 @@ class ClickableCustomReactionEmbed:
         Build a ClickableCustomReactionEmbed, which is an Embedded message that contains multiple different Messages.
         Users can navigate through it by clicking on the Reactions that the Bot added on Creation.
         
+        Only a shuffled Order of the Custom Reactions is stored. The Embed for a Page is built when it is shown,
+        and the Pages next to the current one are kept around so that clicking back and forth is cheap.
+        
         :param title: The Title for the ClickableCustomReactionEmbed which will stay throughout all Navigation. 
         :param contents: A List Containing Custom Reactions in the following format:
-                         [ [ contents: str, author: str, creation date: struct_time, name: str ] ... ] 
+                         [ ( name: str, [ payload key: str, author: str, creation date: str, id: int, ... ] ) ... ]
+                         as returned by DataCruncher.get_all_custom_reactions_on_guild. 
         :param icon_link: An URL specifying the Icon to use for the Embed.
         """
-        # Item: [desc_or_link, added_by, timestamp, name]
-        self.embeds = list()
-        for idx, item in enumerate(contents):
-            self.embeds.append(discord.Embed())
-            if icon_link != '':
-                self.embeds[idx].set_thumbnail(url=icon_link)
-            self.embeds[idx].title = title
-            if item[0].startswith('http'):
-                self.embeds[idx].set_image(url=item[0])
-            else:
-                self.embeds[idx].description = item[0]
-            self.embeds[idx].set_footer(text=f'"{item[3]}" | Added by {item[1]}')
-            self.embeds[idx].timestamp = embeds.datetime_from_struct_time(item[2])
-        random.shuffle(self.embeds)
+        self.title = title
+        self.contents = contents
+        self.icon_link = icon_link
+        self.order = array.array('L', range(len(contents)))
+        random.shuffle(self.order)
+        self._pages = dict()
+        self._pending_offset = 0
+        self._pending_removals = set()
+        self._flush_task = None
         self.id = 0
         self.index = 0
         self.embedded_message = None
 
+    def _build_page(self, index: int):
+        # Item: (name, [payload_key, added_by, timestamp, id, version])
+        name, item = self.contents[self.order[index]]
+        contents = data.get_custom_reaction_payload(item[0])
+        if contents is None:
+            contents = '*This Custom Reaction has been removed.*'
+        embed = discord.Embed()
+        if self.icon_link != '':
+            embed.set_thumbnail(url=self.icon_link)
+        embed.title = self.title
+        if contents.startswith('http'):
+            embed.set_image(url=contents)
+        else:
+            embed.description = contents
+        embed.set_footer(text=f'"{name}" #{item[3]} | Added by {item[1]}')
+        embed.timestamp = embeds.datetime_from_struct_time(item[2])
+        return embed
+
+    def page(self, index: int):
+        """
+        Get the Embed for the Page at the given Index, and forget all Pages that are not next to it.
+        
+        :param index: The Index of the Page
+        :return: A discord.Embed for the Page
+        """
+        self._pages = {idx: self._pages.get(idx) or self._build_page(idx)
+                       for idx in (index - 1, index, index + 1) if 0 <= idx < len(self.order)}
+        return self._pages[index]
+
     async def send(self, channel):
         """
         Sends self as an Embed to the specified channel.
         
         :param channel: A discord.Channel object to be used as destination.
         """
-        self.embedded_message = await channel.send(embed=self.embeds[self.index])
+        self.embedded_message = await channel.send(embed=self.page(self.index))
         self.id = self.embedded_message.id
-        await self.embedded_message.add_reaction('\N{BLACK LEFT-POINTING TRIANGLE}')
-        await self.embedded_message.add_reaction('\N{BLACK RIGHT-POINTING TRIANGLE}')
+        await self.embedded_message.add_reaction(LEFT)
+        await self.embedded_message.add_reaction(RIGHT)
 
     async def move(self, right: bool, member):
         """
         Move the Embed Message either one further in the list of Custom Reactions, or in the opposite direction.
+        Moving past the first or last Custom Reaction does nothing.
+        
+        Clicks are not applied right away, but collected for CLICK_WINDOW Seconds. All Clicks collected in that
+        Window are then applied as a single Edit, so rapid Clicking does not queue up Requests.
          
         :param right: A boolean specifying whether to move Right or Left. 
         :param member: The discord.Member that added the Reaction to the Message. 
                        This is necessary to only remove the Reaction of the Member, not others. 
         """
-        await self.embedded_message.remove_reaction('\N{BLACK RIGHT-POINTING TRIANGLE}' if right
-                                                    else '\N{BLACK LEFT-POINTING TRIANGLE}', member)
-        self.index = self.index + 1 if right else self.index - 1
-        if 0 < self.index > len(self.embeds):
-            self.index = len(self.embeds)
-        next_contents = self.embeds[self.index]
-        await self.embedded_message.edit(embed=next_contents)
+        self._pending_offset += 1 if right else -1
+        self._pending_removals.add((RIGHT if right else LEFT, member))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_event_loop().create_task(self._flush())
+
+    async def _flush(self):
+        """
+        Apply all collected Clicks: edit the Embed once, and remove the Reactions of the Users who clicked.
+        """
+        await asyncio.sleep(CLICK_WINDOW)
+        while self._pending_offset or self._pending_removals:
+            offset, self._pending_offset = self._pending_offset, 0
+            removals, self._pending_removals = self._pending_removals, set()
+            requests = []
+            next_index = max(0, min(len(self.order) - 1, self.index + offset))
+            if next_index != self.index:
+                self.index = next_index
+                requests.append(self.embedded_message.edit(embed=self.page(self.index)))
+            requests.append(self._remove_reactions(removals))
+            try:
+                await asyncio.gather(*requests)
+            except discord.errors.HTTPException as err:
+                print(f'Failed to update Clickable Embed {self.id}: {err}')
+
+    async def _remove_reactions(self, removals: set):
+        """
+        Remove the given Reactions of Users. If there are many of them and the Bot may manage Messages
+        in the Channel, all Reactions are cleared at once and the Navigation Reactions are added again,
+        which takes fewer Requests.
+
+        :param removals: A Set of (emoji, member) Pairs
+        """
+        guild = self.embedded_message.guild
+        can_clear = guild is not None and \
+            self.embedded_message.channel.permissions_for(guild.me).manage_messages
+        if len(removals) > 3 and can_clear:
+            await self.embedded_message.clear_reactions()
+            await self.embedded_message.add_reaction(LEFT)
+            await self.embedded_message.add_reaction(RIGHT)
+        else:
+            await asyncio.gather(*(self.embedded_message.remove_reaction(emoji, member) for emoji, member in removals))
 
     async def remove(self):
         """
@@ -67,4 +140,4 @@ class ClickableCustomReactionEmbed:
         """
         await self.embedded_message.delete()
         self.id = 0
-        self.embeds = []
+        self._pages = dict()
@@ -0,0 +1,125 @@
+class Automaton:
+    def __init__(self, words=()):
+        """
+        An Aho-Corasick Automaton which finds all registered Words in a Text in a single Pass,
+        in Time linear in the Length of the Text - no matter how many Words are registered.
+
+        Words can be added and removed at any Time, and only the Links affected by the Change are updated:
+        every Node knows the Nodes whose Failure Link points to it, so a Change only walks the Part of the
+        Trie whose Strings end in the changed one. Removing a Word only unmarks its Node.
+
+        :param words: The Words to register initially
+        """
+        self._goto = [dict()]
+        self._word = [None]  # The Word ending in each Node, if any
+        self._fail = [0]
+        self._fail_children = [set()]  # The Nodes whose Failure Link points to each Node
+        self._output = [0]  # The nearest Node reachable through Failure Links which ends a Word
+        self._count = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str):
+        node = 0
+        for char in word:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = self._add_node(node, char)
+            node = next_node
+        if self._word[node] is None:
+            self._count += 1
+            self._word[node] = word
+            self._update_outputs(node)
+
+    def remove(self, word: str):
+        node = 0
+        for char in word:
+            node = self._goto[node].get(char)
+            if node is None:
+                return
+        if self._word[node] is not None:
+            self._count -= 1
+            self._word[node] = None
+            self._update_outputs(node)
+
+    def _add_node(self, parent: int, char: str) -> int:
+        """
+        Add a Node to the Trie and link it. Existing Nodes for which the new Node is now the longest proper Suffix
+        get it as their new Failure Link. Those are found below the Parent's Failure Subtree only.
+
+        :return: The new Node
+        """
+        fail = 0
+        if parent:
+            fail = self._fail[parent]
+            while fail and char not in self._goto[fail]:
+                fail = self._fail[fail]
+            fail = self._goto[fail].get(char, 0)
+        node = len(self._goto)
+        self._goto.append(dict())
+        self._word.append(None)
+        self._fail.append(fail)
+        self._fail_children.append(set())
+        self._fail_children[fail].add(node)
+        self._output.append(fail if self._word[fail] is not None else self._output[fail])
+        self._goto[parent][char] = node
+
+        # Nodes whose Strings end in the Parent's String, extended by the same Character, now fail to the new Node,
+        # unless a longer Suffix was found first. Their Output Links stay the same, as the new Node ends no Word yet.
+        stack = [x for x in self._fail_children[parent] if x != node]
+        while stack:
+            current = stack.pop()
+            child = self._goto[current].get(char)
+            if child is None:
+                stack.extend(self._fail_children[current])
+                continue
+            self._fail_children[self._fail[child]].discard(child)
+            self._fail[child] = node
+            self._fail_children[node].add(child)
+        return node
+
+    def _update_outputs(self, node: int):
+        """
+        Update the Output Links below a Node which just started or stopped ending a Word.
+        Nodes ending a Word themselves shield their own Failure Subtree.
+        """
+        nearest = node if self._word[node] is not None else self._output[node]
+        stack = list(self._fail_children[node])
+        while stack:
+            current = stack.pop()
+            self._output[current] = nearest
+            if self._word[current] is None:
+                stack.extend(self._fail_children[current])
+
+    def find(self, text: str):
+        """
+        Find all registered Words in a Text.
+
+        :param text: The Text to search
+        :return: A Generator of (start index, word) Tuples, in the Order in which the Words end
+        """
+        goto, fail, words, output = self._goto, self._fail, self._word, self._output
+        node = 0
+        for idx, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            match = node if words[node] is not None else output[node]
+            while match:
+                yield idx - len(words[match]) + 1, words[match]
+                match = output[match]
+
+    def find_words(self, text: str):
+        """
+        Find all registered Words that appear as whole Words in a Text.
+
+        :param text: The Text to search
+        :return: A Generator of the Words found
+        """
+        for start, word in self.find(text):
+            end = start + len(word)
+            if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                yield word
+
+    def __len__(self):
+        return self._count
@@ -0,0 +1,93 @@
+import unicodedata
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize an Answer or Guess so that Accents, Punctuation, Case and Whitespace do not matter.
+
+    :param text: The Text to normalize
+    :return: The normalized Text, e.g. "Traveler's  Call" -> "travelers call"
+    """
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c) and not unicodedata.category(c).startswith('P'))
+    return ' '.join(text.split())
+
+
+def allowed_distance(answer: str) -> int:
+    """
+    Get the maximum Edit Distance that is still accepted as a Match for the given normalized Answer.
+    Short Answers and Numbers must match exactly.
+
+    :param answer: The normalized Answer
+    :return: The maximum amount of Edits allowed
+    """
+    if answer.isdigit() or len(answer) <= 4:
+        return 0
+    elif len(answer) <= 8:
+        return 1
+    return 2
+
+
+def within_distance(a: str, b: str, max_distance: int) -> bool:
+    """
+    Check whether the Levenshtein Distance between two Strings is at most max_distance.
+    Only a Band of width 2 * max_distance + 1 is computed, and the Check stops as soon as
+    every Cell in the current Row exceeds the Threshold.
+
+    :param a: The first String
+    :param b: The second String
+    :param max_distance: The maximum Distance to accept
+    :return: True if the Strings are close enough, False otherwise
+    """
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    too_far = max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        low, high = max(1, i - max_distance), min(len(b), i + max_distance)
+        current = [too_far] * (len(b) + 1)
+        current[0] = i if i <= max_distance else too_far
+        row_min = current[0]
+        char = a[i - 1]
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (char != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost if cost < too_far else too_far
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_distance:
+            return False
+        previous = current
+    return previous[len(b)] <= max_distance
+
+
+class Answers:
+    __slots__ = ('exact', 'fuzzy')
+
+    def __init__(self, question: dict):
+        """
+        The precomputed, normalized Answers of a single Trivia Question.
+
+        :param question: The Question, with its Answer under 'a' and optional alternate Spellings under 'alt'
+        """
+        self.exact = frozenset(normalize(str(x)) for x in [question['a']] + question.get('alt', []))
+        self.fuzzy = tuple((x, allowed_distance(x)) for x in self.exact if allowed_distance(x) > 0)
+
+    def match(self, guess: str) -> bool:
+        """
+        Check whether a Guess matches any of the Answers.
+
+        :param guess: The Guess as sent by the User
+        :return: True if the Guess is correct, False otherwise
+        """
+        guess = normalize(guess)
+        if guess in self.exact:
+            return True
+        return any(within_distance(guess, answer, distance) for answer, distance in self.fuzzy)
@@ -0,0 +1,152 @@
+import array
+import os
+import struct
+import sys
+import time
+
+# Resolution (in seconds) and amount of Slots for every Downsampling Tier.
+# Each Tier is a Ring Buffer indexed by (timestamp // resolution) % slots, so a Slot is simply
+# overwritten once its Bucket comes around again - no matter how long the Bot has been running.
+TIERS = {
+    'minute': (60, 60),      # the last hour
+    'hour': (3600, 168),     # the last week
+    'day': (86400, 365)      # the last year
+}
+
+# Every Slot holds the Bucket Number and the Balance, both as signed 64-bit Integers.
+BYTES_PER_SERIES = sum(slots for _, slots in TIERS.values()) * 2 * 8
+
+# The User ID under which the total Supply of a Guild is tracked
+SUPPLY = 0
+
+_MAGIC = b'BCH1'
+_HEADER = struct.Struct('<4sI')
+_KEY = struct.Struct('<QQ')
+
+
+class _Series:
+    """
+    The Balance History of a single User (or Guild Supply), consisting of one fixed-size Ring Buffer per Tier.
+    """
+    __slots__ = ('buckets', 'values')
+
+    def __init__(self):
+        self.buckets = {tier: array.array('q', [-1]) * slots for tier, (_, slots) in TIERS.items()}
+        self.values = {tier: array.array('q', [0]) * slots for tier, (_, slots) in TIERS.items()}
+
+    def record(self, value: int, now: int):
+        for tier, (resolution, slots) in TIERS.items():
+            bucket = now // resolution
+            slot = bucket % slots
+            self.buckets[tier][slot] = bucket
+            self.values[tier][slot] = value  # Last Value within a Bucket wins
+
+    def points(self, tier: str, now: int):
+        """
+        Get the Balance at the End of each Bucket within the Span of the given Tier, oldest first.
+        Buckets without a Snapshot carry the previous Value forward.
+
+        :param tier: The Tier to read, one of TIERS
+        :param now: The current UNIX Timestamp
+        :return: A List of (bucket start timestamp, balance) Tuples, or an empty List if nothing was recorded
+        """
+        resolution, slots = TIERS[tier]
+        buckets, values = self.buckets[tier], self.values[tier]
+        newest = now // resolution
+        result = []
+        last = None
+        for bucket in range(newest - slots + 1, newest + 1):
+            slot = bucket % slots
+            if buckets[slot] == bucket:
+                last = values[slot]
+            if last is not None:
+                result.append((bucket * resolution, last))
+        return result
+
+
+class BalanceHistory:
+    def __init__(self, file_path: str):
+        """
+        Keeps Balance Snapshots of Users, and the total Supply of Guilds, in fixed-size Ring Buffers.
+        Every tracked Series takes exactly BYTES_PER_SERIES Bytes of Buffer Space, independent of Uptime.
+
+        :param file_path: The Path of the binary File used to persist the History
+        """
+        self._file_path = file_path
+        self._series = dict()
+        self.load()
+
+    def record(self, guild_id: int, user_id: int, value: int, now: int = None):
+        """
+        Record a Balance Snapshot for the given User on the given Guild.
+
+        :param guild_id: The Guild on which the Balance changed
+        :param user_id: The User whose Balance changed, or SUPPLY for the Guild's total Supply
+        :param value: The new Balance
+        :param now: An optional UNIX Timestamp to record the Snapshot at, defaults to the current Time
+        """
+        key = (int(guild_id), int(user_id))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        series.record(value, int(time.time()) if now is None else now)
+
+    def points(self, guild_id: int, user_id: int, tier: str, now: int = None):
+        """
+        Get the recorded Balance Points of a User on a Guild for the given Tier.
+
+        :param guild_id: The Guild to look up
+        :param user_id: The User to look up, or SUPPLY for the Guild's total Supply
+        :param tier: The Tier to read, one of TIERS
+        :param now: An optional UNIX Timestamp to read relative to, defaults to the current Time
+        :return: A List of (timestamp, balance) Tuples, oldest first
+        """
+        series = self._series.get((int(guild_id), int(user_id)))
+        if series is None:
+            return []
+        return series.points(tier, int(time.time()) if now is None else now)
+
+    def load(self):
+        try:
+            with open(self._file_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return
+        if len(raw) < _HEADER.size or raw[:len(_MAGIC)] != _MAGIC:
+            print(f'Ignoring Balance History in {self._file_path}, unknown Format.')
+            return
+        _, count = _HEADER.unpack_from(raw, 0)
+        if len(raw) != _HEADER.size + count * (_KEY.size + BYTES_PER_SERIES):
+            print(f'Ignoring Balance History in {self._file_path}, expected {count} Series '
+                  f'but the File has {len(raw)} Bytes.')
+            return
+        offset = _HEADER.size
+        for _ in range(count):
+            key = _KEY.unpack_from(raw, offset)
+            offset += _KEY.size
+            series = _Series()
+            for tier, (_, slots) in TIERS.items():
+                for buffer in (series.buckets[tier], series.values[tier]):
+                    chunk = array.array('q')
+                    chunk.frombytes(raw[offset:offset + slots * 8])
+                    if sys.byteorder != 'little':
+                        chunk.byteswap()
+                    buffer[:] = chunk
+                    offset += slots * 8
+            self._series[key] = series
+
+    def save(self):
+        print(f'Saving Balance History in {self._file_path}... ', end='')
+        tmp_path = self._file_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, len(self._series)))
+            for key, series in self._series.items():
+                f.write(_KEY.pack(*key))
+                for tier in TIERS:
+                    for buffer in (series.buckets[tier], series.values[tier]):
+                        if sys.byteorder != 'little':
+                            buffer = array.array('q', buffer)
+                            buffer.byteswap()
+                        f.write(buffer.tobytes())
+        os.replace(tmp_path, self._file_path)
+        print('done.')
@@ -27,8 +27,8 @@ def is_mod(func):
 
 
 def is_in_guild(func):
-    def func_wrapper(msg):
+    def func_wrapper(msg, *args, **kwargs):
         if isinstance(msg.channel, discord.abc.GuildChannel):
-            return func(msg)
+            return func(msg, *args, **kwargs)
 
     return func_wrapper
@@ -1,11 +1,23 @@
+import asyncio
 import datetime
 import discord
 import json
 import os
-import random
+import time
+
+from src.util import reaction_transfer
+from src.util.aho_corasick import Automaton
+from src.util.answer_matching import Answers
+from src.util.balance_history import BalanceHistory, SUPPLY
+from src.util.question_sampler import QuestionSampler
+from src.util.reaction_store import CustomReactionStore
+from src.util.reaction_usage import ReactionUsage
+from src.util.trivia_scoreboard import TriviaScoreboard
+from src.util.ttl_map import TTLMap
 
 print('Loading Data Holder...')
 config_dir = os.path.join(os.getcwd(), 'config')
+CONFIG_SAVE_INTERVAL = 30  # Seconds between writing Configs that were marked with save_later
 
 
 class DataCruncher:
@@ -13,6 +25,8 @@ class DataCruncher:
         # Load all Configs
         self._configs = dict()
         for file_name in os.listdir(config_dir):
+            if not file_name.endswith('.json'):
+                continue
             print(f'Loading Config {file_name}... ', end='')
             # Remove .json Extension for simpler access
             self._configs[file_name[:-5]] = self.load_config(file_name)
@@ -21,9 +35,47 @@ class DataCruncher:
         # Do not save the following files
         self._do_not_save = 'trivia'
 
-        # Trivia User List for Timeout
-        self._trivia_users = []
+        # Configs which changed since they were last written, see save_later
+        self._unsaved = set()
+
+        # Custom Reactions with stable IDs, which can be edited and removed in constant Time
+        self._custom_reactions = CustomReactionStore(self._configs['custom_reactions'])
+
+        # How often each Custom Reaction is used, counted in Memory and saved in Batches
+        self._reaction_usage = ReactionUsage(self._configs.setdefault('reaction_usage', dict()))
+
+        # Custom Reactions which fire when their Name appears anywhere in a Message, per Guild
+        self._trigger_automata = {guild_id: Automaton(names)
+                                  for guild_id, names in self._configs.setdefault('triggers', dict()).items()}
+
+        # Normalized Trivia Answers, in the same order as the Questions of each Topic
+        self._trivia_answers = {topic: [Answers(question) for question in trivia['questions']]
+                                for topic, trivia in self._configs['trivia'].items()}
+
+        # Per-Guild Progress through the Trivia Questions of each Topic
+        self._question_sampler = QuestionSampler(self._configs.setdefault('trivia_progress', dict()))
+
+        # All-Time and seasonal Trivia Statistics
+        self._trivia_scoreboard = TriviaScoreboard(self._configs.setdefault('trivia_scores', dict()),
+                                                   os.path.join(config_dir, 'trivia_results.bin'))
+
+        # Trivia Users on Timeout, kept across Restarts
         self._TRIVIA_TIMEOUT_PER_USER = 10
+        self._trivia_users = TTLMap(resolution=10, slots=64)
+        self._trivia_users.load({int(k): v for k, v in self._configs.setdefault('trivia_cooldowns', dict()).items()})
+
+        # Twitch Subscriptions per Channel, and the Channels subscribed to each Streamer
+        twitch = self._configs.setdefault('twitch', dict())
+        if 'announcement_channel' in twitch:  # Single global Subscription List from before Subscriptions per Channel
+            twitch['channels'] = {twitch.pop('announcement_channel'): twitch.pop('subscriptions', [])}
+        self._twitch_subscribers = dict()
+        for channel_id, streamers in twitch.setdefault('channels', dict()).items():
+            for streamer in streamers:
+                self._twitch_subscribers.setdefault(streamer.lower(), set()).add(channel_id)
+
+        # Balance Snapshots for Currency, and the cached total Supply per Guild
+        self.balance_history = BalanceHistory(os.path.join(config_dir, 'currency_history.bin'))
+        self._currency_supply = dict()
 
         print('Done loading Data Holder.')
 
@@ -37,11 +89,44 @@ class DataCruncher:
     def save_config(json_data, file_path):
         path = os.path.join(config_dir, file_path)
         print(f'Saving Config in {path}... ', end='')
-        with open(file_path, 'w') as f:
-            json.dump(json_data, f)
+        with open(path, 'w') as f:
+            json.dump(json_data, f, indent=4)
+        print('done.')
+
+    def save_later(self, name: str):
+        """
+        Mark a Config as changed, to be written by the next flush_configs instead of right away.
+        Used for Configs which change on the Message Path, so Messages don't wait for the Disk.
+
+        :param name: The Name of the Config, without the .json Extension
+        """
+        self._unsaved.add(name)
+
+    def flush_configs(self):
+        """
+        Write all Configs that were marked with save_later since they were last written.
+        """
+        unsaved, self._unsaved = self._unsaved, set()
+        if 'trivia_cooldowns' in unsaved:
+            self._configs['trivia_cooldowns'] = self._trivia_users.dump()
+        for name in unsaved:
+            self.save_config(self._configs[name], f'{name}.json')
+
+    async def run_config_flush(self, interval: float = CONFIG_SAVE_INTERVAL):
+        """
+        Periodically write the Configs marked with save_later. Runs forever.
+
+        :param interval: The Time between two Writes in Seconds
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.flush_configs()
 
     def save_all(self):
         print('Saving all Configs...')
+        self._unsaved = set()
+        self._configs['trivia_cooldowns'] = self._trivia_users.dump()
+        self._reaction_usage.flush()
         for file_name in self._configs:
             if file_name in self._do_not_save:
                 continue
@@ -51,6 +136,7 @@ class DataCruncher:
             with open(path, 'w') as f:
                 json.dump(self._configs[file_name[:-5]], f, indent=4)
             print(f'done.')
+        self.balance_history.save()
         print('Done saving Configs.')
 
     def get_prefix(self, key: str):
@@ -60,20 +146,39 @@ class DataCruncher:
             print(f'Error trying to access Prefixes at key {key}')
             return None
 
-    def add_custom_reaction(self, guild_id: str, name: str, contents: str, added_by: str):
-        guild_id = str(guild_id)
-        name = name.lower()
-        if guild_id not in self._configs['custom_reactions']:
-            self._configs['custom_reactions'][guild_id] = dict()
-        if name not in self._configs['custom_reactions'][guild_id]:
-            self._configs['custom_reactions'][guild_id][name] = []
-        self._configs['custom_reactions'][guild_id][name].append([contents, added_by,
-                                                                  str(datetime.datetime.now())[:-7]])
-        print(f'Added new Custom Reaction for {guild_id} named {name}')
-
-    def remove_custom_reaction(self, guild_id, name):
-        # return true or false based on success
-        pass
+    def add_custom_reaction(self, guild_id: str, name: str, contents: str, added_by: str, added_by_id: int = None):
+        reaction = self._custom_reactions.add(guild_id, name.lower(), contents, added_by, author_id=added_by_id)
+        print(f'Added new Custom Reaction for {guild_id} named {name} with ID {reaction[3]}')
+        return reaction[3]
+
+    def edit_custom_reaction(self, guild_id: int, reaction_id: int, contents: str):
+        """
+        Replace the Contents of a Custom Reaction.
+
+        :param guild_id: The Guild on which the Custom Reaction was added
+        :param reaction_id: The ID of the Custom Reaction
+        :param contents: The new Contents
+        :return: True if the Custom Reaction was edited, False if it was not found on the Guild
+        """
+        return self._custom_reactions.edit(guild_id, reaction_id, contents) is not None
+
+    def remove_custom_reaction(self, guild_id: int, reaction_id: int):
+        """
+        Remove a Custom Reaction. Its Slot is only marked as deleted, and cleaned up by the background Compaction.
+
+        :param guild_id: The Guild on which the Custom Reaction was added
+        :param reaction_id: The ID of the Custom Reaction
+        If it was the last Custom Reaction with its Name, the Name also stops being a Trigger.
+
+        :return: True if the Custom Reaction was removed, False if it was not found on the Guild
+        """
+        name = self._custom_reactions.remove(guild_id, reaction_id)
+        if name is not None:
+            self._reaction_usage.forget(guild_id, reaction_id)
+            if self._custom_reactions.get_random(guild_id, name) is None:
+                self._remove_custom_reaction_trigger(guild_id, name)
+            print(f'Removed Custom Reaction {reaction_id} named {name} on {guild_id}')
+        return name is not None
 
     def get_custom_reaction(self, guild_id: int, name: str):
         """
@@ -81,50 +186,270 @@ class DataCruncher:
         
         :param guild_id: The Guild for which to access the Custom Reaction 
         :param name: The Name for which to get a Custom Reaction
-        :return: None if the Guild or the Custom Reaction were not found.
+        :return: The Custom Reaction as [contents, author, creation date, id, version],
+                 or None if the Guild or the Custom Reaction were not found.
         """
-        guild_id = str(guild_id)
-        name = name.lower()
-        try:
-            guild = self._configs['custom_reactions'][guild_id]
-        except KeyError:
-            return None
-        else:
-            try:
-                reaction = guild[name]
-            except KeyError:
-                return None
-            else:
-                return reaction[random.randrange(0, len(reaction))]
+        return self._custom_reactions.get_random(guild_id, name.lower())
+
+    def get_custom_reaction_by_id(self, guild_id: int, reaction_id: int):
+        """
+        Get a Custom Reaction on the Guild specified by its ID.
+
+        :param guild_id: The Guild for which to access the Custom Reaction
+        :param reaction_id: The ID of the Custom Reaction
+        :return: A (name, [payload key, author, creation date, id, version(, author id)]) Tuple,
+                 or None if the Custom Reaction was not found on the Guild. The Author ID is missing on
+                 Custom Reactions that were imported or added before it was stored.
+        """
+        return self._custom_reactions.get(guild_id, reaction_id)
+
+    def get_custom_reaction_payload(self, key: str):
+        """
+        Get the Contents of a Custom Reaction from its Payload Key.
+
+        :param key: The Payload Key, as found in the Custom Reactions returned by get_all_custom_reactions_on_guild
+        :return: The Contents, or None if the Custom Reaction has been removed in the meantime.
+        """
+        return self._custom_reactions.payload(key)
 
     def get_all_custom_reactions_on_guild(self, guild_id: int):
         """
         Returns a List of all Custom Reactions on a Guild, in the following format:
-        [ [contents, author, creation date, name], ... ]
+        [ (name, [payload key, author, creation date, id, version]), ... ]
+        The Custom Reactions are not copied, so they must not be modified.
         
         :param guild_id: The Guild for which to get all Custom Reactions. 
         :return: A List of all Custom Reactions, or None if none were found for the specified Guild.
         """
+        return self._custom_reactions.all_on_guild(guild_id)
+
+    def search_custom_reactions(self, guild_id: int, query: str, limit: int = 10):
+        """
+        Search the Custom Reactions on a Guild by their Name, Contents and Author.
+        The Search Index for the Guild is built on the first Search, and kept up to date afterwards.
+
+        :param guild_id: The Guild on which to search
+        :param query: The Words to search for
+        :param limit: The maximum amount of Results
+        :return: A List of matching Custom Reactions, best first, in the Format
+                 [ [contents, author, creation date, name, id], ... ]
+        """
+        return self._custom_reactions.search(guild_id, query, limit)
+
+    def export_custom_reactions(self, guild_id: int):
+        """
+        Export the Custom Reactions of a Guild as NDJSON Lines, in Batches.
+
+        :param guild_id: The Guild to export
+        :return: A Generator of Lists of NDJSON Lines
+        """
+        return reaction_transfer.export_lines(self._custom_reactions, guild_id)
+
+    def import_custom_reactions(self, guild_id: int, lines):
+        """
+        Import NDJSON Lines as Custom Reactions on a Guild, in Batches. Duplicates are skipped.
+
+        :param guild_id: The Guild to import into
+        :param lines: An Iterable of NDJSON Lines
+        :return: A Generator yielding the Statistics of the Import after every Batch
+        """
+        return reaction_transfer.import_lines(self._custom_reactions, guild_id, lines)
+
+    def save_custom_reactions(self):
+        self.save_config(self._configs['custom_reactions'], 'custom_reactions.json')
+
+    def record_custom_reaction_use(self, guild_id: int, reaction_id: int):
+        """
+        Count a Use of a Custom Reaction. This only touches Memory, the Counts are saved periodically.
+
+        :param guild_id: The Guild on which the Custom Reaction was used
+        :param reaction_id: The ID of the Custom Reaction
+        """
+        self._reaction_usage.record(guild_id, reaction_id)
+
+    def get_top_custom_reactions(self, guild_id: int, amount: int = 10):
+        """
+        Get the most used Custom Reactions on a Guild.
+
+        :param guild_id: The Guild for which to get the most used Custom Reactions
+        :param amount: The maximum amount of Custom Reactions to return
+        :return: A List of (name, reaction_id, uses) Tuples, most used first
+        """
+        top = []
+        for reaction_id, uses in self._reaction_usage.top(guild_id, amount):
+            found = self._custom_reactions.get(guild_id, reaction_id)
+            if found is not None:
+                top.append((found[0], reaction_id, uses))
+        return top
+
+    def get_unused_custom_reactions(self, guild_id: int, days: int):
+        """
+        Get the Custom Reactions on a Guild which were not used in the given amount of Days.
+        Custom Reactions that were never used count as used when they were added.
+
+        :param guild_id: The Guild for which to get the unused Custom Reactions
+        :param days: The amount of Days
+        :return: A List of (name, reaction_id, last used) Tuples, where last used is a UNIX Timestamp
+                 or None if the Custom Reaction was never used, least recently used first
+        """
+        cutoff = time.time() - days * 24 * 60 * 60
+        unused = []
+        for name, entry in self._custom_reactions.all_on_guild(guild_id) or []:
+            last_used = self._reaction_usage.last_used(guild_id, entry[3])
+            if last_used is None:
+                try:
+                    since = datetime.datetime.strptime(entry[2], '%Y-%m-%d %H:%M:%S').timestamp()
+                except (ValueError, TypeError):
+                    since = 0
+            else:
+                since = last_used
+            if since < cutoff:
+                unused.append((name, entry[3], last_used))
+        return sorted(unused, key=lambda x: x[2] or 0)
+
+    async def flush_custom_reaction_usage(self):
+        """
+        Periodically save how often each Custom Reaction was used. Runs forever.
+        """
+        await self._reaction_usage.run_flush(
+            lambda: self.save_config(self._configs['reaction_usage'], 'reaction_usage.json'))
+
+    async def compact_custom_reactions(self):
+        """
+        Periodically clean up removed Custom Reactions in the Background. Runs forever.
+        """
+        await self._custom_reactions.run_compaction()
+
+    def toggle_custom_reaction_trigger(self, guild_id: int, name: str):
+        """
+        Make a Custom Reaction fire whenever its Name appears as a Word in a Message, or stop it from doing so.
+
+        :param guild_id: The Guild on which to toggle the Trigger
+        :param name: The Name of the Custom Reaction
+        :return: True if the Custom Reaction is now a Trigger, False if it no longer is one
+        """
         guild_id = str(guild_id)
-        all_custom_reactions = list()
-        try:
-            for namespace in self._configs['custom_reactions'][guild_id]:
-                for custom_reaction in self._configs['custom_reactions'][guild_id][namespace]:
-                    all_custom_reactions.append([custom_reaction[0], custom_reaction[1],
-                                                 custom_reaction[2], namespace])
-        except KeyError:
+        name = name.lower()
+        if name in self._configs['triggers'].get(guild_id, []):
+            self._remove_custom_reaction_trigger(guild_id, name)
+            return False
+        names = self._configs['triggers'].setdefault(guild_id, [])
+        automaton = self._trigger_automata.setdefault(guild_id, Automaton())
+        names.append(name)
+        automaton.add(name)
+        self.save_later('triggers')
+        return True
+
+    def _remove_custom_reaction_trigger(self, guild_id: int, name: str):
+        guild_id = str(guild_id)
+        names = self._configs['triggers'].get(guild_id, [])
+        if name in names:
+            names.remove(name)
+            self._trigger_automata[guild_id].remove(name)
+            self.save_later('triggers')
+
+    def find_custom_reaction_trigger(self, guild_id: int, text: str):
+        """
+        Find the first Trigger of the given Guild appearing as a Word in a Text.
+
+        :param guild_id: The Guild whose Triggers to look for
+        :param text: The Text to scan, usually the Contents of a Message
+        :return: The Name of the triggered Custom Reaction, or None if there was none
+        """
+        automaton = self._trigger_automata.get(str(guild_id))
+        if not automaton:
             return None
-        else:
-            return all_custom_reactions
+        return next(automaton.find_words(text.lower()), None)
 
     def get_twitch_subscriptions(self):
-        try:
-            return self._configs['twitch']['subscriptions']
-        except KeyError:
-            return None
+        """
+        Get all Streamers to which any Channel is subscribed. Every Streamer is only returned once,
+        no matter how many Channels follow them.
+
+        :return: A List of Streamer Names
+        """
+        return list(self._twitch_subscribers)
+
+    def get_twitch_subscribers(self, streamer: str):
+        """
+        Get the Channels which are subscribed to a Streamer.
+
+        :param streamer: The Name of the Streamer
+        :return: A List of Channel IDs
+        """
+        return [int(x) for x in self._twitch_subscribers.get(streamer.lower(), ())]
+
+    def get_channel_twitch_subscriptions(self, channel_id: int):
+        """
+        Get the Streamers to which a Channel is subscribed.
+
+        :param channel_id: The Channel for which to get the Subscriptions
+        :return: A List of Streamer Names
+        """
+        return self._configs['twitch']['channels'].get(str(channel_id), [])
 
-    def get_stream_announcement_channel(self):
-        return int(self._configs['twitch']['announcement_channel'])
+    def add_twitch_subscription(self, channel_id: int, streamer: str):
+        """
+        Announce in a Channel when a Streamer goes online or offline.
+
+        :param channel_id: The Channel in which to send the Announcements
+        :param streamer: The Name of the Streamer
+        :return: True if the Subscription was added, False if it already existed
+        """
+        streamer = streamer.lower()
+        streamers = self._configs['twitch']['channels'].setdefault(str(channel_id), [])
+        if streamer in streamers:
+            return False
+        streamers.append(streamer)
+        self._twitch_subscribers.setdefault(streamer, set()).add(str(channel_id))
+        self.save_later('twitch')
+        return True
+
+    def remove_twitch_subscription(self, channel_id: int, streamer: str):
+        """
+        Stop announcing a Streamer in a Channel.
+
+        :param channel_id: The Channel in which the Announcements were sent
+        :param streamer: The Name of the Streamer
+        :return: True if the Subscription was removed, False if there was none
+        """
+        streamer = streamer.lower()
+        streamers = self._configs['twitch']['channels'].get(str(channel_id), [])
+        if streamer not in streamers:
+            return False
+        streamers.remove(streamer)
+        if not streamers:
+            del self._configs['twitch']['channels'][str(channel_id)]
+        subscribers = self._twitch_subscribers[streamer]
+        subscribers.discard(str(channel_id))
+        if not subscribers:
+            del self._twitch_subscribers[streamer]
+        self.save_later('twitch')
+        return True
+
+    def get_media_cache(self):
+        """
+        Get the State of the Media Cache, in the Format
+        { "storage_channel": channel_id or null, "hashes": { "sha256": attachment_url }, "sources": { "url": "sha256" } }.
+        Caching is disabled as long as no Storage Channel is set.
+        """
+        cache = self._configs.setdefault('media_cache', dict())
+        cache.setdefault('storage_channel', None)
+        cache.setdefault('hashes', dict())
+        cache.setdefault('sources', dict())
+        return cache
+
+    def save_media_cache(self):
+        self.save_config(self._configs['media_cache'], 'media_cache.json')
+
+    def set_media_storage_channel(self, channel_id: int):
+        """
+        Set the Channel to which cached Media is uploaded, which also enables the Media Cache.
+
+        :param channel_id: The ID of the Storage Channel
+        """
+        self.get_media_cache()['storage_channel'] = channel_id
+        self.save_media_cache()
 
     def get_moderators_and_above(self, guild_id: int):
         guild_id = str(guild_id)
@@ -336,11 +661,39 @@ class DataCruncher:
         :param amount: The amount by which to modify the Currency
         :return The new amount of Currency from the User.
         """
+        supply = self.get_currency_supply(guild_id) + amount
         user = self._get_currency_user(str(member.id), str(guild_id))
         user['name'] = member.display_name
         user['amount'] += amount
+        self._currency_supply[str(guild_id)] = supply
+        self.balance_history.record(guild_id, member.id, user['amount'])
+        self.balance_history.record(guild_id, SUPPLY, supply)
         return user['amount']
 
+    def get_currency_supply(self, guild_id: int):
+        """
+        Get the total amount of Currency held by all Users on the given Guild.
+
+        :param guild_id: The Guild ID for which to get the Supply
+        :return: The Sum of all User Balances on the Guild
+        """
+        guild_id = str(guild_id)
+        if guild_id not in self._currency_supply:
+            users = self._get_currency_guild(guild_id)['users']
+            self._currency_supply[guild_id] = sum(x['amount'] for x in users.values())
+        return self._currency_supply[guild_id]
+
+    def get_balance_history(self, guild_id: int, user_id: int, tier: str):
+        """
+        Get the recorded Balance over Time of a User, or of the Guild's Supply if the User ID is 0.
+
+        :param guild_id: The Guild for which to get the History
+        :param user_id: The User for which to get the History, or 0 for the Guild's total Supply
+        :param tier: The Resolution of the History, one of 'minute', 'hour' or 'day'
+        :return: A List of (timestamp, amount) Tuples, oldest first
+        """
+        return self.balance_history.points(guild_id, user_id, tier)
+
     def get_currency_guild_users(self, guild_id: int):
         """
         Get the dictionary of Users with their name, ID and Money on the given Guild.
@@ -361,6 +714,15 @@ class DataCruncher:
             self._configs['league'][guild_id] = {'users': []}
         return self._configs['league'][guild_id]
 
+    def get_league_cache(self):
+        """
+        Get the persistent Cache of Riot API Lookups, in the Format { "kind": { "key": [value, fetched at] } }.
+        """
+        return self._configs.setdefault('league_cache', dict())
+
+    def save_league_cache(self):
+        self.save_config(self._configs['league_cache'], 'league_cache.json')
+
     def get_league_guild_users(self, guild_id: int):
         """
         Get the people who are in the User Array for the given Guild.
@@ -405,6 +767,27 @@ class DataCruncher:
         """
         return self._configs['trivia'].get(name, None)
 
+    def get_trivia_answers(self, name: str, index: int):
+        """
+        Get the precomputed Answers for a single Trivia Question.
+
+        :param name: The topic of the Question
+        :param index: The Index of the Question within the topic
+        :return: An Answers Object which can be used to check Guesses
+        """
+        return self._trivia_answers[name][index]
+
+    def draw_trivia_question(self, guild_id: int, name: str):
+        """
+        Draw the next Question for a Trivia Game on the given Guild. Questions do not repeat
+        across Games on the same Guild until every Question of the topic has been asked.
+
+        :param guild_id: The Guild on which the Question will be asked
+        :param name: The topic of the Question
+        :return: The Index of the Question within the topic
+        """
+        return self._question_sampler.draw(guild_id, name, len(self._configs['trivia'][name]['questions']))
+
     def get_all_trivia_topics(self):
         """
         Get all Available Trivia Topics
@@ -415,30 +798,24 @@ class DataCruncher:
 
     def get_trivia_timeout_list(self):
         """
-        Get the List of Users on the Trivia Timeout List
+        Get the Users on the Trivia Timeout List
         
-        :return: A list of Users on the Trivia Timeout List in the Format [ [user_id, datetime], ... ] 
+        :return: A dictionary of Users on the Trivia Timeout List in the Format { user_id: [expiry timestamp, None] }
         """
-        return self._trivia_users
+        return self._trivia_users.dump()
 
     def timeout_trivia_user(self, user_id: int) -> bool:
         """
-        Set the trivia User timeout. If the datetime associated with the User is less than 5 minutes ago,
-        this will return False. Otherwise, it will return True to indicate the new datetime has been set 
-        and / or no previous were set.
+        Set the trivia User timeout. If the User is still on Timeout, this will return False.
+        Otherwise, it will return True to indicate the new Timeout has been set.
         
         :param user_id: The User ID for which to get / set the Timeout 
         :return: True or False, see above
         """
-        found = False
-        for some_user_pair in self._trivia_users:
-            if some_user_pair[0] == user_id:
-                if datetime.datetime.now() - some_user_pair[1] > datetime.timedelta(minutes=10):
-                    some_user_pair[1] = datetime.datetime.now()
-                    return True
-                return False
-        if not found:
-            self._trivia_users.append([user_id, datetime.datetime.now()])
+        if user_id in self._trivia_users:
+            return False
+        self._trivia_users.set(user_id, ttl=self._TRIVIA_TIMEOUT_PER_USER * 60)
+        self.save_later('trivia_cooldowns')
         return True
 
     def timeout_user_is_not_being_time_outed(self, user_id: int) -> bool:
@@ -449,13 +826,48 @@ class DataCruncher:
         :param user_id: The User ID for which to check if it'S being timeouted 
         :return: True or False, see above.
         """
-        for some_user_pair in self._trivia_users:
-            if some_user_pair[0] == user_id:
-                if datetime.datetime.now() - some_user_pair[1] > datetime.timedelta(minutes=10):
-                    return True
-                return False
-        return True
+        return user_id not in self._trivia_users
+
+    def record_trivia_game(self, guild_id: int, results: dict, winner_id: int = None):
+        """
+        Record the Results of a finished Trivia Game. The Game is appended to the Results Log right away,
+        the updated Statistics are saved with the next flush_configs.
+
+        :param guild_id: The Guild on which the Game was played
+        :param results: The Results per Participant, in the Format { user_id: [correct, guesses, answer_ms] }
+        :param winner_id: The User who won the Game, if anybody did
+        """
+        self._trivia_scoreboard.record_game(guild_id, results, winner_id)
+        self.save_later('trivia_scores')
+
+    def get_trivia_top(self, guild_id: int, season: str = 'all'):
+        """
+        Get the best Trivia Players on a Guild.
+
+        :param guild_id: The Guild for which to get the best Players
+        :param season: The Season, e.g. "2017-Q2", or "all" for all-time Statistics
+        :return: A List of (user_id, [games, wins, correct, guesses, answer_ms]) Tuples, best first
+        """
+        return self._trivia_scoreboard.top(guild_id, season)
+
+    def get_trivia_games(self):
+        """
+        Get the Trivia Games that were running when they were last saved.
+
+        :return: A dictionary in the Format { "channel_id": { "guild": guild_id, "topic": "xyz", ... }, ... }
+        """
+        return self._configs.get('trivia_games', {})
+
+    def set_trivia_games(self, games: dict):
+        """
+        Replace the saved running Trivia Games and write them to disk right away.
+        Called periodically by the Trivia Router, so that Games can be resumed even if the Bot does not
+        shut down cleanly.
+
+        :param games: A dictionary in the Format described in get_trivia_games
+        """
+        self._configs['trivia_games'] = games
+        self.save_config(games, 'trivia_games.json')
 
 # One central data Object to prevent Errors with multiple accesses to the Configurations
 data = DataCruncher()
-
@@ -1,7 +1,15 @@
+import collections
 import datetime
 import discord.embeds
 from time import strptime, mktime
 
+# Prebuilt Embeds for Custom Reactions by (ID, Version), least recently used first
+_custom_reaction_embeds = collections.OrderedDict()
+CUSTOM_REACTION_CACHE_SIZE = 512
+
+# Prebuilt Embeds for Replies which never change, by their Description
+_static_embeds = dict()
+
 
 def datetime_from_struct_time(struct_time):
     try:
@@ -106,3 +114,77 @@ async def url_with_desc(channel, title: str, url: str, desc: str):
         return await channel.send(embed=embed)
     except discord.errors.HTTPException:
         print(f'Couldn\'t send Embed with Link {url}, description: {desc}')
+
+
+def custom_reaction(name: str, reaction: list):
+    """
+    Get the Embed for a Custom Reaction. Embeds are built once per Version of a Custom Reaction and kept in an
+    LRU Cache, so the Timestamp is not parsed and the Footer not formatted again every time it is sent.
+    The returned Embed is shared and must not be modified.
+
+    :param name: The Name of the Custom Reaction
+    :param reaction: The Custom Reaction, as [contents, author, creation date, id, version]
+    :return: A discord.Embed showing the Custom Reaction
+    """
+    key = (reaction[3], reaction[4])
+    embed = _custom_reaction_embeds.get(key)
+    if embed is not None:
+        _custom_reaction_embeds.move_to_end(key)
+        return embed
+    embed = discord.Embed()
+    if reaction[0].startswith('http'):  # Properly Embed Links to GIF, Images etc.
+        embed.set_image(url=reaction[0])
+    else:
+        embed.description = reaction[0]
+    embed.set_footer(text=f'"{name}" #{reaction[3]} | Added by {reaction[1]}')
+    timestamp = datetime_from_struct_time(reaction[2])
+    if timestamp is not None:
+        embed.timestamp = timestamp
+    _custom_reaction_embeds[key] = embed
+    if len(_custom_reaction_embeds) > CUSTOM_REACTION_CACHE_SIZE:
+        _custom_reaction_embeds.popitem(last=False)
+    return embed
+
+
+def invalidate_custom_reaction(reaction_id: int, version: int):
+    """
+    Forget the prebuilt Embed of a Custom Reaction, after it was edited or removed.
+
+    :param reaction_id: The ID of the Custom Reaction
+    :param version: The Version of the Custom Reaction before it was changed
+    """
+    _custom_reaction_embeds.pop((reaction_id, version), None)
+
+
+async def send_custom_reaction(channel, name: str, reaction: list):
+    """
+    Send a Custom Reaction using its prebuilt Embed.
+
+    :param channel: The Channel in which to send the Custom Reaction
+    :param name: The Name of the Custom Reaction
+    :param reaction: The Custom Reaction, as [contents, author, creation date, id, version]
+    :return: A discord.Message Object containing the sent Embed, or None if sending it failed.
+    """
+    try:
+        return await channel.send(embed=custom_reaction(name, reaction))
+    except discord.errors.HTTPException as e:
+        print(e)
+        return None
+
+
+async def static_desc(channel, desc: str):
+    """
+    Send a Reply which never changes, like an Error or Permission Message. The Embed is built only once per Text,
+    so this must only be used with constant Texts, never with formatted ones.
+
+    :param channel: The Channel in which to send the Embed
+    :param desc: The constant Description
+    :return: A discord.Message Object containing the sent Embed, or None if sending it failed.
+    """
+    embed = _static_embeds.get(desc)
+    if embed is None:
+        embed = _static_embeds[desc] = discord.Embed(description=desc)
+    try:
+        return await channel.send(embed=embed)
+    except discord.errors.HTTPException:
+        pass
@@ -0,0 +1,136 @@
+import asyncio
+import collections
+import json
+import random
+
+import aiohttp
+
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 8
+DNS_CACHE_TTL = 300  # Seconds for which resolved Host Names are reused
+DEFAULT_TIMEOUT = 10  # Seconds for a whole Request, including reading the Body
+DEFAULT_RETRIES = 2
+BACKOFF_BASE = 0.5  # Seconds before the first Retry, doubled for every further one
+
+# Statuses worth trying again, since they are usually temporary
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+Response = collections.namedtuple('Response', ['status', 'headers', 'body'])
+
+_session = None
+
+
+class HTTPError(Exception):
+    def __init__(self, url: str, status: int = None, reason: str = ''):
+        """
+        Raised when a Request failed for good, after all Retries.
+
+        :param url: The requested URL
+        :param status: The HTTP Status of the last Response, or None if no Response was received
+        :param reason: A Description of what went wrong
+        """
+        super().__init__(f'Request to {url} failed: {f"{status} ({reason})" if status and reason else status or reason}')
+        self.url = url
+        self.status = status
+        self.reason = reason
+
+
+def get_session():
+    """
+    Get the Session shared by all outbound Requests of the Bot, creating it on first use.
+    All Requests share one Connection Pool with a DNS Cache, and at most MAX_CONNECTIONS_PER_HOST
+    concurrent Connections to the same Host, so a single slow Upstream can't use up all Connections.
+
+    :return: The shared aiohttp.ClientSession
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, limit_per_host=MAX_CONNECTIONS_PER_HOST,
+                                         ttl_dns_cache=DNS_CACHE_TTL)
+        _session = aiohttp.ClientSession(connector=connector)
+    return _session
+
+
+async def close():
+    """
+    Close the shared Session and all of its Connections.
+    """
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def _backoff(attempt: int, retry_after: str = None) -> float:
+    if retry_after is not None and retry_after.isdigit():
+        return float(retry_after)
+    # Full Jitter, so Clients that failed together don't retry together
+    return random.uniform(0, BACKOFF_BASE * 2 ** attempt)
+
+
+async def _send(method: str, url: str, **kwargs):
+    async with get_session().request(method, url, **kwargs) as resp:
+        return Response(resp.status, resp.headers, await resp.read())
+
+
+async def request(method: str, url: str, *, params: dict = None, headers: dict = None, data=None,
+                  timeout: float = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES):
+    """
+    Send a Request over the shared Session. Connection Errors, Timeouts and temporary Errors of the Upstream
+    (see RETRY_STATUSES) are retried with exponential Backoff. Other Responses are returned as they are.
+
+    :param method: The HTTP Method, e.g. 'GET'
+    :param url: The URL to request
+    :param params: Optional Query Parameters
+    :param headers: Optional Request Headers
+    :param data: An optional Request Body
+    :param timeout: The Seconds after which a single Attempt is given up
+    :param retries: How often to try again after the first Attempt failed
+    :return: A Response with status, headers and the body as bytes
+    :raises HTTPError: If the Request still failed after all Retries
+    """
+    for attempt in range(retries + 1):
+        retry_after = None
+        try:
+            resp = await asyncio.wait_for(_send(method, url, params=params, headers=headers, data=data), timeout)
+        except asyncio.TimeoutError:
+            error = HTTPError(url, reason=f'timed out after {timeout} Seconds')
+        except aiohttp.ClientError as err:
+            error = HTTPError(url, reason=str(err) or type(err).__name__)
+        else:
+            if resp.status not in RETRY_STATUSES:
+                return resp
+            error = HTTPError(url, resp.status)
+            retry_after = resp.headers.get('Retry-After')
+        if attempt < retries:
+            await asyncio.sleep(_backoff(attempt, retry_after))
+    raise error
+
+
+async def get_json(url: str, **kwargs):
+    """
+    GET a URL and decode its Body as JSON. Takes the same Keyword Arguments as request().
+
+    :return: The decoded JSON
+    :raises HTTPError: If the Request failed, the Response was not successful, or not valid JSON
+    """
+    resp = await request('GET', url, **kwargs)
+    if resp.status >= 400:
+        raise HTTPError(url, resp.status)
+    try:
+        return json.loads(resp.body.decode('utf-8'))
+    except ValueError:
+        raise HTTPError(url, resp.status, 'invalid JSON')
+
+
+async def get_bytes(url: str, **kwargs):
+    """
+    GET a URL and return its Body. Takes the same Keyword Arguments as request().
+
+    :return: The Body as bytes
+    :raises HTTPError: If the Request failed or the Response was not successful
+    """
+    resp = await request('GET', url, **kwargs)
+    if resp.status >= 400:
+        raise HTTPError(url, resp.status)
+    return resp.body
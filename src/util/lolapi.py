@@ -1,19 +1,180 @@
 # Import Riot API Wrapper
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
 import os
+import threading
+import time
 from cassiopeia import dto
 from cassiopeia import riotapi
 
+from src.util.data_cruncher import data
+
 # Set API key
 riotapi.set_api_key(os.environ['LEAGUE_TOKEN'])
 
+MAX_WORKERS = 8  # Threads for blocking Riot API Calls
+MAX_CALLS_PER_REGION = 4  # Concurrent Calls per Region, the Riot API limits Requests per Region
+
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS)
+_region_semaphores = dict()
+
+# Seconds for which cached Lookups are used, per Kind of Data
+CACHE_TTLS = {
+    'summoner_id': 7 * 24 * 60 * 60,  # Only changes when a Summoner is renamed
+    'summoner_name': 24 * 60 * 60,
+    'mastery_points': 60 * 60
+}
+REFRESH_AHEAD = 0.8  # Entries older than this Share of their TTL are refreshed in the Background when used
+_in_flight = dict()
+
+
+class _RegionGate:
+    def __init__(self):
+        """
+        Cassiopeia only knows a single global Region. Calls on the same Region can run concurrently, but switching
+        to another Region has to wait until all Calls on the current one are done.
+        """
+        self._condition = threading.Condition()
+        self._region = None
+        self._active = 0
+
+    @contextlib.contextmanager
+    def region(self, region: str):
+        with self._condition:
+            self._condition.wait_for(lambda: self._active == 0 or self._region == region.upper())
+            if self._region != region.upper():
+                riotapi.set_region(region)
+                self._region = region.upper()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+
+_gate = _RegionGate()
+
 
 def set_region(new_region: str):
     """
-    Set a new Region for the API to make Calls on.
-    
-    :param new_region: The New Region to set 
+    Set a new Region for the API to make Calls on. Waits until no Calls on another Region are running.
+
+    :param new_region: The New Region to set
+    """
+    with _gate.region(new_region):
+        pass
+
+
+async def run(region: str, func, *args):
+    """
+    Run a blocking API Function on the Thread Pool without blocking the Event Loop.
+    At most MAX_CALLS_PER_REGION Calls run on the same Region at once.
+
+    :param region: The Region on which the Call is made
+    :param func: The Function of this Module to call, e.g. get_summoner_by_id
+    :param args: The Arguments for the Function
+    :return: The Result of the Function
+    """
+    semaphore = _region_semaphores.setdefault(region.upper(), asyncio.Semaphore(MAX_CALLS_PER_REGION))
+    async with semaphore:
+        return await asyncio.get_event_loop().run_in_executor(_executor, functools.partial(func, *args))
+
+
+def _fetch(kind: str, key: str, region: str, func, *args):
+    """
+    Fetch a Value for the Cache, unless the same Key is already being fetched, in which case that Fetch is shared.
+
+    :return: An asyncio.Task resolving to the fetched Value
+    """
+    task = _in_flight.get((kind, key))
+    if task is None:
+        async def load():
+            value = await run(region, func, *args)
+            data.get_league_cache().setdefault(kind, dict())[key] = [value, time.time()]
+            return value
+
+        def done(finished):
+            _in_flight.pop((kind, key), None)
+            if not finished.cancelled() and finished.exception() is not None:
+                print(f'Failed to fetch {kind} for {key}: {finished.exception()}')
+
+        task = _in_flight[(kind, key)] = asyncio.ensure_future(load())
+        task.add_done_callback(done)
+    return task
+
+
+async def _cached(kind: str, key: str, region: str, func, *args):
+    """
+    Get a Value from the persistent Cache, or fetch it with the given Function if it is missing or expired.
+    Values close to Expiry are returned right away and refreshed in the Background.
+
+    :param kind: The Kind of Data, as found in CACHE_TTLS
+    :param key: The Key of the Value within its Kind
+    :param region: The Region on which the Function makes its Call
+    :param func: The blocking Function of this Module which fetches the Value
+    :param args: The Arguments for the Function
+    :return: The Value
+    """
+    entry = data.get_league_cache().get(kind, {}).get(key)
+    if entry is not None:
+        age = time.time() - entry[1]
+        if age < CACHE_TTLS[kind]:
+            if age > CACHE_TTLS[kind] * REFRESH_AHEAD:
+                _fetch(kind, key, region, func, *args)
+            return entry[0]
+    # Shielded, so a cancelled Caller does not cancel the Fetch for others waiting on it
+    return await asyncio.shield(_fetch(kind, key, region, func, *args))
+
+
+async def summoner_id(player_name: str, region: str):
+    """
+    Get a Player ID by the Name and Region, from the Cache if possible.
+
+    :param player_name: The Player's Summoner Name
+    :param region: The Region the Player is on
+    :return: The ID of the Summoner
+    """
+    key = f'{region.upper()}|{"".join(player_name.lower().split())}'
+    return await _cached('summoner_id', key, region, get_id_by_name, player_name, region)
+
+
+async def summoner_name(player_id, region: str):
+    """
+    Get the Summoner Name of a Player by their ID and Region, from the Cache if possible.
+
+    :param player_id: The ID of the Summoner
+    :param region: The Region of the Summoner
+    :return: The Summoner Name
+    """
+    return await _cached('summoner_name', f'{region.upper()}|{player_id}', region,
+                         lambda: get_summoner_by_id(player_id, region).name)
+
+
+async def mastery_points(player_id, region: str, champ_id: int=432):
+    """
+    Get someone's Champ Mastery Points by their ID and Region, from the Cache if possible.
+
+    :param player_id: The ID of the Summoner
+    :param region: The Region of the Summoner
+    :param champ_id: The Champion ID for which to get the Points. Defaults to Bard.
+    :return: The Mastery Points of the Player
+    """
+    return await _cached('mastery_points', f'{region.upper()}|{player_id}|{champ_id}', region,
+                         get_mastery_points_by_id, player_id, region, champ_id)
+
+
+def prune_cache():
+    """
+    Drop all expired Entries from the Cache, so it does not grow forever.
     """
-    riotapi.set_region(new_region)
+    now = time.time()
+    for kind, entries in data.get_league_cache().items():
+        for key in [k for k, (_, fetched_at) in entries.items() if now - fetched_at >= CACHE_TTLS.get(kind, 0)]:
+            del entries[key]
 
 
 def get_id_by_name(player_name, region):
@@ -35,8 +196,8 @@ def get_summoner_by_name(player_name, region):
     :param region: The Region on which to get the Summoner
     :return: The Summoner
     """
-    set_region(region)
-    return riotapi.get_summoner_by_name(player_name)
+    with _gate.region(region):
+        return riotapi.get_summoner_by_name(player_name)
 
 
 def get_summoner_by_id(player_id, region):
@@ -47,8 +208,8 @@ def get_summoner_by_id(player_id, region):
     :param region: The Region on which to look up the given Player ID
     :return: A Summoner Object
     """
-    set_region(region)
-    return riotapi.get_summoner_by_id(player_id)
+    with _gate.region(region):
+        return riotapi.get_summoner_by_id(player_id)
 
 
 def get_mastery_points(name, region, champ_id: int=432):
@@ -60,7 +221,7 @@ def get_mastery_points(name, region, champ_id: int=432):
     :param champ_id: The Champion ID for which to get the Points. Defaults to Bard.
     :return: The Points of the given Person on Bard
     """
-    return dto.championmasteryapi.get_champion_mastery(get_id_by_name(name, region), champ_id).championPoints
+    return get_mastery_points_by_id(get_id_by_name(name, region), region, champ_id)
 
 
 def get_mastery_points_by_id(player_id, region, champ_id: int=432):
@@ -72,5 +233,5 @@ def get_mastery_points_by_id(player_id, region, champ_id: int=432):
     :param champ_id: The Champion ID for which to get the Points. Defaults to Bard.
     :return: The Mastery Points of the Player on Bard
     """
-    set_region(region)
-    return dto.championmasteryapi.get_champion_mastery(player_id, champ_id).championPoints
+    with _gate.region(region):
+        return dto.championmasteryapi.get_champion_mastery(player_id, champ_id).championPoints
@@ -0,0 +1,163 @@
+import asyncio
+import collections
+import hashlib
+import io
+import os
+
+import discord
+
+from src import bot
+from src.util import http_client
+from src.util.data_cruncher import data
+
+MEDIA_DIR = os.path.join(os.getcwd(), 'media')
+MAX_CACHE_BYTES = 64 * 1024 * 1024  # Least recently used Files are deleted above this Size
+MAX_FILE_BYTES = 8 * 1024 * 1024  # The largest Upload Discord allows
+
+# Cached Files by their SHA-256 Hash, least recently used first, with their Size
+_files = collections.OrderedDict()
+_cache_bytes = 0
+_loaded = False
+# Source URLs which are currently being fetched, so each one is only fetched once
+_warming = dict()
+
+
+def _load():
+    """
+    Find the Files cached on Disk from a previous Run, oldest first.
+    """
+    global _cache_bytes, _loaded
+    _loaded = True
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    entries = [x for x in os.scandir(MEDIA_DIR) if x.is_file()]
+    for entry in sorted(entries, key=lambda x: x.stat().st_mtime):
+        _files[entry.name] = entry.stat().st_size
+        _cache_bytes += entry.stat().st_size
+    # Files may have been removed from Disk while the Bot was not running
+    cache = data.get_media_cache()
+    _forget((set(cache['hashes']) | set(cache['sources'].values())) - set(_files))
+
+
+def _admit(digest: str, size: int):
+    """
+    Account for a File in the Disk Cache, marking it as most recently used.
+
+    :return: The Hashes of the least recently used Files to delete, to stay below MAX_CACHE_BYTES
+    """
+    global _cache_bytes
+    if digest not in _files:
+        _files[digest] = size
+        _cache_bytes += size
+    _files.move_to_end(digest)
+    evicted = []
+    while _cache_bytes > MAX_CACHE_BYTES and len(_files) > 1:
+        oldest, oldest_size = _files.popitem(last=False)
+        _cache_bytes -= oldest_size
+        evicted.append(oldest)
+    return evicted
+
+
+def _forget(digests):
+    """
+    Drop evicted Files from the Media Cache State, so its Maps only grow as large as the Disk Cache.
+    Their Sources are cached and uploaded again on their next Use.
+
+    :param digests: The Hashes of the evicted Files
+    """
+    digests = set(digests)
+    if not digests:
+        return
+    cache = data.get_media_cache()
+    for digest in digests:
+        cache['hashes'].pop(digest, None)
+    for url in [url for url, digest in cache['sources'].items() if digest in digests]:
+        del cache['sources'][url]
+    data.save_later('media_cache')
+
+
+def _write(digest: str, body: bytes, evicted: list):
+    """
+    Write a File to the Disk Cache and delete evicted ones. Runs in an Executor, since it does blocking File I/O.
+    """
+    path = os.path.join(MEDIA_DIR, digest)
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            f.write(body)
+    for digest in evicted:
+        try:
+            os.remove(os.path.join(MEDIA_DIR, digest))
+        except FileNotFoundError:
+            pass
+
+
+def _read(digest: str):
+    with open(os.path.join(MEDIA_DIR, digest), 'rb') as f:
+        return f.read()
+
+
+async def _warm(url: str):
+    """
+    Fetch an Image, store it on Disk by its Content Hash, and upload it to the Storage Channel once.
+    Images with the same Contents are only uploaded once, even if they come from different URLs.
+    If an Image is still on Disk from an earlier failed Upload, it is not fetched again.
+    """
+    cache = data.get_media_cache()
+    loop = asyncio.get_event_loop()
+    digest = cache['sources'].get(url)
+    if digest in _files:
+        _files.move_to_end(digest)
+        try:
+            body = await loop.run_in_executor(None, _read, digest)
+        except FileNotFoundError:  # Evicted in the meantime, try again on the next Use
+            _files.pop(digest, None)
+            _forget([digest])
+            return
+    else:
+        try:
+            body = await http_client.get_bytes(url)
+        except http_client.HTTPError as err:
+            print(f'Failed to cache {url}: {err}')
+            return
+        if len(body) > MAX_FILE_BYTES:
+            return
+        digest = hashlib.sha256(body).hexdigest()
+        evicted = _admit(digest, len(body))
+        _forget(evicted)
+        await loop.run_in_executor(None, _write, digest, body, evicted)
+        cache['sources'][url] = digest
+    if digest not in cache['hashes']:
+        channel = bot.client.get_channel(int(cache['storage_channel']))
+        if channel is None:
+            return
+        file_name = digest[:16] + os.path.splitext(url.split('?')[0])[1][:5]
+        try:
+            upload = await channel.send(file=discord.File(io.BytesIO(body), filename=file_name))
+        except discord.errors.HTTPException as err:
+            print(f'Failed to upload {url} to the Media Storage Channel: {err}')
+            return
+        cache['hashes'][digest] = upload.attachments[0].url
+    data.save_media_cache()
+
+
+def get(url: str):
+    """
+    Get a stable URL for an external Image. Once an Image was cached, the URL of its Attachment in the
+    Storage Channel is returned, which does not break when the original Host goes away.
+    The first Time an Image is requested, its original URL is returned while it is cached in the Background.
+
+    :param url: The original URL of the Image
+    :return: The URL to send
+    """
+    cache = data.get_media_cache()
+    digest = cache['sources'].get(url)
+    if digest is not None and digest in cache['hashes']:
+        if digest in _files:
+            _files.move_to_end(digest)
+        return cache['hashes'][digest]
+    if cache['storage_channel'] is not None and url not in _warming:
+        if not _loaded:
+            _load()
+        task = _warming[url] = asyncio.get_event_loop().create_task(_warm(url))
+        task.add_done_callback(lambda _: _warming.pop(url, None))
+    return url
+
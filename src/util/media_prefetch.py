@@ -0,0 +1,130 @@
+import asyncio
+import collections
+import time
+
+from src.util import http_client
+
+BUFFER_SIZE = 5  # Ready-to-send URLs kept per Tag
+LOW_WATER = 2  # Refill once fewer URLs than this are left
+REFILL_ATTEMPTS = 2  # Fetches per free Slot a Refill may use, as the Upstream may return URLs already buffered
+MIN_BACKOFF = 2  # Seconds to wait after the Upstream failed, doubled for every further Failure
+MAX_BACKOFF = 5 * 60
+
+GIPHY_URL = 'https://api.giphy.com/v1/gifs/random'
+GIPHY_KEY = 'dc6zaTOxFJmzC'
+
+
+async def fetch_cat():
+    """
+    Get the URL of a random Cat Image or GIF from random.cat.
+
+    :raises http_client.HTTPError: If random.cat could not be reached or sent something unexpected
+    """
+    try:
+        return (await http_client.get_json('http://random.cat/meow'))['file']
+    except (KeyError, TypeError):
+        raise http_client.HTTPError('http://random.cat/meow', reason='unexpected Response')
+
+
+def giphy(tag: str):
+    """
+    Build a Fetcher for random GIFs from Giphy with the given Tag.
+
+    :param tag: The Giphy Tag, e.g. 'dog'
+    :return: A Coroutine Function returning the URL of a random GIF
+    """
+    async def fetch():
+        try:
+            resp = await http_client.get_json(GIPHY_URL, params={'api_key': GIPHY_KEY, 'tag': tag})
+            return resp['data']['image_original_url']
+        except (KeyError, TypeError):
+            raise http_client.HTTPError(GIPHY_URL, reason='unexpected Response')
+    return fetch
+
+
+class MediaBuffer:
+    def __init__(self, name: str, fetch, size: int = BUFFER_SIZE, low_water: int = LOW_WATER):
+        """
+        Keeps a few URLs of random Media ready, so Commands can answer without waiting for the Upstream.
+        Whenever the Buffer drops below the Low-Water Mark, it is refilled in the Background.
+        If the Upstream fails, refilling pauses for an exponentially growing Time.
+
+        :param name: The Name of the Buffer, for Logging
+        :param fetch: A Coroutine Function returning a single URL, raising http_client.HTTPError on Failure
+        :param size: The amount of URLs to keep ready
+        :param low_water: The amount of URLs below which the Buffer is refilled
+        """
+        self.name = name
+        self._fetch = fetch
+        self._size = size
+        self._low_water = low_water
+        self._urls = collections.deque()
+        self._refill_task = None
+        self._backoff = 0
+        self._paused_until = 0
+
+    def refill(self):
+        """
+        Start refilling the Buffer in the Background, unless it is already being refilled or the Upstream
+        failed recently.
+        """
+        if self._refill_task is not None and not self._refill_task.done():
+            return
+        self._refill_task = asyncio.get_event_loop().create_task(self._refill())
+
+    async def _refill(self):
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        attempts = (self._size - len(self._urls)) * REFILL_ATTEMPTS
+        while len(self._urls) < self._size and attempts > 0:
+            attempts -= 1
+            try:
+                url = await self._fetch()
+            except http_client.HTTPError as err:
+                self._backoff = min(MAX_BACKOFF, max(MIN_BACKOFF, self._backoff * 2))
+                self._paused_until = time.monotonic() + self._backoff
+                print(f'Failed to prefetch {self.name}, retrying in {self._backoff} Seconds: {err}')
+                return
+            self._backoff = 0
+            if url not in self._urls:
+                self._urls.append(url)
+
+    async def get(self):
+        """
+        Get a random URL, from the Buffer if possible. Only if the Buffer ran empty, the Upstream is asked directly,
+        unless it failed recently and refilling is paused.
+
+        :return: The URL
+        :raises http_client.HTTPError: If the Buffer was empty and the Upstream failed, or refilling is paused
+        """
+        try:
+            url = self._urls.popleft()
+        except IndexError:
+            url = None
+        if len(self._urls) < self._low_water:
+            self.refill()
+        if url is None:
+            if time.monotonic() < self._paused_until:
+                raise http_client.HTTPError(self.name, reason=f'paused for {self._backoff} Seconds after a Failure')
+            url = await self._fetch()
+        return url
+
+    def __len__(self):
+        return len(self._urls)
+
+
+buffers = {
+    'cat': MediaBuffer('Cats', fetch_cat),
+    'dog': MediaBuffer('Dogs', giphy('dog')),
+    'fox': MediaBuffer('Foxes', giphy('fox')),
+    'hedgehog': MediaBuffer('Hedgehogs', giphy('hedgehog'))
+}
+
+
+def start():
+    """
+    Fill all Buffers in the Background.
+    """
+    for buffer in buffers.values():
+        buffer.refill()
@@ -0,0 +1,62 @@
+import hashlib
+import random
+
+_ROUNDS = 4
+
+
+def _round_function(seed: int, round_number: int, value: int, bits: int) -> int:
+    digest = hashlib.blake2b(f'{seed}:{round_number}:{value}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') & ((1 << bits) - 1)
+
+
+def permute(seed: int, index: int, size: int) -> int:
+    """
+    Map an Index onto a pseudo-random Position within range(size), using a seeded Feistel Network.
+    For a fixed Seed and Size, this is a Permutation: every Index in range(size) maps onto a different Position.
+    Values outside of the Range are walked through the Network again until they land inside of it.
+
+    :param seed: The Seed selecting the Permutation
+    :param index: The Index to map, must be within range(size)
+    :param size: The Size of the Domain
+    :return: The permuted Index
+    """
+    half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+    mask = (1 << half_bits) - 1
+    value = index
+    while True:
+        left, right = value >> half_bits, value & mask
+        for round_number in range(_ROUNDS):
+            left, right = right, left ^ _round_function(seed, round_number, right, half_bits)
+        value = (left << half_bits) | right
+        if value < size:
+            return value
+
+
+class QuestionSampler:
+    def __init__(self, state: dict):
+        """
+        Draws Trivia Questions per Guild without Repetition, until all Questions of a Topic have been asked.
+        Only a Seed and a Cursor are kept per Guild and Topic, the Question List itself is never copied or changed.
+
+        :param state: The persisted Sampler State, in the Format { "guild_id": { "topic": [seed, cursor, size] } }.
+                      It is modified in place.
+        """
+        self._state = state
+
+    def draw(self, guild_id: int, topic: str, size: int) -> int:
+        """
+        Draw the next Question Index for the given Guild and Topic.
+
+        :param guild_id: The Guild on which the Question will be asked
+        :param topic: The Topic of the Question
+        :param size: The amount of Questions in the Topic
+        :return: An Index within range(size)
+        """
+        topics = self._state.setdefault(str(guild_id), dict())
+        entry = topics.get(topic)
+        if entry is None or entry[1] >= size or entry[2] != size:
+            # Start a new Pass over the Questions - also if the Question Bank changed in Size
+            entry = topics[topic] = [random.getrandbits(32), 0, size]
+        seed, cursor, _ = entry
+        entry[1] += 1
+        return permute(seed, cursor, size)
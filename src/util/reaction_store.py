@@ -0,0 +1,258 @@
+import asyncio
+import datetime
+import hashlib
+import random
+
+from src.util.search_index import InvertedIndex
+
+# Fields of a single stored Custom Reaction. Custom Reactions added before Author IDs were stored,
+# and imported ones, only have the first five.
+CONTENTS, AUTHOR, DATE, ID, VERSION, AUTHOR_ID = range(6)
+
+# Keys of the next free Custom Reaction ID and of the Payload Table, next to the Guild IDs in the Configuration
+NEXT_ID = 'next_id'
+PAYLOADS = 'payloads'
+
+
+def payload_key(text: str) -> str:
+    """
+    Get the Key under which a Payload is stored in the Payload Table.
+
+    :param text: The Contents of a Custom Reaction
+    :return: A 96-bit Hash of the Contents, as Hex String
+    """
+    return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+
+class CustomReactionStore:
+    def __init__(self, reactions: dict):
+        """
+        Holds all Custom Reactions, in the Format
+        { "next_id": 42, "payloads": { "key": [contents, references] },
+          "guild_id": { "name": [ [key, author, date, id, version, author id] or null, ... ] } }.
+
+        Every Custom Reaction has a stable ID, and an Index maps each ID to the Guild, Name and Position it is
+        stored at, so Custom Reactions can be edited and deleted in O(1). Deleted Custom Reactions are replaced
+        by a Tombstone (null), which is cleaned up later by compact() instead of shifting the List right away.
+
+        The Contents of Custom Reactions are stored only once in the Payload Table, keyed by their Hash, since the same
+        Links and Quotes are often added under several Names and on several Guilds. Each Payload counts the
+        Custom Reactions referencing it, and is dropped once none are left.
+
+        :param reactions: The Custom Reaction Configuration. It is modified in place.
+        """
+        self._reactions = reactions
+        self._reactions.setdefault(NEXT_ID, 1)
+        migrate = PAYLOADS not in self._reactions  # Contents are still stored inline in every Custom Reaction
+        self._payloads = self._reactions.setdefault(PAYLOADS, dict())
+        self._locations = dict()  # ID -> [guild_id, name, position]
+        self._live = dict()  # (guild_id, name) -> amount of Custom Reactions which are not deleted
+        self._tombstones = dict()  # guild_id -> amount of Tombstones
+        self._indexes = dict()  # guild_id -> InvertedIndex, built on the first Search
+        for guild_id, names in self._guilds():
+            for name, entries in names.items():
+                for position, entry in enumerate(entries):
+                    if entry is None:
+                        self._tombstones[guild_id] = self._tombstones.get(guild_id, 0) + 1
+                        continue
+                    if len(entry) < 5:  # Custom Reactions from before IDs were introduced
+                        entry.extend([self._new_id(), 1])
+                    if migrate:
+                        entry[CONTENTS] = self._acquire(entry[CONTENTS])
+                    self._locations[entry[ID]] = [guild_id, name, position]
+                    self._live[(guild_id, name)] = self._live.get((guild_id, name), 0) + 1
+
+    def _guilds(self):
+        return ((k, v) for k, v in self._reactions.items() if k not in (NEXT_ID, PAYLOADS))
+
+    def _new_id(self):
+        reaction_id = self._reactions[NEXT_ID]
+        self._reactions[NEXT_ID] += 1
+        return reaction_id
+
+    def _acquire(self, text: str) -> str:
+        key = payload_key(text)
+        payload = self._payloads.get(key)
+        if payload is None:
+            self._payloads[key] = [text, 1]
+        else:
+            payload[1] += 1
+        return key
+
+    def _release(self, key: str):
+        payload = self._payloads[key]
+        payload[1] -= 1
+        if payload[1] <= 0:
+            del self._payloads[key]
+
+    def payload(self, key: str):
+        """
+        Get the Contents stored under a Payload Key.
+
+        :param key: The Key, as stored in a Custom Reaction
+        :return: The Contents, or None if no Custom Reaction references them anymore
+        """
+        payload = self._payloads.get(key)
+        return None if payload is None else payload[0]
+
+    def _resolve(self, name: str, entry: list):
+        return [self._payloads[entry[CONTENTS]][0], entry[AUTHOR], entry[DATE], name, entry[ID]]
+
+    def _index(self, index: InvertedIndex, name: str, entry: list):
+        index.add(entry[ID], [(name, 3), (self._payloads[entry[CONTENTS]][0], 1), (entry[AUTHOR], 2)])
+
+    def add(self, guild_id: int, name: str, contents: str, author: str, date: str = None, author_id: int = None):
+        """
+        Add a new Custom Reaction.
+
+        :param date: An optional Creation Date in the Format "YYYY-MM-DD HH:MM:SS", defaults to now
+        :param author_id: The User ID of the Author, if known
+        :return: The stored Custom Reaction, as [key, author, date, id, version(, author id)]
+        """
+        guild_id = str(guild_id)
+        entries = self._reactions.setdefault(guild_id, dict()).setdefault(name, [])
+        date = str(datetime.datetime.now())[:-7] if date is None else date
+        entry = [self._acquire(contents), author, date, self._new_id(), 1]
+        if author_id is not None:
+            entry.append(author_id)
+        entries.append(entry)
+        self._locations[entry[ID]] = [guild_id, name, len(entries) - 1]
+        self._live[(guild_id, name)] = self._live.get((guild_id, name), 0) + 1
+        if guild_id in self._indexes:
+            self._index(self._indexes[guild_id], name, entry)
+        return entry
+
+    def get_random(self, guild_id: int, name: str):
+        """
+        Get a random Custom Reaction with the given Name.
+
+        :return: The Custom Reaction as [contents, author, date, id, version],
+                 or None if there is none with that Name on the Guild
+        """
+        guild_id = str(guild_id)
+        if not self._live.get((guild_id, name)):
+            return None
+        entries = self._reactions[guild_id][name]
+        while True:  # Compaction keeps the Share of Tombstones low, so this rarely takes more than one Try
+            entry = entries[random.randrange(0, len(entries))]
+            if entry is not None:
+                return [self._payloads[entry[CONTENTS]][0]] + entry[AUTHOR:VERSION + 1]
+
+    def get(self, guild_id: int, reaction_id: int):
+        """
+        Get a Custom Reaction by its ID.
+
+        :return: A (name, [key, author, date, id, version(, author id)]) Tuple, or None if there is no such
+                 Custom Reaction on the Guild. The Custom Reaction is the stored List itself, resolve its
+                 Contents with payload().
+        """
+        location = self._locations.get(reaction_id)
+        if location is None or location[0] != str(guild_id):
+            return None
+        guild_id, name, position = location
+        return name, self._reactions[guild_id][name][position]
+
+    def edit(self, guild_id: int, reaction_id: int, contents: str):
+        """
+        Replace the Contents of a Custom Reaction, and bump its Version.
+
+        :return: The edited Custom Reaction, or None if there is no such Custom Reaction on the Guild
+        """
+        found = self.get(guild_id, reaction_id)
+        if found is None:
+            return None
+        name, entry = found
+        old_key, entry[CONTENTS] = entry[CONTENTS], self._acquire(contents)
+        self._release(old_key)
+        entry[VERSION] += 1
+        if str(guild_id) in self._indexes:
+            self._index(self._indexes[str(guild_id)], name, entry)
+        return entry
+
+    def remove(self, guild_id: int, reaction_id: int):
+        """
+        Delete a Custom Reaction by replacing it with a Tombstone.
+
+        :return: The Name of the deleted Custom Reaction, or None if there is no such Custom Reaction on the Guild
+        """
+        location = self._locations.get(reaction_id)
+        if location is None or location[0] != str(guild_id):
+            return None
+        guild_id, name, position = self._locations.pop(reaction_id)
+        self._release(self._reactions[guild_id][name][position][CONTENTS])
+        self._reactions[guild_id][name][position] = None
+        self._live[(guild_id, name)] -= 1
+        self._tombstones[guild_id] = self._tombstones.get(guild_id, 0) + 1
+        if guild_id in self._indexes:
+            self._indexes[guild_id].remove(reaction_id)
+        return name
+
+    def all_on_guild(self, guild_id: int):
+        """
+        Get all Custom Reactions on a Guild. Nothing is copied: the stored Custom Reactions are returned as they are,
+        and their Contents are only resolved with payload() when they are shown.
+
+        :return: A List in the Format [ (name, [key, author, creation date, id, version]), ... ],
+                 or None if the Guild has no Custom Reactions, or all of them were deleted
+        """
+        names = self._reactions.get(str(guild_id), {})
+        return [(name, entry) for name, entries in names.items() for entry in entries if entry is not None] or None
+
+    def fingerprints(self, guild_id: int):
+        """
+        Get what identifies each Custom Reaction on a Guild as a Duplicate, without resolving any Contents.
+
+        :return: A Set of (name, payload key) Tuples
+        """
+        return {(name, entry[CONTENTS]) for name, entries in self._reactions.get(str(guild_id), {}).items()
+                for entry in entries if entry is not None}
+
+    def search(self, guild_id: int, query: str, limit: int = 10):
+        """
+        Search the Custom Reactions on a Guild by their Name, Contents and Author.
+
+        :return: A List of matching Custom Reactions, best first, in the Format
+                 [ [contents, author, creation date, name, id], ... ]
+        """
+        guild_id = str(guild_id)
+        index = self._indexes.get(guild_id)
+        if index is None:
+            index = self._indexes[guild_id] = InvertedIndex()
+            for name, entries in self._reactions.get(guild_id, {}).items():
+                for entry in entries:
+                    if entry is not None:
+                        self._index(index, name, entry)
+        return [self._resolve(*self.get(guild_id, reaction_id)) for reaction_id in index.search(query, limit)]
+
+    def compact(self, guild_id: str):
+        """
+        Remove the Tombstones of a Guild, moving the remaining Custom Reactions to their new Positions.
+
+        :param guild_id: The Guild to compact
+        :return: The amount of removed Tombstones
+        """
+        removed = self._tombstones.pop(guild_id, 0)
+        names = self._reactions.get(guild_id, {})
+        for name in [x for x, entries in names.items() if None in entries]:
+            entries = [x for x in names[name] if x is not None]
+            if not entries:
+                del names[name]
+                del self._live[(guild_id, name)]
+                continue
+            for position, entry in enumerate(entries):
+                self._locations[entry[ID]][2] = position
+            names[name] = entries
+        return removed
+
+    async def run_compaction(self, interval: float = 600):
+        """
+        Periodically compact all Guilds with Tombstones. Runs forever.
+
+        :param interval: The Time between two Compactions in Seconds
+        """
+        while True:
+            await asyncio.sleep(interval)
+            for guild_id in list(self._tombstones):
+                removed = self.compact(guild_id)
+                print(f'Compacted {removed} deleted Custom Reactions on {guild_id}.')
+                await asyncio.sleep(0)  # Let other Tasks run between Guilds
@@ -0,0 +1,127 @@
+"""
+Import and Export of Custom Reactions as NDJSON, one Custom Reaction per Line:
+{"name": "...", "contents": "...", "author": "...", "date": "YYYY-MM-DD HH:MM:SS"}
+
+Both Directions work on Streams of Lines in Batches, so neither the Export nor the Import is ever held in Memory
+as a whole, and the Bot can handle other Events between two Batches.
+
+Usage: python -m src.util.reaction_transfer export <guild_id> [out.ndjson]
+       python -m src.util.reaction_transfer import <guild_id> <in.ndjson>
+"""
+import argparse
+import json
+import os
+import sys
+
+from src.util.reaction_store import CustomReactionStore, payload_key, CONTENTS, AUTHOR, DATE
+
+BATCH_SIZE = 500
+MAX_CONTENTS_LENGTH = 2000  # The longest Message Discord allows
+
+
+def export_lines(store: CustomReactionStore, guild_id: int, batch_size: int = BATCH_SIZE):
+    """
+    Export the Custom Reactions of a Guild as NDJSON Lines.
+
+    :param store: The Custom Reactions
+    :param guild_id: The Guild to export
+    :param batch_size: The amount of Lines per Batch
+    :return: A Generator of Lists of at most batch_size Lines
+    """
+    # Only References to the stored Custom Reactions are taken here, the Contents are resolved per Batch
+    reactions = store.all_on_guild(guild_id) or []
+    for start in range(0, len(reactions), batch_size):
+        lines = []
+        for name, entry in reactions[start:start + batch_size]:
+            contents = store.payload(entry[CONTENTS])
+            if contents is None:  # Removed while the Export was running
+                continue
+            lines.append(json.dumps({'name': name, 'contents': contents,
+                                     'author': entry[AUTHOR], 'date': entry[DATE]}) + '\n')
+        yield lines
+
+
+def _parse(line: str):
+    """
+    Parse and validate a single NDJSON Line.
+
+    :return: A (name, contents, author, date) Tuple, or None if the Line is not a valid Custom Reaction
+    """
+    try:
+        record = json.loads(line)
+        name, contents = record['name'].lower(), record['contents']
+        author, date = str(record.get('author', 'Import')), record.get('date')
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+    if not name or name == 'add' or len(name.split()) != 1 or not isinstance(contents, str) \
+            or not contents.strip() or len(contents) > MAX_CONTENTS_LENGTH:
+        return None
+    return name, contents, author, date if isinstance(date, str) else None
+
+
+def import_lines(store: CustomReactionStore, guild_id: int, lines, batch_size: int = BATCH_SIZE):
+    """
+    Import NDJSON Lines as Custom Reactions on a Guild. Custom Reactions that already exist on the Guild
+    with the same Name and Contents, or that appear twice in the Import, are skipped.
+
+    :param store: The Custom Reactions
+    :param guild_id: The Guild to import into
+    :param lines: An Iterable of NDJSON Lines, e.g. an open File
+    :param batch_size: The amount of Lines per Batch
+    :return: A Generator yielding the Statistics after every Batch, as { "added": x, "duplicates": y, "invalid": z }
+    """
+    seen = store.fingerprints(guild_id)
+    stats = {'added': 0, 'duplicates': 0, 'invalid': 0}
+    batch = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        parsed = _parse(line)
+        if parsed is None:
+            stats['invalid'] += 1
+        else:
+            name, contents, author, date = parsed
+            fingerprint = (name, payload_key(contents))
+            if fingerprint in seen:
+                stats['duplicates'] += 1
+            else:
+                seen.add(fingerprint)
+                store.add(guild_id, name, contents, author, date)
+                stats['added'] += 1
+        batch += 1
+        if batch == batch_size:
+            batch = 0
+            yield stats
+    yield stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import or export the Custom Reactions of a Guild as NDJSON.')
+    parser.add_argument('action', choices=('import', 'export'))
+    parser.add_argument('guild_id', type=int)
+    parser.add_argument('path', nargs='?', help='the NDJSON File, defaults to stdout for Exports')
+    parser.add_argument('--config', default=os.path.join('config', 'custom_reactions.json'),
+                        help='the Custom Reaction Configuration')
+    args = parser.parse_args()
+    with open(args.config) as f:
+        reactions = json.load(f)
+    store = CustomReactionStore(reactions)
+    if args.action == 'export':
+        out = sys.stdout if args.path is None else open(args.path, 'w')
+        with out:
+            for lines in export_lines(store, args.guild_id):
+                out.writelines(lines)
+        return 0
+    if args.path is None:
+        parser.error('import needs the Path of an NDJSON File')
+    with open(args.path) as f:
+        for stats in import_lines(store, args.guild_id, f):
+            pass
+    print(f'Added {stats["added"]}, skipped {stats["duplicates"]} Duplicates and {stats["invalid"]} invalid Lines.')
+    with open(args.config, 'w') as f:
+        json.dump(reactions, f, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import asyncio
+import collections
+import time
+
+TOP_K_CAPACITY = 50  # Counters kept per Guild for finding the most used Custom Reactions
+
+# Fields of the persisted Usage per Custom Reaction
+COUNT, LAST_USED = range(2)
+
+
+class ReactionUsage:
+    def __init__(self, state: dict):
+        """
+        Counts how often each Custom Reaction is used.
+
+        Uses are only counted in Memory when they happen, and merged into the persisted State in Batches by flush(),
+        so sending a Custom Reaction never writes to Disk. The most used Custom Reactions of each Guild are tracked
+        with the Space-Saving Algorithm: at most TOP_K_CAPACITY Counters per Guild, where a Custom Reaction which is
+        not counted yet replaces the least used one and inherits its Count as possible Error.
+
+        :param state: The persisted Usage, in the Format
+                      { "guild_id": { "counts": { "reaction_id": [count, last used] },
+                                      "top": { "reaction_id": [count, error] } } }.
+                      It is modified in place.
+        """
+        self._state = state
+        self._pending = collections.Counter()  # (guild_id, reaction_id) -> Uses since the last Flush
+        self._pending_last_used = dict()  # (guild_id, reaction_id) -> UNIX Timestamp of the last Use
+
+    def record(self, guild_id: int, reaction_id: int, now: float = None):
+        """
+        Count a single Use of a Custom Reaction.
+
+        :param guild_id: The Guild on which the Custom Reaction was used
+        :param reaction_id: The ID of the Custom Reaction
+        :param now: An optional UNIX Timestamp of the Use, defaults to now
+        """
+        key = (str(guild_id), str(reaction_id))
+        self._pending[key] += 1
+        self._pending_last_used[key] = int(time.time() if now is None else now)
+        top = self._state.setdefault(key[0], {'counts': dict(), 'top': dict()})['top']
+        counter = top.get(key[1])
+        if counter is None:
+            if len(top) < TOP_K_CAPACITY:
+                counter = top[key[1]] = [0, 0]
+            else:
+                least_used = min(top, key=lambda x: top[x][0])
+                count = top.pop(least_used)[0]
+                counter = top[key[1]] = [count, count]
+        counter[0] += 1
+
+    def flush(self):
+        """
+        Merge all Uses counted since the last Flush into the persisted State.
+
+        :return: The amount of Custom Reactions whose Usage changed
+        """
+        pending, self._pending = self._pending, collections.Counter()
+        last_used, self._pending_last_used = self._pending_last_used, dict()
+        for (guild_id, reaction_id), uses in pending.items():
+            usage = self._state[guild_id]['counts'].setdefault(reaction_id, [0, 0])
+            usage[COUNT] += uses
+            usage[LAST_USED] = max(usage[LAST_USED], last_used[(guild_id, reaction_id)])
+        return len(pending)
+
+    def forget(self, guild_id: int, reaction_id: int):
+        """
+        Drop the Usage of a removed Custom Reaction.
+        """
+        guild = self._state.get(str(guild_id))
+        if guild is not None:
+            guild['counts'].pop(str(reaction_id), None)
+            guild['top'].pop(str(reaction_id), None)
+        self._pending.pop((str(guild_id), str(reaction_id)), None)
+        self._pending_last_used.pop((str(guild_id), str(reaction_id)), None)
+
+    def top(self, guild_id: int, amount: int = 10):
+        """
+        Get the most used Custom Reactions on a Guild.
+
+        :param guild_id: The Guild for which to get the most used Custom Reactions
+        :param amount: The maximum amount of Custom Reactions to return
+        :return: A List of (reaction_id, uses) Tuples, most used first. Counts may be overestimated
+                 for Custom Reactions that only recently became popular.
+        """
+        top = self._state.get(str(guild_id), {}).get('top', {})
+        best = sorted(top.items(), key=lambda x: x[1][0], reverse=True)[:amount]
+        return [(int(reaction_id), count) for reaction_id, (count, _) in best]
+
+    def last_used(self, guild_id: int, reaction_id: int):
+        """
+        Get when a Custom Reaction was used last.
+
+        :return: A UNIX Timestamp, or None if the Custom Reaction was never used
+        """
+        key = (str(guild_id), str(reaction_id))
+        if key in self._pending_last_used:
+            return self._pending_last_used[key]
+        usage = self._state.get(key[0], {}).get('counts', {}).get(key[1])
+        return None if usage is None else usage[LAST_USED]
+
+    async def run_flush(self, save, interval: float = 300):
+        """
+        Periodically flush the counted Uses and save them if anything changed. Runs forever.
+
+        :param save: A Function which persists the State
+        :param interval: The Time between two Flushes in Seconds
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if self.flush():
+                save()
@@ -0,0 +1,75 @@
+import collections
+import math
+import re
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text: str):
+    """
+    Split a Text into lowercase Words.
+
+    :param text: The Text to split
+    :return: A List of Words
+    """
+    return _WORD.findall(text.lower())
+
+
+class InvertedIndex:
+    def __init__(self):
+        """
+        An Inverted Index over Documents consisting of weighted Fields.
+        Every Word maps to the Documents containing it, along with the weighted Count of the Word in them.
+        Searching only walks the Postings of the searched Words, and ranks Documents by TF-IDF.
+        """
+        self._postings = collections.defaultdict(dict)
+        self._documents = dict()
+
+    def add(self, key, fields: list):
+        """
+        Add a Document to the Index, replacing a previous one with the same Key.
+
+        :param key: The Key under which the Document is returned by search()
+        :param fields: A List of (text, weight) Pairs, e.g. [(name, 3), (contents, 1)]
+        """
+        self.remove(key)
+        weights = collections.Counter()
+        for text, weight in fields:
+            for word in tokenize(text):
+                weights[word] += weight
+        for word, weight in weights.items():
+            self._postings[word][key] = weight
+        self._documents[key] = list(weights)
+
+    def remove(self, key):
+        """
+        Remove a Document from the Index. Only the Postings of its own Words are touched.
+
+        :param key: The Key of the Document
+        """
+        for word in self._documents.pop(key, []):
+            postings = self._postings[word]
+            del postings[key]
+            if not postings:
+                del self._postings[word]
+
+    def search(self, query: str, limit: int = 10):
+        """
+        Search for Documents containing any Word of the Query, best Matches first.
+
+        :param query: The Words to search for
+        :param limit: The maximum amount of Results
+        :return: A List of Document Keys
+        """
+        scores = collections.Counter()
+        for word in set(tokenize(query)):
+            postings = self._postings.get(word)
+            if not postings:
+                continue
+            idf = math.log(1 + len(self._documents) / len(postings))
+            for key, weight in postings.items():
+                scores[key] += (1 + math.log(weight)) * idf
+        return [key for key, _ in scores.most_common(limit)]
+
+    def __len__(self):
+        return len(self._documents)
@@ -0,0 +1,384 @@
+import asyncio
+import heapq
+import itertools
+import random
+
+import discord
+
+from src import bot
+from src.util import embeds
+from src.util.data_cruncher import data
+
+INITIAL_JOIN_TIMEOUT = 25  # Timeout for each User to join when a game is started
+TIMEOUT_AFTER_JOIN = 8  # Timeout after at least one User joined
+MINIMUM_USERS_FOR_TRIVIA = 2  # Minimum Users needed to start a Game
+TIME_PER_QUESTION = 20  # Time Users have per question
+STOP_AFTER_UNANSWERED_ROUNDS = 100  # Stop after this amount of unanswered Questions consecutively
+WRONG_ANSWER_PENALTY = 3  # Time penalty for a wrong answer by a participant
+GET_THIS_AMOUNT_OF_POINTS = 10  # The Amount of Points one User has to get to win
+STOP_COMMANDS = ('>stoptrivia', '>stop', '>stahp', '>quit')
+SAVE_INTERVAL = 10  # Seconds between writing the running Games to disk, if any of them changed
+
+JOINING = 'joining'
+ASKING = 'asking'
+FINISHED = 'finished'
+
+
+class Scheduler:
+    def __init__(self):
+        """
+        A single Task which runs all Trivia Timeouts, ordered by their Deadline in a Heap.
+        """
+        self._heap = []
+        self._counter = itertools.count()
+        self._wakeup = None
+        self._task = None
+
+    def call_later(self, delay: float, callback):
+        """
+        Schedule a Coroutine Function to be run after the given Delay.
+
+        :param delay: The Delay in Seconds
+        :param callback: A Coroutine Function taking no Arguments
+        :return: A Handle which can be passed to cancel()
+        """
+        loop = asyncio.get_event_loop()
+        handle = [loop.time() + delay, next(self._counter), callback]
+        heapq.heappush(self._heap, handle)
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        elif self._heap[0] is handle:
+            self._wakeup.set()
+        return handle
+
+    @staticmethod
+    def cancel(handle):
+        if handle is not None:
+            handle[2] = None  # Lazily dropped once it reaches the Top of the Heap
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        while self._heap:
+            while self._heap and self._heap[0][2] is None:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(0, self._heap[0][0] - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+            while self._heap and self._heap[0][0] <= loop.time():
+                callback = heapq.heappop(self._heap)[2]
+                if callback is not None:
+                    loop.create_task(callback())
+
+
+class TriviaGame:
+    def __init__(self, guild_id: int, channel_id: int, starter_id: int, topic: str):
+        """
+        The State of a single Trivia Game, running in one Channel.
+        All Transitions are driven by Messages routed to it and by Timeouts from the Scheduler.
+
+        :param guild_id: The Guild on which the Game is played
+        :param channel_id: The Channel in which the Game is played
+        :param starter_id: The User who started the Game
+        :param topic: The Trivia Topic, as found in the Trivia Configuration
+        """
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.starter_id = starter_id
+        self.topic = topic
+        self.state = JOINING
+        self.participants = {starter_id}
+        self.stats = dict()  # Per Participant: [correct answers, guesses, answer time in ms]
+        self.asked = []  # Indices of the Questions asked so far, drawn from the Question Sampler
+        self.position = -1
+        self.unanswered_rounds = 0
+        self.deadline = 0
+        self.asked_at = 0
+        self._timeout = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def channel(self):
+        return bot.client.get_channel(self.channel_id)
+
+    @property
+    def question(self):
+        return data.get_trivia(self.topic)['questions'][self.asked[self.position]]
+
+    def to_dict(self):
+        return {
+            'guild': self.guild_id,
+            'starter': self.starter_id,
+            'topic': self.topic,
+            'state': self.state,
+            'participants': list(self.participants),
+            'stats': {str(k): v for k, v in self.stats.items()},
+            'asked': self.asked,
+            'position': self.position,
+            'unanswered': self.unanswered_rounds
+        }
+
+    @classmethod
+    def from_dict(cls, channel_id: int, saved: dict):
+        game = cls(saved['guild'], channel_id, saved['starter'], saved['topic'])
+        game.state = saved['state']
+        game.participants = set(saved['participants'])
+        game.stats = {int(k): v for k, v in saved['stats'].items()}
+        game.asked = saved['asked']
+        game.position = saved['position']
+        game.unanswered_rounds = saved['unanswered']
+        return game
+
+    def _set_timeout(self, delay: float):
+        scheduler.cancel(self._timeout)
+        position = self.position
+        loop = asyncio.get_event_loop()
+        self.deadline = loop.time() + delay
+
+        async def on_timeout():
+            async with self._lock:
+                if self.state != FINISHED and self.position == position:
+                    await self._handle_timeout()
+
+        self._timeout = scheduler.call_later(delay, on_timeout)
+
+    async def start(self):
+        starter = self.channel.guild.get_member(self.starter_id)
+        await embeds.desc_only(self.channel, f'**{starter.display_name if starter else f"<@{self.starter_id}>"}** '
+                                             f'wants to start a Trivia Game! Type `>join` to join!',
+                               discord.Color.gold())
+        self._set_timeout(INITIAL_JOIN_TIMEOUT)
+        router.save()
+
+    async def resume(self):
+        """
+        Continue a Game that was running when the Bot was restarted.
+        """
+        async with self._lock:
+            await self._resume()
+
+    async def _resume(self):
+        if self.state == JOINING:
+            await embeds.desc_only(self.channel, f'The **{self.topic}** Trivia Game is still accepting Players! '
+                                                 f'Type `>join` to join!', discord.Color.gold())
+            self._set_timeout(INITIAL_JOIN_TIMEOUT if len(self.participants) < 2 else TIMEOUT_AFTER_JOIN)
+        else:
+            await embeds.desc_only(self.channel, f'Resuming the **{self.topic}** Trivia Game...', discord.Color.gold())
+            self.position -= 1
+            await self._next_question()
+
+    async def handle(self, msg):
+        """
+        Handle a Message sent in the Channel of this Game.
+
+        :param msg: The Message to handle
+        """
+        async with self._lock:
+            if self.state == FINISHED:
+                return
+            if msg.content == '>join':
+                await self._join(msg.author)
+            elif msg.content.startswith('>leave'):
+                await self._leave(msg.author)
+            elif self.state == ASKING and msg.content in STOP_COMMANDS:
+                await embeds.desc_only(self.channel, f'**Trivia stopped** upon Request by **{msg.author.mention}**.',
+                                       discord.Color.red())
+                await self._reward()
+            elif self.state == ASKING and msg.author.id in self.participants:
+                await self._guess(msg)
+
+    async def _join(self, member):
+        if member.id in self.participants:
+            return await embeds.desc_only(self.channel, f'You (**{member.display_name}**) are already '
+                                                        f'participating!', discord.Color.red())
+        self.participants.add(member.id)
+        await embeds.desc_only(self.channel, f'✅ You (**{member.display_name}**) joined the **'
+                                             f'{self.topic}** Trivia Game! Total: **{len(self.participants)}**',
+                               discord.Color.green())
+        if self.state == JOINING:
+            self._set_timeout(INITIAL_JOIN_TIMEOUT if len(self.participants) < 2 else TIMEOUT_AFTER_JOIN)
+        router.save()
+
+    async def _leave(self, member):
+        if member.id not in self.participants:
+            return await embeds.desc_only(self.channel, f'You (**{member.display_name}**) are not participating'
+                                                        f' in the Trivia Game!', discord.Color.red())
+        self.participants.remove(member.id)
+        await embeds.desc_only(self.channel, f'✅ You (**{member.display_name}**) are no longer '
+                                             f'participating in the Trivia Game!', discord.Color.green())
+        if self.state == JOINING:
+            self._set_timeout(INITIAL_JOIN_TIMEOUT if len(self.participants) < 2 else TIMEOUT_AFTER_JOIN)
+        router.save()
+
+    async def _guess(self, msg):
+        stats = self.stats.setdefault(msg.author.id, [0, 0, 0])
+        stats[1] += 1
+        if not data.get_trivia_answers(self.topic, self.asked[self.position]).match(msg.content):
+            remaining = self.deadline - asyncio.get_event_loop().time() - WRONG_ANSWER_PENALTY
+            if remaining <= 0:
+                return await self._handle_timeout()
+            return self._set_timeout(remaining)
+
+        await embeds.desc_only(self.channel, f'**{msg.author.mention}**, you guessed it!', discord.Color.green())
+        self.unanswered_rounds = 0
+        stats[0] += 1
+        stats[2] += int((asyncio.get_event_loop().time() - self.asked_at) * 1000)
+        if stats[0] >= GET_THIS_AMOUNT_OF_POINTS:
+            return await self._reward()
+        await self._next_question()
+
+    async def _handle_timeout(self):
+        if self.state == JOINING:
+            return await self._begin()
+        await embeds.desc_only(self.channel, f'Nobody responded it in time. The answer was: **{self.question["a"]}**',
+                               discord.Color.dark_gold())
+        self.unanswered_rounds += 1
+        if self.unanswered_rounds >= STOP_AFTER_UNANSWERED_ROUNDS:
+            await embeds.desc_only(self.channel, f'I did not receive any Trivia Responses within the past **'
+                                                 f'{STOP_AFTER_UNANSWERED_ROUNDS} rounds** - time to stop!')
+            return self._finish()
+        await self._next_question()
+
+    async def _begin(self):
+        if len(self.participants) < MINIMUM_USERS_FOR_TRIVIA:
+            await embeds.desc_only(self.channel, f'**Not enough Users joined** - you need **at least '
+                                                 f'{MINIMUM_USERS_FOR_TRIVIA} Users** to start a Trivia Game, '
+                                                 f'but only {len(self.participants)} joined!', discord.Color.red())
+            return self._finish()
+
+        await embeds.desc_only(self.channel, f'Starting Trivia Game with **{len(self.participants)} User'
+                                             f'{"s" if len(self.participants) > 1 else ""}**...')
+        data.timeout_trivia_user(self.starter_id)
+        self.state = ASKING
+        await self._next_question()
+
+    async def _next_question(self):
+        self.position += 1
+        if self.position >= len(data.get_trivia(self.topic)['questions']):
+            return await self._reward()
+        elif self.position == len(self.asked):
+            self.asked.append(data.draw_trivia_question(self.guild_id, self.topic))
+
+        description = self.question['q']
+        for key in self.question:
+            if key in ('1', '2', '3', '4'):
+                description += f'\n **{key}:** {self.question[key]}'
+        await embeds.title_and_desc(self.channel, f'- Trivia Question #{self.position + 1} -',
+                                    description, discord.Color.gold())
+        self._set_timeout(TIME_PER_QUESTION)
+        self.asked_at = asyncio.get_event_loop().time()
+        router.save()
+
+    async def _reward(self):
+        """
+        Reward Users at the end of the Game and finish it.
+        """
+        sorted_correct = sorted(((k, v[0]) for k, v in self.stats.items() if v[0] > 0),
+                                key=lambda x: x[1], reverse=True)
+        self._finish(sorted_correct[0][0] if sorted_correct else None)
+        reward_chimes = random.randrange(1, 4)
+        results = ''
+        if len(sorted_correct) < 1:
+            return await embeds.title_and_desc(self.channel, '- Trivia Game Results -',
+                                               'Nobody guessed anything. That\'s... interesting.',
+                                               discord.Color.gold())
+        guild = self.channel.guild
+        for index, (user_id, points) in enumerate(sorted_correct):
+            # Users who left and are no longer cached are still listed, but can't receive Chimes
+            member = guild.get_member(user_id) or bot.client.get_user(user_id)
+            mention = f'<@{user_id}>' if member is None else member.mention
+            if index == 0 and member is not None:
+                results += f'**{mention}** won with **{points}** Points and received **{reward_chimes} ' \
+                           f'Chime{"s" if reward_chimes > 1 else ""}** for it! :confetti_ball: :sparkler:\n'
+                data.modify_currency_of_user(self.guild_id, member, reward_chimes)
+            elif index == 0:
+                results += f'**{mention}** won with **{points}** Points! :confetti_ball: :sparkler:\n'
+            else:
+                results += f'**#{index + 1}**: {mention} with {points} points!\n'
+        return await embeds.title_and_desc(self.channel, '- Trivia Game Results -', results, discord.Color.gold())
+
+    def _finish(self, winner_id: int = None):
+        self.state = FINISHED
+        scheduler.cancel(self._timeout)
+        router.remove(self.channel_id)
+        if self.stats:
+            data.record_trivia_game(self.guild_id, self.stats, winner_id)
+
+
+class Router:
+    def __init__(self):
+        """
+        Routes Messages to the Trivia Game running in their Channel, if there is one.
+        Changes to the Games only mark them as unsaved, they are written to disk by run_flush.
+        """
+        self.games = dict()
+        self._dirty = False
+
+    def get(self, channel_id: int):
+        return self.games.get(channel_id)
+
+    async def start(self, msg, topic: str):
+        game = self.games[msg.channel.id] = TriviaGame(msg.guild.id, msg.channel.id, msg.author.id, topic)
+        await game.start()
+
+    async def dispatch(self, msg):
+        """
+        Pass a Message on to the Game running in its Channel.
+
+        :param msg: The Message to dispatch
+        :return: True if a Game is running in the Channel, False otherwise
+        """
+        game = self.games.get(msg.channel.id)
+        if game is None or msg.author.id == bot.client.user.id:
+            return False
+        await game.handle(msg)
+        return True
+
+    def remove(self, channel_id: int):
+        if self.games.pop(channel_id, None) is not None:
+            self.save()
+
+    def save(self):
+        self._dirty = True
+
+    def flush(self):
+        """
+        Write the running Games to disk, if they changed since they were last written.
+        """
+        if self._dirty:
+            self._dirty = False
+            data.set_trivia_games({str(k): v.to_dict() for k, v in self.games.items()})
+
+    async def run_flush(self, interval: float = SAVE_INTERVAL):
+        """
+        Periodically write the running Games to disk, so they can be resumed even if the Bot does not
+        shut down cleanly. Runs forever.
+
+        :param interval: The Time between two Writes in Seconds
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.flush()
+
+    async def restore(self):
+        """
+        Resume all Games that were running when the Bot shut down.
+        Games that are still running, e.g. after a Reconnect, are left alone.
+        """
+        for channel_id, saved in data.get_trivia_games().items():
+            if int(channel_id) in self.games:
+                continue
+            game = TriviaGame.from_dict(int(channel_id), saved)
+            if game.channel is None or data.get_trivia(game.topic) is None:
+                continue
+            self.games[game.channel_id] = game
+            await game.resume()
+        self.save()
+
+
+scheduler = Scheduler()
+router = Router()
@@ -0,0 +1,141 @@
+"""
+Offline Linter for Trivia Question Banks.
+
+Finds Questions that are Duplicates or close Paraphrases of each other, and reports those whose Answers conflict.
+Questions are shingled into Words and Word Pairs and summarized by MinHash Signatures; Locality-Sensitive Hashing
+over Bands of the Signatures yields Candidate Pairs, so the Bank is never compared pairwise.
+Shingles shared by a large Part of the Bank - Templates like "What is the name of" - are ignored,
+so that Questions built from the same Template only match if their distinctive Parts do. Very short Words
+like "Q", "W" or Numbers are kept even if they are common, since they often are the distinctive Part.
+
+Usage: python -m src.util.trivia_lint [config/trivia.json] [--threshold 0.6]
+"""
+import argparse
+import collections
+import json
+import random
+import sys
+
+from src.util.answer_matching import normalize
+
+BANDS = 16
+ROWS = 4  # BANDS * ROWS Hash Functions, Candidates need a Similarity of roughly (1 / BANDS) ** (1 / ROWS)
+COMMON_SHINGLE_RATIO = 0.02  # Shingles found in more than this Share of Questions are ignored
+_PRIME = (1 << 61) - 1
+_HASH_FUNCTIONS = [(random.Random(idx).randrange(1, _PRIME), random.Random(-idx).randrange(_PRIME))
+                   for idx in range(BANDS * ROWS)]
+
+
+def shingles(text: str):
+    """
+    Get the hashed Words and Word Pairs of a normalized Question.
+
+    :param text: The Question Text
+    :return: A Set of 64-bit Shingle Hashes
+    """
+    words = normalize(text).split()
+    # The built-in String Hash is randomized per Process, which is fine since Signatures are never persisted
+    return {hash(x) & 0xFFFFFFFFFFFFFFFF for x in words + [f'{a} {b}' for a, b in zip(words, words[1:])]}
+
+
+def signature(hashes: set):
+    """
+    Get the MinHash Signature of a Set of Shingle Hashes, using universal Hash Functions (a * x + b) mod p.
+
+    :param hashes: The Shingle Hashes
+    :return: A Tuple of BANDS * ROWS minimal Hash Values
+    """
+    return tuple(min((a * x + b) % _PRIME for x in hashes) for a, b in _HASH_FUNCTIONS)
+
+
+def similarity(a: set, b: set) -> float:
+    """
+    Get the Jaccard Similarity of two Sets of Shingles. Only used to verify Candidate Pairs found through LSH.
+    """
+    return len(a & b) / len(a | b)
+
+
+def find_clusters(questions: list, threshold: float):
+    """
+    Group near-duplicate Questions into Clusters.
+
+    :param questions: The Questions, as found in the Trivia Configuration
+    :param threshold: The Similarity above which two Questions are considered Duplicates
+    :return: A List of Clusters, each a sorted List of Question Indices with at least two Entries
+    """
+    shingle_sets = [shingles(question['q']) for question in questions]
+    short_words = {hash(x) & 0xFFFFFFFFFFFFFFFF for question in questions
+                   for x in normalize(question['q']).split() if len(x) == 1 or x.isdigit()}
+    document_frequency = collections.Counter(x for shingle_set in shingle_sets for x in shingle_set)
+    max_frequency = max(20, int(len(questions) * COMMON_SHINGLE_RATIO))
+    common = {x for x, count in document_frequency.items() if count > max_frequency} - short_words
+    shingle_sets = [x - common for x in shingle_sets]
+    signatures = [signature(x) if x else None for x in shingle_sets]
+    parent = list(range(len(questions)))
+
+    def find(idx):
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+        return idx
+
+    checked = set()  # Candidate Pairs often share several Bands, but are only compared once
+    for band in range(BANDS):
+        buckets = dict()
+        for idx, sig in enumerate(signatures):
+            if sig is None:  # Nothing but Template Text
+                continue
+            buckets.setdefault(sig[band * ROWS:(band + 1) * ROWS], []).append(idx)
+        for bucket in buckets.values():
+            # Members of a Bucket need not be similar to each other, so every Pair in it is a Candidate
+            for pos, a in enumerate(bucket):
+                for b in bucket[pos + 1:]:
+                    root_a, root_b = find(a), find(b)
+                    if root_a == root_b or (a, b) in checked:
+                        continue
+                    checked.add((a, b))
+                    if similarity(shingle_sets[a], shingle_sets[b]) >= threshold:
+                        parent[root_b] = root_a
+
+    clusters = dict()
+    for idx in range(len(questions)):
+        clusters.setdefault(find(idx), []).append(idx)
+    return [sorted(x) for x in clusters.values() if len(x) > 1]
+
+
+def lint(trivia: dict, threshold: float):
+    """
+    Lint all Topics of a Trivia Configuration, printing every near-duplicate Cluster.
+
+    :param trivia: The Trivia Configuration, in the Format of config/trivia.json
+    :param threshold: The Similarity above which two Questions are considered Duplicates
+    :return: The amount of Clusters whose Answers conflict
+    """
+    conflicts = 0
+    for topic, contents in trivia.items():
+        questions = contents['questions']
+        clusters = find_clusters(questions, threshold)
+        print(f'{topic}: {len(questions)} Questions, {len(clusters)} near-duplicate Clusters.')
+        for cluster in clusters:
+            answers = {normalize(str(questions[idx]['a'])) for idx in cluster}
+            if len(answers) > 1:
+                conflicts += 1
+            print(f'  {"CONFLICT" if len(answers) > 1 else "Duplicate"}:')
+            for idx in cluster:
+                print(f'    #{idx}: {questions[idx]["q"]!r} -> {questions[idx]["a"]!r}')
+    return conflicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find near-duplicate Questions in a Trivia Question Bank.')
+    parser.add_argument('path', nargs='?', default='config/trivia.json', help='the Trivia Configuration to lint')
+    parser.add_argument('--threshold', type=float, default=0.6, help='Similarity to report (0 - 1)')
+    args = parser.parse_args()
+    with open(args.path) as f:
+        conflicts = lint(json.load(f), args.threshold)
+    print(f'Found {conflicts} Clusters with conflicting Answers.')
+    return 1 if conflicts else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import datetime
+import struct
+import time
+
+# One Record per Player and Game: finished at, Guild ID, User ID, correct Answers, Guesses, Answer Time (ms), won
+RECORD = struct.Struct('<IQQHHIB')
+
+# Aggregate Fields, in the Order in which they are stored per User
+GAMES, WINS, CORRECT, GUESSES, ANSWER_MS = range(5)
+
+ALL_TIME = 'all'
+TOP_SIZE = 10
+
+
+def season_of(timestamp: float) -> str:
+    """
+    Get the Season a Timestamp belongs to. Seasons are Quarters of the Year, e.g. "2017-Q2".
+
+    :param timestamp: The UNIX Timestamp
+    :return: The Name of the Season
+    """
+    date = datetime.datetime.utcfromtimestamp(timestamp)
+    return f'{date.year}-Q{(date.month - 1) // 3 + 1}'
+
+
+class TriviaScoreboard:
+    def __init__(self, aggregates: dict, log_path: str):
+        """
+        Keeps all-time and seasonal Trivia Statistics per Guild.
+
+        Every finished Game is appended to a binary Log as compact Records, and the running Aggregates are updated
+        in place, so the History never needs to be read again. The best Players of each Guild and Season are kept
+        in a small sorted List which is updated along with the Aggregates.
+
+        :param aggregates: The persisted Aggregates, in the Format
+                           { "guild_id": { "season": { "user_id": [games, wins, correct, guesses, answer_ms] } } }.
+                           It is modified in place.
+        :param log_path: The Path of the binary Log to which Game Records are appended
+        """
+        self._aggregates = aggregates
+        self._log_path = log_path
+        self._top = dict()
+        for guild_id, seasons in aggregates.items():
+            for season, users in seasons.items():
+                top = sorted(users.items(), key=lambda x: x[1][CORRECT], reverse=True)[:TOP_SIZE]
+                self._top[(guild_id, season)] = [user_id for user_id, _ in top]
+
+    def record_game(self, guild_id: int, results: dict, winner_id: int = None, finished_at: float = None):
+        """
+        Record the Results of a finished Game.
+
+        :param guild_id: The Guild on which the Game was played
+        :param results: The Results per Participant, in the Format { user_id: [correct, guesses, answer_ms] }
+        :param winner_id: The User who won the Game, if anybody did
+        :param finished_at: An optional UNIX Timestamp of the End of the Game, defaults to now
+        """
+        finished_at = time.time() if finished_at is None else finished_at
+        guild = self._aggregates.setdefault(str(guild_id), dict())
+        records = bytearray()
+        for user_id, (correct, guesses, answer_ms) in results.items():
+            won = user_id == winner_id
+            records += RECORD.pack(int(finished_at), int(guild_id), int(user_id),
+                                   min(correct, 0xFFFF), min(guesses, 0xFFFF), min(answer_ms, 0xFFFFFFFF), won)
+            for season in (ALL_TIME, season_of(finished_at)):
+                stats = guild.setdefault(season, dict()).setdefault(str(user_id), [0, 0, 0, 0, 0])
+                stats[GAMES] += 1
+                stats[WINS] += won
+                stats[CORRECT] += correct
+                stats[GUESSES] += guesses
+                stats[ANSWER_MS] += answer_ms
+                self._update_top(str(guild_id), season, str(user_id))
+        with open(self._log_path, 'ab') as f:
+            f.write(records)
+
+    def _update_top(self, guild_id: str, season: str, user_id: str):
+        users = self._aggregates[guild_id][season]
+        top = self._top.setdefault((guild_id, season), [])
+        if user_id not in top:
+            if len(top) >= TOP_SIZE and users[top[-1]][CORRECT] >= users[user_id][CORRECT]:
+                return
+            top.append(user_id)
+        # Scores only ever grow, so the User can only move up
+        idx = top.index(user_id)
+        while idx > 0 and users[top[idx - 1]][CORRECT] < users[user_id][CORRECT]:
+            top[idx - 1], top[idx] = top[idx], top[idx - 1]
+            idx -= 1
+        del top[TOP_SIZE:]
+
+    def top(self, guild_id: int, season: str = ALL_TIME):
+        """
+        Get the best Players of a Guild in the given Season.
+
+        :param guild_id: The Guild for which to get the best Players
+        :param season: The Season, as returned by season_of, or ALL_TIME
+        :return: A List of (user_id, [games, wins, correct, guesses, answer_ms]) Tuples, best first
+        """
+        users = self._aggregates.get(str(guild_id), {}).get(season, {})
+        return [(int(user_id), users[user_id]) for user_id in self._top.get((str(guild_id), season), [])]
@@ -0,0 +1,111 @@
+import time
+
+
+class TTLMap:
+    def __init__(self, resolution: float = 1, slots: int = 512):
+        """
+        A Mapping whose Entries expire after a Time-to-Live.
+
+        Expiry is handled by a hashed Timing Wheel: every Entry is put into the Slot of the Tick in which it expires,
+        and the Slots that passed since the last Operation are swept on the next one. Lookups, Inserts and Removals
+        are O(1), and the Sweeping is amortized over them, so expired Entries never pile up.
+        Expiry Times are UNIX Timestamps, so they stay meaningful when persisted across Restarts.
+
+        :param resolution: The Length of a single Tick in Seconds
+        :param slots: The amount of Slots on the Wheel
+        """
+        self._resolution = resolution
+        self._wheel = [set() for _ in range(slots)]
+        self._entries = dict()
+        self._tick = self._tick_of(time.time())
+
+    def _tick_of(self, timestamp: float) -> int:
+        return int(timestamp // self._resolution)
+
+    def _advance(self):
+        now = time.time()
+        current = self._tick_of(now)
+        # A full Turn of the Wheel visits every Slot, there is no need to sweep more than that
+        for tick in range(max(self._tick + 1, current - len(self._wheel) + 1), current + 1):
+            slot = self._wheel[tick % len(self._wheel)]
+            for key in [k for k in slot if self._entries[k][0] <= now]:
+                slot.discard(key)
+                del self._entries[key]
+        self._tick = current
+
+    def set(self, key, value=None, ttl: float = 0, expires_at: float = None):
+        """
+        Insert or replace an Entry.
+
+        :param key: The Key of the Entry
+        :param value: The Value of the Entry
+        :param ttl: The Time-to-Live in Seconds
+        :param expires_at: An optional UNIX Timestamp at which the Entry expires, used instead of the TTL
+        """
+        self._advance()
+        self.discard(key)
+        expiry = time.time() + ttl if expires_at is None else expires_at
+        # An Entry goes into the first Tick starting after its Expiry, since a Tick is swept as soon as it begins.
+        # Ticks that were already swept are skipped, as their Slots only come around again a full Turn later.
+        slot = max(self._tick_of(expiry) + 1, self._tick + 1) % len(self._wheel)
+        self._wheel[slot].add(key)
+        self._entries[key] = (expiry, value, slot)
+
+    def get(self, key, default=None):
+        """
+        Get the Value of an Entry that has not expired yet.
+
+        :param key: The Key to look up
+        :param default: Returned if there is no such Entry
+        :return: The Value of the Entry, or the Default
+        """
+        self._advance()
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            return default
+        return entry[1]
+
+    def expires_at(self, key):
+        """
+        Get the UNIX Timestamp at which an Entry expires.
+
+        :param key: The Key to look up
+        :return: The Timestamp, or None if there is no such Entry
+        """
+        self._advance()
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[0]
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._wheel[entry[2]].discard(key)
+
+    def __contains__(self, key):
+        return self.expires_at(key) is not None
+
+    def __len__(self):
+        self._advance()
+        return len(self._entries)
+
+    def dump(self):
+        """
+        Get all Entries for Persistence.
+
+        :return: A dictionary in the Format { key: [expiry timestamp, value], ... }
+        """
+        self._advance()
+        return {key: [expiry, value] for key, (expiry, value, _) in self._entries.items()}
+
+    def load(self, entries: dict):
+        """
+        Insert persisted Entries, as returned by dump(). Entries that expired in the meantime are skipped.
+
+        :param entries: A dictionary in the Format { key: [expiry timestamp, value], ... }
+        """
+        now = time.time()
+        for key, (expiry, value) in entries.items():
+            if expiry > now:
+                self.set(key, value, expires_at=expiry)
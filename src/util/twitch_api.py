@@ -0,0 +1,425 @@
+"""
+Polling and Push Notifications of Twitch Streams, independent of the Discord Client, so they can be used
+and tested on their own.
+"""
+import asyncio
+import datetime
+import hashlib
+import hmac
+import json
+import time
+
+from aiohttp import web
+
+from src.util import http_client
+from src.util.ttl_map import TTLMap
+
+STREAMS_URL = 'https://api.twitch.tv/kraken/streams/'
+HELIX_URL = 'https://api.twitch.tv/helix'
+TOKEN_URL = 'https://id.twitch.tv/oauth2/token'
+
+BATCH_SIZE = 100  # The most Channels the Twitch API accepts in a single Request
+MAX_CONCURRENT_BATCHES = 4
+MIN_INTERVAL = 30  # Seconds between two Polls right after a Stream changed its State
+MAX_INTERVAL = 180  # Seconds between two Polls when nothing changed for a while
+INTERVAL_GROWTH = 1.5
+MIN_BACKOFF = 30  # Seconds for which a Streamer is not polled after a failed Request, doubled for every Failure
+MAX_BACKOFF = 30 * 60
+
+# Push Notifications through Twitch EventSub Webhooks
+WEBHOOK_PATH = '/twitch/eventsub'
+MAX_MESSAGE_AGE = 10 * 60  # Older Notifications are rejected, and Message IDs are remembered for this long
+STREAM_EVENTS = ('stream.online', 'stream.offline')
+USERS_PER_LOOKUP = 100  # The most Logins the Twitch API accepts in a single User Lookup
+
+
+class StreamState:
+    def __init__(self):
+        """
+        What is known about a single Streamer: whether the Stream is online (None until the first successful Poll),
+        and how long to wait before asking about it again after Requests failed.
+        """
+        self.online = None
+        self.failures = 0
+        self.retry_at = 0
+
+
+class StreamPoller:
+    def __init__(self, on_change, client_id: str, url: str = STREAMS_URL):
+        """
+        Polls the Twitch API for the State of many Streams at once.
+
+        Streamers are asked about in Batches of up to BATCH_SIZE per Request, with at most MAX_CONCURRENT_BATCHES
+        Requests running at the same Time. The State is kept by Streamer Name, so Subscriptions can change
+        between Polls. The Interval between Polls shrinks to MIN_INTERVAL whenever a Stream changed its State,
+        and grows slowly up to MAX_INTERVAL while nothing happens. Streamers whose Requests failed are
+        left out for an exponentially growing Time.
+
+        :param on_change: A Coroutine Function called with (name, online) whenever a known Stream goes
+                          online or offline
+        :param client_id: The Client ID of the Bot's Twitch Application
+        :param url: The URL of the Streams Endpoint
+        """
+        self._on_change = on_change
+        self._client_id = client_id
+        self._url = url
+        self.states = dict()
+        self._etags = dict()  # Batch of Names -> (ETag, online Names) of the last Response for exactly that Batch
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+        self.interval = MIN_INTERVAL
+        self.max_interval = MAX_INTERVAL
+
+    async def _fetch_batch(self, names: tuple):
+        """
+        Get which of the given Streamers are online.
+
+        :return: A Set of the Names of online Streamers
+        :raises http_client.HTTPError: If the Request failed
+        """
+        etag, online = self._etags.get(names, (None, None))
+        headers = {} if etag is None else {'If-None-Match': etag}
+        async with self._semaphore:
+            resp = await http_client.request('GET', self._url, headers=headers,
+                                             params={'channel': ','.join(names), 'limit': str(BATCH_SIZE),
+                                                     'client_id': self._client_id})
+        if resp.status == 304 and online is not None:
+            return online
+        elif resp.status >= 400:
+            raise http_client.HTTPError(self._url, resp.status)
+        try:
+            streams = json.loads(resp.body.decode('utf-8'))['streams']
+            online = {stream['channel']['name'].lower() for stream in streams}
+        except (ValueError, KeyError, TypeError):
+            # Something is wrong here with the Twitch API.
+            raise http_client.HTTPError(self._url, resp.status, 'unexpected Response')
+        if 'ETag' in resp.headers:
+            self._etags[names] = (resp.headers['ETag'], online)
+        return online
+
+    async def _poll_batch(self, names: tuple, now: float):
+        """
+        Poll a Batch of Streamers and update their State.
+
+        :return: A List of (name, online) Tuples for the Streams that changed their State
+        """
+        try:
+            online = await self._fetch_batch(names)
+        except http_client.HTTPError as err:
+            print(f'Can\'t fetch Stream Data: {err}')
+            for name in names:
+                state = self.states[name]
+                state.failures += 1
+                state.retry_at = now + min(MAX_BACKOFF, MIN_BACKOFF * 2 ** (state.failures - 1))
+            return []
+        changes = []
+        for name in names:
+            state = self.states[name]
+            state.failures = 0
+            is_online = name in online
+            if state.online is not None and state.online != is_online:
+                changes.append((name, is_online))
+            state.online = is_online
+        return changes
+
+    async def poll(self, names: list, now: float = None):
+        """
+        Poll the given Streamers once, and report all Streams that changed their State.
+
+        :param names: The Names of the Streamers to poll
+        :param now: An optional monotonic Timestamp, defaults to now
+        :return: A List of (name, online) Tuples for the Streams that changed their State
+        """
+        now = time.monotonic() if now is None else now
+        names = sorted({name.lower() for name in names})
+        for name in set(self.states) - set(names):  # Unsubscribed
+            del self.states[name]
+        due = [name for name in names if self.states.setdefault(name, StreamState()).retry_at <= now]
+        batches = [tuple(due[idx:idx + BATCH_SIZE]) for idx in range(0, len(due), BATCH_SIZE)]
+        self._etags = {k: v for k, v in self._etags.items() if k in batches}
+        results = await asyncio.gather(*(self._poll_batch(batch, now) for batch in batches))
+        changes = [change for result in results for change in result]
+        if changes:
+            self.interval = MIN_INTERVAL
+        else:
+            self.interval = min(self.max_interval, self.interval * INTERVAL_GROWTH)
+        for name, online in changes:
+            await self._on_change(name, online)
+        return changes
+
+    async def push(self, name: str, online: bool):
+        """
+        Apply a State Change that was pushed by Twitch, so the next Poll does not report it again.
+
+        :param name: The Name of the Streamer
+        :param online: Whether the Stream went online
+        :return: True if the State changed, False if it was already known
+        """
+        state = self.states.setdefault(name.lower(), StreamState())
+        if state.online == online:
+            return False
+        state.online = online
+        await self._on_change(name.lower(), online)
+        return True
+
+
+def verify_signature(secret: str, message_id: str, timestamp: str, body: bytes, signature: str) -> bool:
+    """
+    Check that a Webhook Notification was signed by Twitch with the shared Secret.
+
+    :param secret: The Secret given to Twitch when subscribing
+    :param message_id: The Twitch-Eventsub-Message-Id Header
+    :param timestamp: The Twitch-Eventsub-Message-Timestamp Header
+    :param body: The raw Request Body
+    :param signature: The Twitch-Eventsub-Message-Signature Header, as "sha256=<hex>"
+    :return: Whether the Signature is valid
+    """
+    expected = hmac.new(secret.encode(), message_id.encode() + timestamp.encode() + body, hashlib.sha256)
+    return hmac.compare_digest(f'sha256={expected.hexdigest()}', signature)
+
+
+class WebhookReceiver:
+    def __init__(self, poller: StreamPoller, secret: str):
+        """
+        Receives stream.online and stream.offline Notifications from Twitch EventSub, so Announcements are sent
+        right away instead of on the next Poll. Notifications are only accepted with a valid Signature and a
+        recent Timestamp, and every Message ID is handled only once, since Twitch retries Deliveries.
+        The Subscriptions themselves are created by an EventSubClient, or by hand, pointing at WEBHOOK_PATH.
+
+        :param poller: The Poller whose State is updated by the Notifications
+        :param secret: The Secret used when subscribing
+        """
+        self._poller = poller
+        self._secret = secret
+        self._seen = TTLMap(resolution=10, slots=64)
+
+    async def handle(self, request):
+        """
+        Handle a single Webhook Request.
+
+        :param request: The aiohttp.web.Request
+        :return: The aiohttp.web.Response
+        """
+        body = await request.read()
+        message_id = request.headers.get('Twitch-Eventsub-Message-Id', '')
+        timestamp = request.headers.get('Twitch-Eventsub-Message-Timestamp', '')
+        signature = request.headers.get('Twitch-Eventsub-Message-Signature', '')
+        if not verify_signature(self._secret, message_id, timestamp, body, signature):
+            return web.Response(status=403)
+        try:
+            sent_at = datetime.datetime.strptime(timestamp[:19], '%Y-%m-%dT%H:%M:%S')
+            event = json.loads(body.decode('utf-8'))
+        except ValueError:
+            return web.Response(status=400)
+        if abs(datetime.datetime.utcnow() - sent_at).total_seconds() > MAX_MESSAGE_AGE:
+            return web.Response(status=403)
+        message_type = request.headers.get('Twitch-Eventsub-Message-Type')
+        if message_type == 'webhook_callback_verification':
+            return web.Response(text=event.get('challenge', ''))
+        elif message_id in self._seen:
+            return web.Response(status=204)
+        self._seen.set(message_id, ttl=MAX_MESSAGE_AGE)
+
+        if message_type == 'revocation':
+            print(f'Twitch revoked the Subscription {event.get("subscription", {}).get("type")}.')
+        elif message_type == 'notification':
+            subscription_type = event.get('subscription', {}).get('type')
+            name = event.get('event', {}).get('broadcaster_user_login')
+            if name is not None and subscription_type in STREAM_EVENTS:
+                await self._poller.push(name, subscription_type == 'stream.online')
+        return web.Response(status=204)
+
+    def app(self):
+        """
+        Build the Web Application which receives the Notifications on WEBHOOK_PATH.
+
+        :return: The aiohttp.web.Application
+        """
+        app = web.Application()
+        app.router.add_post(WEBHOOK_PATH, self.handle)
+        return app
+
+    async def start(self, port: int):
+        """
+        Start listening for Notifications on the given Port.
+        """
+        runner = web.AppRunner(self.app())
+        await runner.setup()
+        await web.TCPSite(runner, port=port).start()
+        print(f'Listening for Twitch Notifications on Port {port}.')
+
+
+class EventSubClient:
+    def __init__(self, client_id: str, client_secret: str, callback: str, secret: str,
+                 api_url: str = HELIX_URL, token_url: str = TOKEN_URL):
+        """
+        Creates and deletes the EventSub Subscriptions through which Twitch pushes stream.online and stream.offline
+        Notifications to a WebhookReceiver. Requests use an App Access Token from the Client Credentials Flow,
+        which is fetched again once Twitch rejects it.
+
+        The Subscriptions that exist are loaded from Twitch once, and kept track of afterwards,
+        so following or unfollowing a Streamer only takes the Requests for that Streamer.
+
+        :param client_id: The Client ID of the Bot's Twitch Application
+        :param client_secret: The Client Secret of the Bot's Twitch Application
+        :param callback: The public HTTPS URL under which the WebhookReceiver is reachable, ending in WEBHOOK_PATH
+        :param secret: The Secret with which Twitch signs the Notifications
+        :param api_url: The Base URL of the Twitch API
+        :param token_url: The URL from which App Access Tokens are requested
+        """
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._callback = callback
+        self._secret = secret
+        self._api_url = api_url
+        self._token_url = token_url
+        self._token = None
+        self._user_ids = dict()  # Streamer Name -> Twitch User ID
+        self._subscriptions = None  # Twitch User ID -> { Subscription Type: Subscription ID }
+
+    async def _refresh_token(self):
+        resp = await http_client.request('POST', self._token_url,
+                                         params={'client_id': self._client_id, 'client_secret': self._client_secret,
+                                                 'grant_type': 'client_credentials'})
+        self._token = self._decode(self._token_url, resp)['access_token']
+
+    @staticmethod
+    def _decode(url: str, resp):
+        """
+        Decode a successful JSON Response.
+
+        :raises http_client.HTTPError: If the Response was not successful, or not valid JSON
+        """
+        if resp.status >= 400:
+            raise http_client.HTTPError(url, resp.status)
+        try:
+            return json.loads(resp.body.decode('utf-8'))
+        except ValueError:
+            raise http_client.HTTPError(url, resp.status, 'invalid JSON')
+
+    async def _api(self, method: str, path: str, params=None, body: dict = None):
+        """
+        Send a Request to the Twitch API with the App Access Token.
+
+        :return: The http_client.Response
+        :raises http_client.HTTPError: If the Request or fetching the Token failed
+        """
+        url = self._api_url + path
+        for attempt in range(2):
+            if self._token is None:
+                await self._refresh_token()
+            headers = {'Client-Id': self._client_id, 'Authorization': f'Bearer {self._token}'}
+            if body is not None:
+                headers['Content-Type'] = 'application/json'
+            resp = await http_client.request(method, url, params=params, headers=headers,
+                                             data=None if body is None else json.dumps(body))
+            if resp.status != 401:
+                return resp
+            self._token = None  # Expired or revoked, get a new one and try once more
+        raise http_client.HTTPError(url, resp.status)
+
+    async def _lookup(self, names: list):
+        """
+        Get the Twitch User IDs of Streamers, asking Twitch only about those not looked up before.
+
+        :return: A Dictionary of Streamer Names to User IDs, without Streamers that don't exist
+        """
+        missing = [name for name in names if name not in self._user_ids]
+        for idx in range(0, len(missing), USERS_PER_LOOKUP):
+            params = [('login', name) for name in missing[idx:idx + USERS_PER_LOOKUP]]
+            resp = await self._api('GET', '/users', params=params)
+            for user in self._decode(self._api_url + '/users', resp)['data']:
+                self._user_ids[user['login'].lower()] = user['id']
+        return {name: self._user_ids[name] for name in names if name in self._user_ids}
+
+    async def _load_subscriptions(self):
+        """
+        Load the Stream Subscriptions pointing at the Callback from Twitch. Subscriptions which Twitch gave up on
+        are deleted, so they are created again.
+
+        :return: A Dictionary of Twitch User IDs to { Subscription Type: Subscription ID }
+        """
+        subscriptions = dict()
+        broken = []
+        params = dict()
+        while True:
+            resp = await self._api('GET', '/eventsub/subscriptions', params=params)
+            page = self._decode(self._api_url + '/eventsub/subscriptions', resp)
+            for subscription in page['data']:
+                if subscription['type'] not in STREAM_EVENTS \
+                        or subscription['transport'].get('callback') != self._callback:
+                    continue
+                elif subscription['status'] in ('enabled', 'webhook_callback_verification_pending'):
+                    user_id = subscription['condition']['broadcaster_user_id']
+                    subscriptions.setdefault(user_id, dict())[subscription['type']] = subscription['id']
+                else:
+                    broken.append(subscription['id'])
+            cursor = page.get('pagination', {}).get('cursor')
+            if not cursor:
+                break
+            params = {'after': cursor}
+        for subscription_id in broken:  # Deleted only after Paging, so no Page is skipped
+            await self._delete(subscription_id)
+        return subscriptions
+
+    async def _delete(self, subscription_id: str):
+        resp = await self._api('DELETE', '/eventsub/subscriptions', params={'id': subscription_id})
+        if resp.status >= 400 and resp.status != 404:  # Already gone is fine
+            raise http_client.HTTPError(self._api_url + '/eventsub/subscriptions', resp.status)
+
+    async def subscribe(self, name: str):
+        """
+        Create the Subscriptions for a Streamer going online and offline, unless they exist already.
+
+        :param name: The Name of the Streamer
+        :return: False if there is no Streamer with that Name, True otherwise
+        :raises http_client.HTTPError: If talking to Twitch failed
+        """
+        if self._subscriptions is None:
+            self._subscriptions = await self._load_subscriptions()
+        user_id = (await self._lookup([name.lower()])).get(name.lower())
+        if user_id is None:
+            return False
+        existing = self._subscriptions.setdefault(user_id, dict())
+        for subscription_type in STREAM_EVENTS:
+            if subscription_type in existing:
+                continue
+            resp = await self._api('POST', '/eventsub/subscriptions', body={
+                'type': subscription_type,
+                'version': '1',
+                'condition': {'broadcaster_user_id': user_id},
+                'transport': {'method': 'webhook', 'callback': self._callback, 'secret': self._secret}
+            })
+            if resp.status == 409:  # Created by someone else in the meantime
+                continue
+            created = self._decode(self._api_url + '/eventsub/subscriptions', resp)
+            existing[subscription_type] = created['data'][0]['id']
+        return True
+
+    async def unsubscribe(self, name: str):
+        """
+        Delete the Subscriptions for a Streamer.
+
+        :param name: The Name of the Streamer
+        :raises http_client.HTTPError: If talking to Twitch failed
+        """
+        if self._subscriptions is None:
+            self._subscriptions = await self._load_subscriptions()
+        user_id = (await self._lookup([name.lower()])).get(name.lower())
+        for subscription_id in self._subscriptions.pop(user_id, dict()).values():
+            await self._delete(subscription_id)
+
+    async def sync(self, names: list):
+        """
+        Make the Subscriptions on Twitch match the given Streamers: create the missing ones, and delete those
+        for Streamers that are no longer followed.
+
+        :param names: The Names of all followed Streamers
+        :raises http_client.HTTPError: If talking to Twitch failed
+        """
+        self._subscriptions = await self._load_subscriptions()
+        user_ids = await self._lookup([name.lower() for name in names])
+        for user_id in set(self._subscriptions) - set(user_ids.values()):
+            for subscription_id in self._subscriptions.pop(user_id).values():
+                await self._delete(subscription_id)
+        for name in user_ids:
+            await self.subscribe(name)
@@ -0,0 +1,49 @@
+"""
+Local Stand-In Servers for Tests of Code talking to external HTTP APIs.
+"""
+import asyncio
+
+from aiohttp import web
+
+from src.util import http_client
+
+
+async def serve(app: web.Application):
+    """
+    Serve an Application on a free Port of localhost.
+
+    :param app: The aiohttp.web.Application to serve
+    :return: A (runner, base URL) Tuple, clean up the Runner once done
+    """
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    host, port = runner.addresses[0][:2]
+    return runner, f'http://{host}:{port}'
+
+
+def run(app: web.Application, test):
+    """
+    Run a Test against a Stand-In Server on a fresh Event Loop.
+
+    :param app: The aiohttp.web.Application to serve
+    :param test: A Coroutine Function called with the Base URL of the Server
+    :return: What the Test returned
+    """
+    async def main():
+        runner, base_url = await serve(app)
+        try:
+            return await test(base_url)
+        finally:
+            await http_client.close()
+            await runner.cleanup()
+    return asyncio.run(main())
+
+
+def route(handler, path: str = '/'):
+    """
+    Build an Application serving a single Handler for all Methods.
+    """
+    app = web.Application()
+    app.router.add_route('*', path, handler)
+    return app
@@ -0,0 +1,30 @@
+import random
+
+from src.util.aho_corasick import Automaton
+
+
+def brute_force(words: set, text: str):
+    return sorted((idx, word) for word in words for idx in range(len(text)) if text.startswith(word, idx))
+
+
+def test_find():
+    automaton = Automaton(['he', 'she', 'his', 'hers'])
+    assert sorted(automaton.find('ushers')) == [(1, 'she'), (2, 'he'), (2, 'hers')]
+    assert list(automaton.find_words('she sells, hers too')) == ['she', 'hers']
+
+
+def test_changes_match_a_rebuilt_automaton():
+    rng = random.Random(42)
+    words = set()
+    automaton = Automaton()
+    for _ in range(2000):
+        word = ''.join(rng.choice('abc') for _ in range(rng.randint(1, 5)))
+        if word in words and rng.random() < 0.4:
+            words.discard(word)
+            automaton.remove(word)
+        else:
+            words.add(word)
+            automaton.add(word)
+        text = ''.join(rng.choice('abc') for _ in range(20))
+        assert sorted(automaton.find(text)) == brute_force(words, text)
+        assert len(automaton) == len(words)
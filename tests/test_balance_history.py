@@ -0,0 +1,33 @@
+from src.util.balance_history import BalanceHistory, SUPPLY
+
+
+def saved_history(tmp_path):
+    path = str(tmp_path / 'currency_history.bin')
+    history = BalanceHistory(path)
+    history.record(1, 2, 50, now=3600)
+    history.record(1, SUPPLY, 500, now=3600)
+    history.save()
+    return path
+
+
+def test_round_trip(tmp_path):
+    history = BalanceHistory(saved_history(tmp_path))
+    assert history.points(1, 2, 'hour', now=3600)[-1] == (3600, 50)
+    assert history.points(1, SUPPLY, 'hour', now=3600)[-1] == (3600, 500)
+
+
+def test_truncated_file_starts_empty(tmp_path):
+    path = saved_history(tmp_path)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    for length in (0, 3, 8, len(raw) - 1):
+        with open(path, 'wb') as f:
+            f.write(raw[:length])
+        assert BalanceHistory(path).points(1, 2, 'hour', now=3600) == []
+
+
+def test_unknown_format_starts_empty(tmp_path):
+    path = saved_history(tmp_path)
+    with open(path, 'r+b') as f:
+        f.write(b'NOPE')
+    assert BalanceHistory(path).points(1, 2, 'hour', now=3600) == []
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from src.util import http_client
+from tests.stand_in import route, run
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(http_client, 'BACKOFF_BASE', 0.01)
+
+
+def test_timeout_is_retried():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(0.5)
+        return web.json_response({'ok': True})
+
+    result = run(route(handler), lambda url: http_client.get_json(url + '/', timeout=0.1, retries=1))
+    assert result == {'ok': True}
+    assert len(calls) == 2
+
+
+def test_timeout_raises_after_retries():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.5)
+        return web.Response()
+
+    with pytest.raises(http_client.HTTPError) as err:
+        run(route(handler), lambda url: http_client.request('GET', url + '/', timeout=0.1, retries=1))
+    assert err.value.status is None
+    assert len(calls) == 2
+
+
+def test_too_many_requests_waits_for_retry_after():
+    calls = []
+
+    async def handler(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return web.Response(status=429, headers={'Retry-After': '1'})
+        return web.Response(text='done')
+
+    body = run(route(handler), lambda url: http_client.get_bytes(url + '/'))
+    assert body == b'done'
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 1
+
+
+def test_server_errors_are_retried_with_backoff(monkeypatch):
+    calls = []
+    delays = []
+    backoff = http_client._backoff
+
+    def record_backoff(attempt, retry_after=None):
+        delays.append(backoff(attempt, retry_after))
+        return delays[-1]
+
+    async def handler(request):
+        calls.append(request)
+        return web.Response(status=503)
+
+    monkeypatch.setattr(http_client, '_backoff', record_backoff)
+    with pytest.raises(http_client.HTTPError) as err:
+        run(route(handler), lambda url: http_client.request('GET', url + '/', retries=3))
+    assert err.value.status == 503
+    assert len(calls) == 4
+    assert len(delays) == 3
+    assert all(0 <= delay <= http_client.BACKOFF_BASE * 2 ** attempt for attempt, delay in enumerate(delays))
+
+
+def test_client_error_is_not_retried():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        return web.Response(status=404)
+
+    resp = run(route(handler), lambda url: http_client.request('GET', url + '/'))
+    assert resp.status == 404
+    assert len(calls) == 1
+
+    with pytest.raises(http_client.HTTPError) as err:
+        run(route(handler), lambda url: http_client.get_json(url + '/'))
+    assert err.value.status == 404
+    assert len(calls) == 2
+
+
+def test_invalid_json():
+    async def handler(request):
+        return web.Response(text='<html>not json</html>', content_type='text/html')
+
+    with pytest.raises(http_client.HTTPError) as err:
+        run(route(handler), lambda url: http_client.get_json(url + '/'))
+    assert err.value.status == 200
+    assert 'invalid JSON' in err.value.reason
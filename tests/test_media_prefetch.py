@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from src.util import http_client, media_prefetch
+
+
+def test_refill_stops_on_duplicates():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return 'https://example.com/same.gif'
+
+    async def main():
+        buffer = media_prefetch.MediaBuffer('Test', fetch, size=3)
+        await buffer._refill()
+        return buffer
+
+    buffer = asyncio.run(main())
+    assert len(buffer) == 1
+    assert len(calls) == 3 * media_prefetch.REFILL_ATTEMPTS
+
+
+def test_get_does_not_fetch_while_paused():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        raise http_client.HTTPError('https://example.com', 503)
+
+    async def main():
+        buffer = media_prefetch.MediaBuffer('Test', fetch)
+        await buffer._refill()
+        with pytest.raises(http_client.HTTPError):
+            await buffer.get()
+        buffer._refill_task.cancel()
+
+    asyncio.run(main())
+    assert len(calls) == 1
@@ -0,0 +1,23 @@
+from src.util import trivia_lint
+from src.util.trivia_lint import find_clusters
+
+
+def question(text: str, answer: str = 'x'):
+    return {'q': text, 'a': answer}
+
+
+def test_paraphrases_are_clustered():
+    questions = [question('Which champion is known as the Wandering Caretaker?'),
+                 question('Which champion is known as the wandering caretaker'),
+                 question('How many meeps does a fully stacked chime collector have?')]
+    assert find_clusters(questions, 0.6) == [[0, 1]]
+
+
+def test_pairs_after_the_first_bucket_member_are_compared(monkeypatch):
+    # Every Question lands in the same Bucket of every Band, with an unrelated one first
+    monkeypatch.setattr(trivia_lint, 'signature', lambda hashes: (0,) * (trivia_lint.BANDS * trivia_lint.ROWS))
+    questions = [question('Who forged the first ancient chime in the celestial realm?'),
+                 question('What is the cooldown of the magical journey portal ability?'),
+                 question('What is the cooldown of the magical journey portal ability'),
+                 question('Which creature follows the caretaker around and carries meeps?')]
+    assert find_clusters(questions, 0.6) == [[1, 2]]
@@ -0,0 +1,62 @@
+import pytest
+
+from src.util import ttl_map
+from src.util.ttl_map import TTLMap
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1000.0)
+    monkeypatch.setattr(ttl_map, 'time', clock)
+    return clock
+
+
+def test_expired_entries_are_swept_in_the_next_tick(clock):
+    entries = TTLMap(resolution=10, slots=8)
+    entries.set('a', ttl=15)  # Expires at 1015, in the Middle of Tick 101
+    clock.now = 1011  # Tick 101 begins and is swept, but the Entry has not expired yet
+    assert 'a' in entries
+    clock.now = 1016
+    assert 'a' not in entries
+    clock.now = 1021  # The first Sweep after the Expiry
+    entries.get('b')
+    assert entries._entries == {}
+
+
+def test_entry_expiring_in_the_current_tick(clock):
+    entries = TTLMap(resolution=10, slots=8)
+    entries.set('a', ttl=2)
+    clock.now = 1003
+    assert 'a' not in entries
+    clock.now = 1010
+    assert len(entries) == 0
+    assert entries._entries == {}
+
+
+def test_entries_beyond_a_full_turn(clock):
+    entries = TTLMap(resolution=10, slots=8)
+    entries.set('a', ttl=200)
+    for now in range(1010, 1200, 10):
+        clock.now = now
+        assert 'a' in entries
+    clock.now = 1210
+    assert len(entries) == 0
+
+
+def test_dump_and_load(clock):
+    entries = TTLMap(resolution=10, slots=8)
+    entries.set('a', 1, ttl=50)
+    entries.set('b', 2, ttl=5)
+    clock.now = 1010
+    restored = TTLMap(resolution=10, slots=8)
+    restored.load(entries.dump())
+    assert restored.get('a') == 1
+    assert 'b' not in restored
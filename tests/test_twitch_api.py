@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from src.util import http_client, twitch_api
+from src.util.twitch_api import StreamPoller
+from tests.stand_in import run
+
+STREAMS_PATH = '/kraken/streams/'
+
+
+class FakeTwitch:
+    def __init__(self):
+        """
+        A Stand-In for the Streams Endpoint of the Twitch API, which answers with the Streams that are online
+        among the requested Channels, and supports ETags.
+        """
+        self.online = set()
+        self.failing = False
+        self.delay = 0
+        self.requests = []
+        self.not_modified = 0
+        self.running = 0
+        self.max_running = 0
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get(STREAMS_PATH, self.streams)
+        return app
+
+    async def streams(self, request):
+        channels = request.query['channel'].split(',')
+        self.requests.append(channels)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        if self.failing:
+            return web.Response(status=500)
+        online = sorted(set(channels) & self.online)
+        etag = f'"{hash(tuple(online))}"'
+        if request.headers.get('If-None-Match') == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={'ETag': etag})
+        streams = [{'channel': {'name': name.title()}} for name in online]
+        return web.json_response({'streams': streams}, headers={'ETag': etag})
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(http_client, 'BACKOFF_BASE', 0)
+
+
+def poll_with(twitch: FakeTwitch, test):
+    """
+    Run a Test with a Poller pointed at the fake Twitch API.
+
+    :param test: A Coroutine Function called with the Poller and a List collecting the reported Changes
+    """
+    changes = []
+
+    async def on_change(name, online):
+        changes.append((name, online))
+
+    async def main(base_url):
+        await test(StreamPoller(on_change, 'client', base_url + STREAMS_PATH), changes)
+    run(twitch.app(), main)
+    return changes
+
+
+def streamers(amount: int):
+    return [f'streamer{idx:03}' for idx in range(amount)]
+
+
+def test_batches():
+    twitch = FakeTwitch()
+
+    async def test(poller, changes):
+        await poller.poll(streamers(250))
+
+    poll_with(twitch, test)
+    assert sorted(len(x) for x in twitch.requests) == [50, twitch_api.BATCH_SIZE, twitch_api.BATCH_SIZE]
+    assert sorted(x for batch in twitch.requests for x in batch) == streamers(250)
+
+
+def test_concurrent_batches_are_limited():
+    twitch = FakeTwitch()
+    twitch.delay = 0.05
+
+    async def test(poller, changes):
+        await poller.poll(streamers(twitch_api.BATCH_SIZE * (twitch_api.MAX_CONCURRENT_BATCHES + 3)))
+
+    poll_with(twitch, test)
+    assert len(twitch.requests) == twitch_api.MAX_CONCURRENT_BATCHES + 3
+    assert twitch.max_running == twitch_api.MAX_CONCURRENT_BATCHES
+
+
+def test_not_modified_reuses_the_last_response():
+    twitch = FakeTwitch()
+    twitch.online = {'streamer001'}
+
+    async def test(poller, changes):
+        await poller.poll(streamers(3))
+        await poller.poll(streamers(3))
+        assert poller.states['streamer001'].online
+        assert not poller.states['streamer002'].online
+
+    assert poll_with(twitch, test) == []
+    assert twitch.not_modified == 1
+
+
+def test_failed_batch_backs_off():
+    twitch = FakeTwitch()
+    twitch.failing = True
+    attempts = http_client.DEFAULT_RETRIES + 1
+
+    async def test(poller, changes):
+        names = streamers(2)
+        await poller.poll(names, now=1000)
+        state = poller.states['streamer000']
+        assert state.failures == 1
+        assert state.retry_at == 1000 + twitch_api.MIN_BACKOFF
+        await poller.poll(names, now=1001)  # Still backing off, nothing is requested
+        assert len(twitch.requests) == attempts
+        await poller.poll(names, now=state.retry_at)
+        assert state.failures == 2
+        assert state.retry_at == 1000 + twitch_api.MIN_BACKOFF + 2 * twitch_api.MIN_BACKOFF
+        twitch.failing = False
+        await poller.poll(names, now=state.retry_at)
+        assert state.failures == 0
+        assert state.online is False
+
+    poll_with(twitch, test)
+    assert len(twitch.requests) == 2 * attempts + 1
+
+
+def test_interval_shrinks_on_changes_and_grows_without():
+    twitch = FakeTwitch()
+
+    async def test(poller, changes):
+        names = streamers(2)
+        await poller.poll(names)
+        assert poller.interval == twitch_api.MIN_INTERVAL * twitch_api.INTERVAL_GROWTH
+        for _ in range(10):
+            await poller.poll(names)
+        assert poller.interval == twitch_api.MAX_INTERVAL
+        twitch.online = {'streamer000'}
+        await poller.poll(names)
+        assert poller.interval == twitch_api.MIN_INTERVAL
+
+    poll_with(twitch, test)
+
+
+def test_changes_are_reported_after_the_first_poll():
+    twitch = FakeTwitch()
+    twitch.online = {'streamer000'}
+
+    async def test(poller, changes):
+        names = streamers(2)
+        assert await poller.poll(names) == []
+        twitch.online = {'streamer001'}
+        assert sorted(await poller.poll(names)) == [('streamer000', False), ('streamer001', True)]
+
+    assert sorted(poll_with(twitch, test)) == [('streamer000', False), ('streamer001', True)]
@@ -0,0 +1,134 @@
+import itertools
+
+from aiohttp import web
+
+from src.util.twitch_api import EventSubClient
+from tests.stand_in import run
+
+CALLBACK = 'https://bard.example/twitch/eventsub'
+
+
+class FakeHelix:
+    def __init__(self, users: dict):
+        """
+        A Stand-In for the Parts of the Twitch API used to manage EventSub Subscriptions.
+
+        :param users: The existing Users, as { login: user id }
+        """
+        self.users = users
+        self.subscriptions = dict()  # ID -> Subscription
+        self.valid_token = None
+        self.tokens_issued = 0
+        self.page_size = 2
+        self._ids = itertools.count(1)
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post('/oauth2/token', self.token)
+        app.router.add_get('/helix/users', self.get_users)
+        app.router.add_get('/helix/eventsub/subscriptions', self.list_subscriptions)
+        app.router.add_post('/helix/eventsub/subscriptions', self.create_subscription)
+        app.router.add_delete('/helix/eventsub/subscriptions', self.delete_subscription)
+        return app
+
+    def add(self, user_id: str, subscription_type: str, status: str = 'enabled', callback: str = CALLBACK):
+        subscription_id = str(next(self._ids))
+        self.subscriptions[subscription_id] = {'id': subscription_id, 'type': subscription_type, 'status': status,
+                                               'condition': {'broadcaster_user_id': user_id},
+                                               'transport': {'method': 'webhook', 'callback': callback}}
+        return subscription_id
+
+    def subscribed(self):
+        return sorted((x['condition']['broadcaster_user_id'], x['type']) for x in self.subscriptions.values())
+
+    async def token(self, request):
+        assert request.query['grant_type'] == 'client_credentials'
+        self.tokens_issued += 1
+        self.valid_token = f'token{self.tokens_issued}'
+        return web.json_response({'access_token': self.valid_token, 'expires_in': 3600})
+
+    def _authorized(self, request):
+        return request.headers.get('Authorization') == f'Bearer {self.valid_token}'
+
+    async def get_users(self, request):
+        if not self._authorized(request):
+            return web.Response(status=401)
+        logins = request.query.getall('login')
+        return web.json_response({'data': [{'id': self.users[x], 'login': x} for x in logins if x in self.users]})
+
+    async def list_subscriptions(self, request):
+        if not self._authorized(request):
+            return web.Response(status=401)
+        subscriptions = sorted(self.subscriptions.values(), key=lambda x: int(x['id']))
+        start = int(request.query.get('after', 0))
+        page = subscriptions[start:start + self.page_size]
+        cursor = str(start + self.page_size) if start + self.page_size < len(subscriptions) else None
+        return web.json_response({'data': page, 'pagination': {} if cursor is None else {'cursor': cursor}})
+
+    async def create_subscription(self, request):
+        if not self._authorized(request):
+            return web.Response(status=401)
+        body = await request.json()
+        assert body['transport'] == {'method': 'webhook', 'callback': CALLBACK, 'secret': 'secret'}
+        subscription_id = self.add(body['condition']['broadcaster_user_id'], body['type'],
+                                   'webhook_callback_verification_pending')
+        return web.json_response({'data': [self.subscriptions[subscription_id]]}, status=202)
+
+    async def delete_subscription(self, request):
+        if not self._authorized(request):
+            return web.Response(status=401)
+        if self.subscriptions.pop(request.query['id'], None) is None:
+            return web.Response(status=404)
+        return web.Response(status=204)
+
+
+def with_client(helix: FakeHelix, test):
+    async def main(base_url):
+        client = EventSubClient('client', 'client secret', CALLBACK, 'secret',
+                                api_url=base_url + '/helix', token_url=base_url + '/oauth2/token')
+        return await test(client)
+    return run(helix.app(), main)
+
+
+def test_subscribe_and_unsubscribe():
+    helix = FakeHelix({'someone': '1'})
+
+    async def test(client):
+        assert await client.subscribe('Someone')
+        assert await client.subscribe('someone')
+        assert helix.subscribed() == [('1', 'stream.offline'), ('1', 'stream.online')]
+        assert not await client.subscribe('nobody')
+        await client.unsubscribe('someone')
+        assert helix.subscribed() == []
+
+    with_client(helix, test)
+
+
+def test_sync():
+    helix = FakeHelix({'kept': '1', 'added': '2', 'dropped': '3'})
+    helix.add('1', 'stream.online')
+    helix.add('1', 'stream.offline', status='notification_failures_exceeded')
+    helix.add('3', 'stream.online')
+    helix.add('3', 'stream.offline')
+    helix.add('4', 'stream.online', callback='https://someone.else/')
+
+    async def test(client):
+        await client.sync(['kept', 'added', 'missing'])
+
+    with_client(helix, test)
+    assert helix.subscribed() == [('1', 'stream.offline'), ('1', 'stream.online'),
+                                  ('2', 'stream.offline'), ('2', 'stream.online'),
+                                  ('4', 'stream.online')]
+
+
+def test_expired_token_is_refreshed():
+    helix = FakeHelix({'someone': '1'})
+
+    async def test(client):
+        await client.subscribe('someone')
+        helix.valid_token = 'rotated'
+        await client.unsubscribe('someone')
+
+    with_client(helix, test)
+    assert helix.tokens_issued == 2
+    assert helix.subscribed() == []
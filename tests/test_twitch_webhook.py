@@ -0,0 +1,107 @@
+import datetime
+import hashlib
+import hmac
+import json
+
+from src.util import http_client
+from src.util.twitch_api import StreamPoller, WebhookReceiver, WEBHOOK_PATH, verify_signature
+from tests.stand_in import run
+
+SECRET = 'not so secret'
+
+
+def headers_for(body: bytes, message_id: str, message_type: str = 'notification', sent_at: datetime.datetime = None,
+                secret: str = SECRET):
+    """
+    Build the Headers with which Twitch signs a Notification.
+    """
+    sent_at = datetime.datetime.utcnow() if sent_at is None else sent_at
+    timestamp = sent_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    signature = hmac.new(secret.encode(), message_id.encode() + timestamp.encode() + body, hashlib.sha256)
+    return {'Twitch-Eventsub-Message-Id': message_id,
+            'Twitch-Eventsub-Message-Timestamp': timestamp,
+            'Twitch-Eventsub-Message-Signature': f'sha256={signature.hexdigest()}',
+            'Twitch-Eventsub-Message-Type': message_type}
+
+
+def stream_event(name: str, online: bool):
+    return json.dumps({'subscription': {'type': 'stream.online' if online else 'stream.offline'},
+                       'event': {'broadcaster_user_login': name}}).encode()
+
+
+def deliver(deliveries: list):
+    """
+    Post signed Deliveries to a WebhookReceiver, in Order.
+
+    :param deliveries: A List of (body, headers) Tuples
+    :return: A (responses, changes) Tuple, with the Status and Body of every Response,
+             and the Changes which reached the Poller
+    """
+    changes = []
+
+    async def on_change(name, online):
+        changes.append((name, online))
+
+    receiver = WebhookReceiver(StreamPoller(on_change, 'client', 'http://127.0.0.1:1/'), SECRET)
+
+    async def test(base_url):
+        responses = []
+        for body, headers in deliveries:
+            resp = await http_client.request('POST', base_url + WEBHOOK_PATH, headers=headers, data=body, retries=0)
+            responses.append((resp.status, resp.body))
+        return responses
+    return run(receiver.app(), test), changes
+
+
+def test_verify_signature():
+    body = b'{}'
+    headers = headers_for(body, 'id')
+    args = (headers['Twitch-Eventsub-Message-Id'], headers['Twitch-Eventsub-Message-Timestamp'], body)
+    assert verify_signature(SECRET, *args, headers['Twitch-Eventsub-Message-Signature'])
+    assert not verify_signature('other secret', *args, headers['Twitch-Eventsub-Message-Signature'])
+    assert not verify_signature(SECRET, *args, 'sha256=00')
+
+
+def test_bad_signature_is_rejected():
+    body = stream_event('someone', True)
+    responses, changes = deliver([(body, headers_for(body, 'a', secret='wrong'))])
+    assert responses[0][0] == 403
+    assert changes == []
+
+
+def test_tampered_body_is_rejected():
+    body = stream_event('someone', True)
+    responses, changes = deliver([(stream_event('someone else', True), headers_for(body, 'a'))])
+    assert responses[0][0] == 403
+    assert changes == []
+
+
+def test_stale_timestamp_is_rejected():
+    body = stream_event('someone', True)
+    sent_at = datetime.datetime.utcnow() - datetime.timedelta(minutes=20)
+    responses, changes = deliver([(body, headers_for(body, 'a', sent_at=sent_at))])
+    assert responses[0][0] == 403
+    assert changes == []
+
+
+def test_verification_challenge_is_answered():
+    body = json.dumps({'challenge': 'pogchamp', 'subscription': {'type': 'stream.online'}}).encode()
+    responses, changes = deliver([(body, headers_for(body, 'a', 'webhook_callback_verification'))])
+    assert responses == [(200, b'pogchamp')]
+
+
+def test_duplicate_message_is_handled_once():
+    body = stream_event('someone', True)
+    headers = headers_for(body, 'a')
+    responses, changes = deliver([(body, headers), (body, headers)])
+    assert [status for status, _ in responses] == [204, 204]
+    assert changes == [('someone', True)]
+
+
+def test_online_and_offline_reach_the_poller():
+    online, offline = stream_event('Someone', True), stream_event('Someone', False)
+    responses, changes = deliver([(online, headers_for(online, 'a')),
+                                  (online, headers_for(online, 'b')),  # Already known, not announced again
+                                  (offline, headers_for(offline, 'c'))])
+    assert [status for status, _ in responses] == [204, 204, 204]
+    assert changes == [('someone', True), ('someone', False)]